@@ -1,6 +1,7 @@
 __author__ = 'saeedamen'
 
 from findatapy.market.datavendor import DataVendor
+from findatapy.market.datavendorregistry import DataVendorRegistry
 
 # don't include DataVendorBBG, in case users haven't installed blpapi
 # from findatapy.market.datavendorbbg import DataVendorBBG
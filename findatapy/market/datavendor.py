@@ -25,13 +25,37 @@ from findatapy.util import ConfigManager, LoggerManager
 class DataVendor(object):
     """Abstract class for various data source loaders.
 
+    MarketDataGenerator keeps the DataVendor it creates for each data source
+    (and set of credentials), calling open before its first use and close
+    when it's discarded, so subclasses can hold onto resources (eg. HTTP
+    sessions) between requests.
     """
 
+    # MarketDataRequest properties with the credentials used by the
+    # DataVendor, we need a separate instance for each set of credentials
+    credential_attributes = []
+
+    # Can the same instance be used by several threads at once? If not,
+    # MarketDataGenerator keeps a separate instance for each thread
+    thread_safe = True
+
     def __init__(self):
         self.config = ConfigManager().get_instance()
         # self.config = None
         return
 
+    def open(self):
+        """Acquires any resources which can be reused between requests, called
+        by MarketDataGenerator before the DataVendor is first used
+        """
+        return
+
+    def close(self):
+        """Releases any resources held by the DataVendor, called by
+        MarketDataGenerator when it discards the DataVendor
+        """
+        return
+
     @abc.abstractmethod
     def load_ticker(self, md_request):
         """Retrieves market data from external data source
@@ -112,20 +136,18 @@ class DataVendor(object):
 
         if self.config is None: return fields_list
 
-        fields_converted = []
+        library_to_vendor, _ = self.config.get_field_translation_maps(source)
 
-        for field in fields_list:
-            try:
-                f = self.config.convert_library_to_vendor_field(source, field)
-            except:
-                logger = LoggerManager().getLogger(__name__)
-                logger.warn(
-                    "Couldn't find field conversion, "
-                    "did you type it correctly: " + field)
+        fields_converted, missing = self.translate_list(
+            fields_list, library_to_vendor)
 
-                return
+        if missing != []:
+            logger = LoggerManager().getLogger(__name__)
+            logger.warning(
+                "Couldn't find field conversion, "
+                "did you type it correctly: " + ", ".join(missing))
 
-            fields_converted.append(f)
+            return
 
         return fields_converted
 
@@ -158,22 +180,19 @@ class DataVendor(object):
 
         if self.config is None: return tickers_list
 
-        tickers_list_converted = []
+        library_to_vendor, _ = self.config.get_ticker_translation_maps(
+            category, source, freq, cut)
 
-        for ticker in tickers_list:
-            try:
-                t = self.config.convert_library_to_vendor_ticker(category,
-                                                                 source, freq,
-                                                                 cut, ticker)
-            except:
-                logger = LoggerManager().getLogger(__name__)
-                logger.error(
-                    "Couldn't find ticker conversion, did you type "
-                    "it correctly: " + ticker)
+        tickers_list_converted, missing = self.translate_list(
+            tickers_list, library_to_vendor)
 
-                return
+        if missing != []:
+            logger = LoggerManager().getLogger(__name__)
+            logger.error(
+                "Couldn't find ticker conversion, did you type "
+                "it correctly: " + ", ".join(missing))
 
-            tickers_list_converted.append(t)
+            return
 
         return tickers_list_converted
 
@@ -217,20 +236,18 @@ class DataVendor(object):
         # Otherwise used stored configuration files (every field needs to be
         # defined!)
         else:
-            for vendor_field in vendor_fields_list:
-                try:
-                    v = self.config.convert_vendor_to_library_field(
-                        data_source, vendor_field)
-                except:
-                    logger = LoggerManager().getLogger(__name__)
-                    logger.error(
-                        "Couldn't find field conversion, did you type it "
-                        "correctly: " + vendor_field +
-                        ", using 'close' as default.")
+            _, vendor_to_library = self.config.get_field_translation_maps(
+                data_source)
 
-                    v = 'close'
+            fields_converted, missing = self.translate_list(
+                vendor_fields_list, vendor_to_library, missing_value='close')
 
-                fields_converted.append(v)
+            if missing != []:
+                logger = LoggerManager().getLogger(__name__)
+                logger.error(
+                    "Couldn't find field conversion, did you type it "
+                    "correctly: " + ", ".join(missing) +
+                    ", using 'close' as default.")
 
         return fields_converted
 
@@ -269,23 +286,58 @@ class DataVendor(object):
 
         if self.config is None: return vendor_tickers_list
 
-        tickers_converted = []
+        _, vendor_to_library = self.config.get_ticker_translation_maps(
+            md_request.category, md_request.data_source, md_request.freq,
+            md_request.cut)
 
-        for vendor_ticker in vendor_tickers_list:
-            try:
-                v = self.config.convert_vendor_to_library_ticker(
-                    md_request.category, md_request.data_source,
-                    md_request.freq, md_request.cut, vendor_ticker)
-            except:
-                logger = LoggerManager().getLogger(__name__)
-                logger.error("Couldn't find ticker conversion, "
-                             "did you type it correctly: " + vendor_ticker)
+        tickers_converted, missing = self.translate_list(
+            vendor_tickers_list, vendor_to_library)
 
-                return
+        if missing != []:
+            logger = LoggerManager().getLogger(__name__)
+            logger.error("Couldn't find ticker conversion, "
+                         "did you type it correctly: " + ", ".join(missing))
 
-            tickers_converted.append(v)
+            return
 
         return tickers_converted
 
+    def translate_list(self, lst, translation_map, missing_value=None):
+        """Translates every element of a list with a dictionary in one pass,
+        collecting any elements which aren't in the dictionary (rather than
+        stopping at the first one)
+
+        Parameters
+        ----------
+        lst : str (list)
+            Elements to translate eg. tickers
+
+        translation_map : dict
+            Translations for each element
+
+        missing_value : str
+            Used for elements without a translation (default: None)
+
+        Returns
+        -------
+        list, str (list)
+            Translated elements, and those which couldn't be translated
+        """
+        # The dictionary is already a hash table of the translations, so
+        # looking up each element directly is quicker than building a
+        # pd.Index of its keys and using get_indexer (the requests typically
+        # have only a handful of tickers/fields)
+        translated = []
+        missing = []
+
+        for k in lst:
+            if isinstance(k, str) and k in translation_map:
+                translated.append(translation_map[k])
+            else:
+                translated.append(missing_value)
+                missing.append(str(k))
+
+        return translated, missing
+
     def get_lower_case_list(self, lst):
         return [k.lower() for k in lst]
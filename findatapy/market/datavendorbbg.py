@@ -15,7 +15,7 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 import abc
-from operator import itemgetter
+from operator import methodcaller
 
 import pandas as pd
 import numpy as np
@@ -409,7 +409,11 @@ import abc
 import copy
 import collections
 import datetime
+import math
+import os
 import re
+import threading
+import time
 
 try:
     import blpapi  # obtainable from Bloomberg website
@@ -417,6 +421,7 @@ except:
     pass
 
 from findatapy.util.dataconstants import DataConstants
+from findatapy.util.privatejson import read_private_json, write_private_json
 from findatapy.market.datavendorbbg import DataVendorBBG
 
 from collections import defaultdict
@@ -506,11 +511,14 @@ class BBGLowLevelTemplate:  # in order that the init function works in
 
     _session = None
 
+    # Shards of intraday/tick requests we have already downloaded (shared
+    # by all the loaders), so we never fetch them twice
+    _shard_cache = collections.OrderedDict()
+    _shard_cache_lock = threading.Lock()
+
     def __init__(self):
         self.RESPONSE_ERROR = blpapi.Name("responseError")
         self.SESSION_TERMINATED = blpapi.Name("SessionTerminated")
-        self.CATEGORY = blpapi.Name("category")
-        self.MESSAGE = blpapi.Name("message")
 
         return
 
@@ -524,17 +532,7 @@ class BBGLowLevelTemplate:  # in order that the init function works in
         # else:
         #    session = BBGLowLevelTemplate._session
 
-        def download_data_frame(sess, eventQ, opt, ci):
-            if opt.security is not None:
-                self.send_bar_request(sess, eventQ, opt, ci)
-
-                logger.info("Waiting for data to be returned...")
-
-                return self.event_loop(sess)
-            else:
-                logger.warn("No ticker or field specified!")
-
-                return None
+        data_frame = None
 
         try:
             # if can't open the session, kill existing one
@@ -572,26 +570,27 @@ class BBGLowLevelTemplate:  # in order that the init function works in
             eventQueue = blpapi.EventQueue()
             # eventQueue = None
 
-            # Create a request
-            from blpapi import CorrelationId
-
             options = self.fill_options(md_request)
 
             # In some instances we might split the options if need to have
-            # different overrides
-            if isinstance(options, list):
-                data_frame_list = []
+            # different overrides (or to split up very large requests)
+            if not isinstance(options, list):
+                options = [options]
 
-                for op in options:
-                    cid = CorrelationId()
-                    data_frame_list.append(
-                        download_data_frame(session, eventQueue, op, cid))
+            options_list = []
 
-                data_frame = Calculations().join(data_frame_list)
-            else:
-                cid = CorrelationId()
-                data_frame = download_data_frame(session, eventQueue, options,
-                                                 cid)
+            for op in options:
+                if op.security is not None:
+                    options_list.append(op)
+                else:
+                    logger.warn("No ticker or field specified!")
+
+            if options_list != []:
+                data_frame_list = self.download_options_list(
+                    session, eventQueue, options_list)
+
+                data_frame = self.combine_data_frames(options_list,
+                                                      data_frame_list)
         finally:
             # stop the session (will fail if NoneType)
             try:
@@ -601,88 +600,345 @@ class BBGLowLevelTemplate:  # in order that the init function works in
 
         return data_frame
 
-    def event_loop(self, session):
-        not_done = True
+    def download_options_list(self, session, eventQueue, options_list):
+        """Downloads the requests for each of the options, pipelined on the
+        same session. Any shards (see shard_cache_key) which we have
+        already downloaded are taken from the shard cache, and those which
+        fail are retried (only sending the failed shards again).
 
-        data_frame_slice = None
+        Parameters
+        ----------
+        session : blpapi.Session
+            Bloomberg session (with //blp/refdata open)
+        eventQueue : blpapi.EventQueue
+            Passed to send_bar_request
+        options_list : OptionsBBG (list)
+            Options for each request
 
-        data_frame_list = []
-        data_frame_cols = []
+        Returns
+        -------
+        DataFrame (list)
+        """
+        constants = DataConstants()
+        logger = LoggerManager().getLogger(__name__)
 
-        while not_done:
-            # nextEvent() method can be called with timeout to let
-            # the program catch Ctrl-C between arrivals of new events
-            event = session.nextEvent()  # removed time out
-            # event = eventQueue.nextEvent()
-
-            # Bloomberg will send us responses in chunks
-            if event.eventType() == blpapi.Event.PARTIAL_RESPONSE:
-                # logger.info("Processing Bloomberg Partial Response")
-                data_frame_slice = self.process_response_event(event)
-            elif event.eventType() == blpapi.Event.RESPONSE:
-                # logger.info("Processing Bloomberg Full Response")
-                data_frame_slice = self.process_response_event(event)
-                not_done = False
-            else:
-                for msg in event:
-                    if event.eventType() == blpapi.Event.SESSION_STATUS:
+        data_frame_list = [None] * len(options_list)
+        keys = [self.shard_cache_key(op) for op in options_list]
 
-                        if msg.messageType() == self.SESSION_TERMINATED:
-                            not_done = False
+        to_download = []
 
-            # Append DataFrame only if not empty
-            if data_frame_slice is not None:
-                data_frame_list.append(
-                    self.combine_slices(data_frame_cols, data_frame_slice))
+        for i, key in enumerate(keys):
+            if key is not None:
+                with BBGLowLevelTemplate._shard_cache_lock:
+                    if key in BBGLowLevelTemplate._shard_cache:
+                        BBGLowLevelTemplate._shard_cache.move_to_end(key)
+                        data_frame_list[i] = \
+                            BBGLowLevelTemplate._shard_cache[key]
 
-                # Keep list of columns we've already found (occasionally BBG
-                # seems to return columns more than once?)
-                # (this will fail for intraday time series)
-                try:
-                    data_frame_cols.append(list(
-                        data_frame_slice.columns.get_level_values(1).values)[
-                                               0])
-                except:
-                    pass
+                        continue
 
-        if data_frame_cols == [] and data_frame_list != []:  # intraday case
-            data_frame = pd.concat(data_frame_list)
-        else:  # daily frequencies
-            data_frame = Calculations().join(data_frame_list, how='outer')
+            to_download.append(i)
 
-        # make sure we do not have any duplicates in the time series
-        if data_frame is not None:
-            # if data_frame.empty == False:
-            data_frame.drop_duplicates(keep='last')
+        if len(to_download) < len(options_list):
+            logger.info("Found " + str(len(options_list) - len(to_download))
+                        + " Bloomberg shards in cache")
 
-        return data_frame
+        trials = 0
 
-    # Process raw message returned by Bloomberg
-    def process_response_event(self, event):
-        data_frame_list = []
+        while to_download != []:
+            if trials > 0:
+                logger.warning("Retrying " + str(len(to_download))
+                               + " failed Bloomberg requests...")
 
-        logger = LoggerManager().getLogger(__name__)
+            try:
+                df_list, failed = self.pipeline_requests(
+                    session, eventQueue,
+                    [options_list[i] for i in to_download])
+            except Exception as e:
+                logger.error("Failed to send Bloomberg requests: " + str(e))
+
+                break
+
+            failed_shards = []
+
+            for j, i in enumerate(to_download):
+                if j in failed:
+                    # Only bother retrying shards
+                    if keys[i] is not None:
+                        failed_shards.append(i)
+
+                    continue
+
+                data_frame_list[i] = df_list[j]
+
+                if keys[i] is not None:
+                    self._cache_shard(keys[i], df_list[j])
+
+            to_download = failed_shards
+            trials = trials + 1
+
+            if trials > constants.bbg_shard_retries:
+                break
+
+        if to_download != []:
+            logger.error(str(len(to_download)) + " Bloomberg shards failed, "
+                         "retrying the request will only download these")
 
-        for msg in event:
-            # Generates a lot of output - so don't use unless for
-            # debugging purposes
-            # logger.info(msg)
+        return data_frame_list
+
+    def _cache_shard(self, key, data_frame):
+        constants = DataConstants()
+
+        with BBGLowLevelTemplate._shard_cache_lock:
+            BBGLowLevelTemplate._shard_cache[key] = data_frame
+            BBGLowLevelTemplate._shard_cache.move_to_end(key)
+
+            while len(BBGLowLevelTemplate._shard_cache) \
+                    > constants.bbg_shard_cache_size:
+                BBGLowLevelTemplate._shard_cache.popitem(last=False)
+
+    def shard_cache_key(self, options):
+        """Key for caching the output of a request in the shard cache. By
+        default, requests are not cached (None).
+
+        Parameters
+        ----------
+        options : OptionsBBG
+            Options for the request
+
+        Returns
+        -------
+        tuple
+        """
+        return None
 
-            if msg.hasElement(self.RESPONSE_ERROR):
-                logger.error("REQUEST FAILED: " + str(
-                    msg.getElement(self.RESPONSE_ERROR)))
+    def shard_options(self, options, rows_per_minute, max_rows):
+        """Splits the options for a long intraday/tick request into
+        contiguous time shards, each of which should have at most around
+        max_rows (estimated from rows_per_minute), so they can be pipelined
+        and cached separately.
+
+        Parameters
+        ----------
+        options : OptionsBBG
+            Options for the whole request
+        rows_per_minute : float
+            Estimated number of rows returned for each minute
+        max_rows : int
+            Maximum number of estimated rows in each shard (None for no
+            sharding)
+
+        Returns
+        -------
+        OptionsBBG (list)
+        """
+        start = options.startDateTime
+        end = options.endDateTime
+
+        if max_rows is None or not hasattr(start, 'microsecond') \
+                or not hasattr(end, 'microsecond'):
+            return options
+
+        minutes = (end - start).total_seconds() / 60.0
+        shard_no = int(math.ceil(minutes * rows_per_minute / max_rows))
+
+        if shard_no <= 1:
+            return options
+
+        # Bloomberg only takes whole seconds
+        boundaries = pd.date_range(start, end, periods=shard_no + 1) \
+            .floor('s').unique()
+
+        options_list = []
+
+        for shard_start, shard_end in zip(boundaries[:-1], boundaries[1:]):
+            curr_options = OptionsBBG(options_bbg=options)
+            curr_options.startDateTime = shard_start.to_pydatetime()
+            curr_options.endDateTime = shard_end.to_pydatetime()
+
+            options_list.append(curr_options)
+
+        options_list[0].startDateTime = start
+        options_list[-1].endDateTime = end
+
+        return options_list
+
+    def combine_data_frames(self, options_list, data_frame_list):
+        """Combines the output of each request into a single DataFrame.
+
+        Parameters
+        ----------
+        options_list : OptionsBBG (list)
+            Options for each request
+        data_frame_list : DataFrame (list)
+            Output of each request
+
+        Returns
+        -------
+        DataFrame
+        """
+        if len(data_frame_list) == 1:
+            return data_frame_list[0]
+
+        return Calculations().join(data_frame_list)
+
+    def combine_shards(self, options_list, data_frame_list):
+        """Concatenates the output of time shards (see shard_options).
+
+        Parameters
+        ----------
+        options_list : OptionsBBG (list)
+            Options for each shard
+        data_frame_list : DataFrame (list)
+            Output of each shard
+
+        Returns
+        -------
+        DataFrame
+        """
+        shard_list = []
+
+        for i in range(0, len(options_list)):
+            data_frame = data_frame_list[i]
+
+            if data_frame is None or data_frame.empty:
                 continue
 
-            data_frame_slice = self.process_message(msg)
+            # The next shard starts at the end of this one, so make sure we
+            # don't have rows in both of them
+            if i < len(options_list) - 1:
+                end = pd.Timestamp(options_list[i].endDateTime)
 
-            if (data_frame_slice is not None):
-                data_frame_list.append(data_frame_slice)
+                if end.tzinfo is not None:
+                    end = end.tz_convert(None)
 
-        if data_frame_list == []:
-            logger.warn("No elements for ticker.")
+                data_frame = data_frame[data_frame.index < end]
+
+            shard_list.append(data_frame)
+
+        if shard_list == []:
             return None
-        else:
-            return pd.concat(data_frame_list)
+
+        return pd.concat(shard_list)
+
+    def pipeline_requests(self, session, eventQueue, options_list):
+        """Sends a request for each of the options on the same session (each
+        with its own correlation ID) without waiting for the earlier ones to
+        finish, keeping up to bbg_max_pipelined_requests in flight. As
+        responses arrive, they are routed to a separate decoder for each
+        request.
+
+        Parameters
+        ----------
+        session : blpapi.Session
+            Bloomberg session (with //blp/refdata open)
+        eventQueue : blpapi.EventQueue
+            Passed to send_bar_request
+        options_list : OptionsBBG (list)
+            Options for each request
+
+        Returns
+        -------
+        DataFrame (list), int (set)
+            Output of each request, in the same order as options_list (None
+            for any failed requests) and the indices of failed requests
+        """
+        from blpapi import CorrelationId
+
+        constants = DataConstants()
+        logger = LoggerManager().getLogger(__name__)
+
+        data_frame_list = [None] * len(options_list)
+        failed = set()
+
+        pending = collections.deque(enumerate(options_list))
+        in_flight = {}
+
+        def send_next_request():
+            i, options = pending.popleft()
+
+            decoder = self.create_decoder()
+
+            if decoder is None:
+                decoder = BBGMessageDecoder(self)
+
+            in_flight[i] = decoder
+
+            self.send_bar_request(session, eventQueue, options,
+                                  CorrelationId(i))
+
+        while len(pending) > 0 \
+                and len(in_flight) < constants.bbg_max_pipelined_requests:
+            send_next_request()
+
+        logger.info("Waiting for data to be returned...")
+
+        while len(in_flight) > 0:
+            # nextEvent() method can be called with timeout to let
+            # the program catch Ctrl-C between arrivals of new events
+            event = session.nextEvent()  # removed time out
+            event_type = event.eventType()
+
+            # Bloomberg will send us responses in chunks, the last of which
+            # is a RESPONSE (or REQUEST_STATUS if the request failed)
+            if event_type in [blpapi.Event.PARTIAL_RESPONSE,
+                              blpapi.Event.RESPONSE,
+                              blpapi.Event.REQUEST_STATUS]:
+                finished = []
+
+                for msg in event:
+                    i = msg.correlationIds()[0].value()
+
+                    if i not in in_flight:
+                        continue
+
+                    if event_type == blpapi.Event.REQUEST_STATUS:
+                        logger.error("REQUEST FAILED: " + str(msg))
+                        failed.add(i)
+                    elif msg.hasElement(self.RESPONSE_ERROR):
+                        logger.error("REQUEST FAILED: " + str(
+                            msg.getElement(self.RESPONSE_ERROR)))
+                        failed.add(i)
+                    else:
+                        in_flight[i].decode(msg)
+
+                    if event_type != blpapi.Event.PARTIAL_RESPONSE:
+                        finished.append(i)
+
+                for i in finished:
+                    if i in in_flight:
+                        decoder = in_flight.pop(i)
+
+                        if i not in failed:
+                            data_frame_list[i] = decoder.to_data_frame()
+
+                    if len(pending) > 0:
+                        send_next_request()
+
+            elif event_type == blpapi.Event.SESSION_STATUS:
+                for msg in event:
+                    if msg.messageType() == self.SESSION_TERMINATED:
+                        logger.error("Session terminated with "
+                                     + str(len(in_flight) + len(pending))
+                                     + " requests outstanding")
+
+                        failed.update(in_flight.keys())
+                        failed.update([i for i, _ in pending])
+
+                        return data_frame_list, failed
+
+        return data_frame_list, failed
+
+    def create_decoder(self):
+        """Creates a decoder to accumulate all the messages of a request,
+        which has methods decode(msg) and to_data_frame(). If None, each
+        message is instead converted to a DataFrame with process_message.
+
+        Returns
+        -------
+        object
+        """
+        return None
 
     def get_previous_trading_date(self):
         tradedOn = datetime.date.today()
@@ -790,6 +1046,289 @@ class BBGLowLevelTemplate:  # in order that the init function works in
             session = None
 
 
+def shard_cache_key(request_type, options):
+    """Creates a key for the shard cache from the options of an intraday/tick
+    request. Only shards which have completely finished are cached (None
+    otherwise), given later data could still arrive for the others.
+
+    Parameters
+    ----------
+    request_type : str
+        Bloomberg request type
+    options : OptionsBBG
+        Options for the shard
+
+    Returns
+    -------
+    tuple
+    """
+    if DataConstants().bbg_shard_cache_size <= 0:
+        return None
+
+    try:
+        end = pd.Timestamp(options.endDateTime)
+
+        if end.tzinfo is not None:
+            end = end.tz_convert(None)
+
+        if end >= pd.Timestamp.now(tz='UTC').tz_localize(None):
+            return None
+
+        return (request_type, options.security, options.event,
+                options.barInterval, pd.Timestamp(options.startDateTime), end,
+                str(options.overrides))
+    except:
+        return None
+
+
+class BBGMessageDecoder(object):
+    """Default decoder for a request, which converts each message to a
+    DataFrame with process_message from a BBGLowLevelTemplate, and combines
+    them when the response is complete.
+
+    """
+
+    def __init__(self, low_level_loader):
+        self._low_level_loader = low_level_loader
+
+        self._data_frame_list = []
+        self._data_frame_cols = []
+
+    def decode(self, msg):
+        data_frame_slice = self._low_level_loader.process_message(msg)
+
+        # Append DataFrame only if not empty
+        if data_frame_slice is not None:
+            self._data_frame_list.append(
+                self._low_level_loader.combine_slices(
+                    self._data_frame_cols, data_frame_slice))
+
+            # Keep list of columns we've already found (occasionally BBG
+            # seems to return columns more than once?)
+            # (this will fail for intraday time series)
+            try:
+                self._data_frame_cols.append(list(
+                    data_frame_slice.columns.get_level_values(1).values)[0])
+            except:
+                pass
+
+    def to_data_frame(self):
+        data_frame_list = [x for x in self._data_frame_list if x is not None]
+
+        if self._data_frame_cols == [] and data_frame_list != []:
+            # intraday case
+            return pd.concat(data_frame_list)
+
+        # daily frequencies
+        return Calculations().join(data_frame_list, how='outer')
+
+
+class BBGDailyDecoder(object):
+    """Decodes the messages of a Bloomberg HistoricalDataResponse straight
+    into numpy arrays, one per field for each security, sized from the number
+    of dates in the message. A single DataFrame is only created at the end
+    from all the arrays (rather than building dicts for every date and field).
+
+    """
+
+    def __init__(self):
+        # ticker -> (dates, {field name: values})
+        self._securities = {}
+
+    def decode(self, msg):
+        logger = LoggerManager().getLogger(__name__)
+
+        security_data = msg.getElement('securityData')
+        ticker = security_data.getElement('security').getValue()
+
+        if security_data.hasElement('securityError'):
+            logger.error("Security error for " + ticker + ": " + str(
+                security_data.getElement('securityError')))
+
+            return
+
+        # Occasionally BBG seems to return a security more than once
+        if ticker in self._securities:
+            return
+
+        field_data = security_data.getElement('fieldData')
+
+        rows = field_data.numValues()
+
+        dates = np.empty(rows, dtype='datetime64[ns]')
+        columns = {}
+
+        numeric_datatypes = self._get_numeric_datatypes()
+
+        for i in range(rows):
+            mini_field_data = field_data.getValue(i)
+            dates[i] = mini_field_data.getElement(0).getValue()
+
+            # Careful, not all the fields will be returned for every date
+            for j in range(1, mini_field_data.numElements()):
+                field_value = mini_field_data.getElement(j)
+                name = field_value.name()
+
+                values = columns.get(name)
+
+                if values is None:
+                    # Bloomberg has the same datatype for a field on every
+                    # date, so we can use it to choose the dtype (strings
+                    # like "0001" must stay as strings)
+                    if field_value.datatype() in numeric_datatypes:
+                        values = np.full(rows, np.nan)
+                    else:
+                        values = np.full(rows, np.nan, dtype=object)
+
+                    columns[name] = values
+
+                values[i] = field_value.getValue()
+
+        if rows > 0:
+            logger.info("Read: " + ticker + ' ' + str(pd.Timestamp(dates[0]))
+                        + ' - ' + str(pd.Timestamp(dates[-1])))
+
+        self._securities[ticker] = (dates, columns)
+
+    def _get_numeric_datatypes(self):
+        # Fields with these datatypes are stored as floats (with NaN for
+        # dates where they're missing), everything else as objects
+        return (blpapi.DataType.FLOAT32, blpapi.DataType.FLOAT64,
+                blpapi.DataType.INT32, blpapi.DataType.INT64)
+
+    def to_data_frame(self):
+        """Creates a DataFrame from all the decoded messages, with
+        (field, ticker) columns
+
+        Returns
+        -------
+        DataFrame
+        """
+        data_frame_list = []
+
+        for ticker, (dates, columns) in self._securities.items():
+            # If obsolete ticker could return no values
+            if columns == {}:
+                continue
+
+            data_frame_list.append(pd.DataFrame(
+                {(str(name), ticker): values for name, values in
+                 columns.items()}, index=pd.DatetimeIndex(dates)))
+
+        return Calculations().join(data_frame_list, how='outer')
+
+
+class BBGIntradayDecoder(object):
+    """Decodes the messages of a Bloomberg IntradayBarResponse in a single
+    pass into pre-allocated numpy arrays (sized from the number of bars in
+    each message), for the times and each field. The times are only converted
+    to a DatetimeIndex in bulk at the end, when creating the DataFrame.
+
+    """
+
+    # Elements to get to the list of bars (or ticks)
+    data_elements = ['barData', 'barTickData']
+
+    # (column, element name, getter, dtype) for each field
+    fields = [('open', 'open', 'getElementAsFloat', np.float64),
+              ('high', 'high', 'getElementAsFloat', np.float64),
+              ('low', 'low', 'getElementAsFloat', np.float64),
+              ('close', 'close', 'getElementAsFloat', np.float64),
+              ('volume', 'volume', 'getElementAsInteger', np.int64),
+              ('events', 'numEvents', 'getElementAsInteger', np.int64)]
+
+    def __init__(self, names=None):
+        """Creates a decoder for the messages of a single request
+
+        Parameters
+        ----------
+        names : dict
+            blpapi.Name for each element name (eg. {'time': blpapi.Name(
+            'time')}), so elements are looked up without creating a new Name
+            for every call (elements missing from names are looked up by
+            their string name)
+        """
+        if names is None:
+            names = {}
+
+        self._data_elements = [names.get(name, name)
+                               for name in self.data_elements]
+
+        self._get_time = methodcaller('getElementAsDatetime',
+                                      names.get('time', 'time'))
+        self._getters = [methodcaller(getter, names.get(name, name))
+                         for _, name, getter, _ in self.fields]
+
+        self._times = []
+        self._values = [[] for _ in self.fields]
+
+    def decode(self, msg):
+        logger = LoggerManager().getLogger(__name__)
+
+        data = msg
+
+        for name in self._data_elements:
+            data = data.getElement(name)
+
+        rows = data.numValues()
+
+        if rows == 0:
+            logger.info("No dates retrieved")
+
+            return
+
+        times = np.empty(rows, dtype=object)
+        values = [np.empty(rows, dtype=dtype) for _, _, _, dtype in
+                  self.fields]
+
+        getters = list(zip(values, self._getters))
+        get_time = self._get_time
+
+        for i in range(rows):
+            item = data.getValue(i)
+            times[i] = get_time(item)
+
+            for array, getter in getters:
+                array[i] = getter(item)
+
+        logger.info("Dates between " + str(times[0]) + " - "
+                    + str(times[-1]))
+
+        self._times.append(times)
+
+        for values_list, array in zip(self._values, values):
+            values_list.append(array)
+
+    def to_data_frame(self):
+        """Creates a DataFrame from all the decoded messages
+
+        Returns
+        -------
+        DataFrame
+        """
+        if self._times == []:
+            return None
+
+        index = pd.to_datetime(np.concatenate(self._times))
+
+        return pd.DataFrame(
+            {column: np.concatenate(values_list) for (column, _, _, _),
+             values_list in zip(self.fields, self._values)}, index=index)
+
+
+class BBGTickDecoder(BBGIntradayDecoder):
+    """Decodes the messages of a Bloomberg IntradayTickResponse into numpy
+    arrays (see BBGIntradayDecoder).
+
+    """
+
+    data_elements = ['tickData', 'tickData']
+
+    # Note, we are skipping trade & condition code fields
+    fields = [('close', 'value', 'getElementAsFloat', np.float64),
+              ('ticksize', 'size', 'getElementAsInteger', np.int64)]
+
+
 class BBGLowLevelDaily(BBGLowLevelTemplate):
 
     def __init__(self):
@@ -903,62 +1442,43 @@ class BBGLowLevelDaily(BBGLowLevelTemplate):
         else:
             options.security = md_request.tickers
 
-            return options
+        # Split up very large requests into several smaller ones, which are
+        # then pipelined on the same session
+        max_securities = constants.bbg_max_securities_per_request
 
-        if len(options_list) == 1:
-            return options_list[0]
-
-        return options_list
+        if max_securities is not None:
+            if options_list == []:
+                options_list = [options]
 
-    def process_message(self, msg):
+            split_options_list = []
 
-        constants = DataConstants()
-        # Process received events
-
-        # SLOW loop (careful, not all the fields will be returned every time
-        # hence need to include the field name in the tuple)
-        # perhaps try to run in parallel?
-        logger = LoggerManager().getLogger(__name__)
+            for op in options_list:
+                if op.security is None or len(op.security) <= max_securities:
+                    split_options_list.append(op)
+                    continue
 
+                for i in range(0, len(op.security), max_securities):
+                    curr_options = OptionsBBG(options_bbg=op)
+                    curr_options.security = op.security[i:i + max_securities]
 
-        ticker = msg.getElement('securityData').getElement(
-            'security').getValue()
-        fieldData = msg.getElement('securityData').getElement('fieldData')
+                    split_options_list.append(curr_options)
 
-        data = defaultdict(dict)
+            options_list = split_options_list
 
-        # FASTER avoid calling getValue/getElement methods in blpapi,
-        # very slow, better to cache variables
-        for i in range(fieldData.numValues()):
-            mini_field_data = fieldData.getValue(i)
-            date = mini_field_data.getElement(0).getValue()
-
-            for j in range(1, mini_field_data.numElements()):
-                field_value = mini_field_data.getElement(j)
-
-                data[(str(field_value.name()), ticker)][
-                    date] = field_value.getValue()
+        if len(options_list) == 1:
+            return options_list[0]
 
-        # ORIGINAL repeated calling getValue/getElement much slower
-        # for i in range(fieldData.numValues()):
-        #     for j in range(1, fieldData.getValue(i).numElements()):
-        #         data[(str(fieldData.getValue(i).getElement(j).name()),
-        #         ticker)][fieldData.getValue(i).getElement(0).getValue()] \
-        #             = fieldData.getValue(i).getElement(j).getValue()
+        return options_list
 
-        data_frame = pd.DataFrame(data)
+    def create_decoder(self):
+        return BBGDailyDecoder()
 
-        # If obsolete ticker could return no values
-        if data_frame.empty:
-            return None
-        else:
-            # data_frame.columns = pd.MultiIndex.from_tuples(data,
-            # names=['field', 'ticker'])
-            data_frame.index = pd.to_datetime(data_frame.index)
-            logger.info("Read: " + ticker + ' ' + str(
-                data_frame.index.min()) + ' - ' + str(data_frame.index.max()))
+    def process_message(self, msg):
+        # Process received events (for a single message)
+        decoder = BBGDailyDecoder()
+        decoder.decode(msg)
 
-        return data_frame
+        return decoder.to_data_frame()
 
     # Create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -984,11 +1504,324 @@ class BBGLowLevelDaily(BBGLowLevelTemplate):
         session.sendRequest(request=request, correlationId=cid)
 
 
+class BBGRefDataCache(object):
+    """Caches Bloomberg reference data (BDP/BDS) for each ticker and field,
+    for as long as the TTL of the field in DataConstants.bbg_ref_field_ttl_seconds
+    (fields which aren't listed there are never cached). The cache is shared
+    by the whole process, and if DataConstants.bbg_ref_cache_folder is set, it
+    is also persisted to disk, so it can be reused by later sessions (as JSON
+    which only the current user can write, see findatapy.util.privatejson).
+
+    """
+
+    # (ticker, field, context) -> (expiry time, values or None if Bloomberg
+    # didn't return anything)
+    _cache = {}
+    _cache_lock = threading.RLock()
+    _loaded_path = None
+
+    # Whether the cache has changed since it was last written to disk
+    _dirty = False
+
+    def _get_path(self):
+        folder = DataConstants().bbg_ref_cache_folder
+
+        if folder is None:
+            return None
+
+        return os.path.join(folder, 'bbg_ref_cache.json')
+
+    def _load(self):
+        # Lazily load the cache from disk the first time we need it (only if
+        # no other user could have written it)
+        path = self._get_path()
+
+        if path is None or path == BBGRefDataCache._loaded_path:
+            return
+
+        BBGRefDataCache._loaded_path = path
+
+        try:
+            entries = read_private_json(path)
+        except Exception as e:
+            LoggerManager().getLogger(__name__).warning(
+                "Couldn't read reference data cache " + path + ": " + str(e))
+
+            return
+
+        if entries is not None:
+            # JSON has lists instead of tuples for the keys
+            for (ticker, field, context), expiry, values in entries:
+                BBGRefDataCache._cache[(ticker, field, tuple(context))] = \
+                    (expiry, values)
+
+    def _save(self):
+        path = self._get_path()
+
+        if path is None:
+            return
+
+        now = time.time()
+
+        write_private_json(path, [[list(k), v[0], v[1]] for k, v in
+                                  BBGRefDataCache._cache.items()
+                                  if v[0] > now])
+
+    def create_context(self, md_request):
+        """Creates the part of the cache key which depends on the request
+        (rather than the ticker/field), ie. the dates and the overrides (the
+        dates are only used for fields in
+        DataConstants.bbg_ref_date_dependent_fields)
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Reference data request
+
+        Returns
+        -------
+        tuple
+        """
+        def to_date_str(date):
+            try:
+                return pd.Timestamp(date).strftime('%Y%m%d')
+            except:
+                return str(date)
+
+        return (to_date_str(md_request.start_date),
+                to_date_str(md_request.finish_date),
+                str(md_request.overrides))
+
+    def _get_key(self, ticker, field, context, date_dependent_fields):
+        if field in date_dependent_fields:
+            return (ticker, field, context)
+
+        # Only the overrides
+        return (ticker, field, context[2:])
+
+    def get(self, tickers, fields, context):
+        """Gets any reference data in the cache, which hasn't expired yet
+
+        Parameters
+        ----------
+        tickers : str (list)
+            Bloomberg tickers
+        fields : str (list)
+            Bloomberg fields
+        context : tuple
+            Output of create_context
+
+        Returns
+        -------
+        dict, str (list), str (list)
+            Cached values for (field, ticker), and the tickers/fields which
+            are missing from the cache
+        """
+        constants = DataConstants()
+
+        ttl_dict = constants.bbg_ref_field_ttl_seconds
+        date_dependent_fields = constants.bbg_ref_date_dependent_fields
+
+        cached = {}
+        missing_tickers = set()
+        missing_fields = set()
+
+        now = time.time()
+
+        with BBGRefDataCache._cache_lock:
+            self._load()
+
+            for field in fields:
+                for ticker in tickers:
+                    entry = None
+
+                    if field in ttl_dict:
+                        entry = BBGRefDataCache._cache.get(self._get_key(
+                            ticker, field, context, date_dependent_fields))
+
+                    if entry is None or entry[0] <= now:
+                        missing_tickers.add(ticker)
+                        missing_fields.add(field)
+                    elif entry[1] is not None:
+                        cached[(field, ticker)] = entry[1]
+
+        # Keep the same order as requested
+        missing_tickers = [t for t in tickers if t in missing_tickers]
+        missing_fields = [f for f in fields if f in missing_fields]
+
+        return cached, missing_tickers, missing_fields
+
+    def put(self, data_frame, tickers, fields, context):
+        """Adds downloaded reference data to the cache (only for those fields
+        with a TTL). Tickers/fields which were requested, but not returned,
+        are only cached for DataConstants.bbg_ref_missing_ttl_seconds. The
+        cache is only written to disk when calling flush, so it can be
+        written once for a whole batch.
+
+        Parameters
+        ----------
+        data_frame : DataFrame
+            Reference data with (field, ticker) columns
+        tickers : str (list)
+            Tickers which were requested
+        fields : str (list)
+            Fields which were requested
+        context : tuple
+            Output of create_context
+        """
+        constants = DataConstants()
+
+        ttl_dict = constants.bbg_ref_field_ttl_seconds
+        date_dependent_fields = constants.bbg_ref_date_dependent_fields
+
+        fields = [f for f in fields if f in ttl_dict]
+
+        if fields == []:
+            return
+
+        returned = {}
+
+        if data_frame is not None:
+            for col in data_frame.columns:
+                returned[col] = data_frame[col].dropna()
+
+        now = time.time()
+
+        with BBGRefDataCache._cache_lock:
+            self._load()
+
+            for field in fields:
+                expiry = now + ttl_dict[field]
+                missing_expiry = now + min(
+                    ttl_dict[field], constants.bbg_ref_missing_ttl_seconds)
+
+                for ticker in tickers:
+                    values = returned.get((field, ticker))
+
+                    BBGRefDataCache._cache[self._get_key(
+                        ticker, field, context, date_dependent_fields)] = \
+                        (expiry if values is not None else missing_expiry,
+                         values)
+
+            BBGRefDataCache._dirty = True
+
+    def flush(self):
+        """Writes the cache to disk (if DataConstants.bbg_ref_cache_folder is
+        set), if it has changed since it was last written
+        """
+        with BBGRefDataCache._cache_lock:
+            if not BBGRefDataCache._dirty:
+                return
+
+            try:
+                self._save()
+
+                BBGRefDataCache._dirty = False
+            except Exception as e:
+                LoggerManager().getLogger(__name__).warning(
+                    "Couldn't write reference data cache: " + str(e))
+
+    def invalidate(self, tickers=None, fields=None):
+        """Removes reference data from the cache (in memory and on disk)
+
+        Parameters
+        ----------
+        tickers : str (list)
+            Bloomberg tickers to remove (default: all)
+        fields : str (list)
+            Bloomberg fields to remove (default: all)
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        if isinstance(fields, str):
+            fields = [fields]
+
+        with BBGRefDataCache._cache_lock:
+            self._load()
+
+            if tickers is None and fields is None:
+                BBGRefDataCache._cache.clear()
+            else:
+                for key in list(BBGRefDataCache._cache.keys()):
+                    if (tickers is None or key[0] in tickers) and \
+                            (fields is None or key[1] in fields):
+                        del BBGRefDataCache._cache[key]
+
+            BBGRefDataCache._dirty = True
+
+        self.flush()
+
+
 class BBGLowLevelRef(BBGLowLevelTemplate):
 
     def __init__(self):
         super(BBGLowLevelRef, self).__init__()
 
+    def load_time_series(self, md_request):
+        """Downloads reference data, taking any (ticker, field) we have
+        downloaded recently from BBGRefDataCache, and sending a single request
+        to Bloomberg for all the tickers/fields missing from the cache.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Reference data request (with Bloomberg tickers/fields)
+
+        Returns
+        -------
+        DataFrame
+        """
+        ref_data_cache = BBGRefDataCache()
+
+        tickers = md_request.tickers
+        fields = md_request.fields
+
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        if isinstance(fields, str):
+            fields = [fields]
+
+        context = ref_data_cache.create_context(md_request)
+
+        cached, missing_tickers, missing_fields = ref_data_cache.get(
+            tickers, fields, context)
+
+        data_frame = None
+
+        if missing_tickers != []:
+            LoggerManager().getLogger(__name__).info(
+                "Reference data cache has " + str(len(cached))
+                + " values, downloading " + str(len(missing_fields))
+                + " fields for " + str(len(missing_tickers)) + " tickers")
+
+            md_request_missing = copy.copy(md_request)
+            md_request_missing.tickers = missing_tickers
+            md_request_missing.fields = missing_fields
+
+            data_frame = super(BBGLowLevelRef, self).load_time_series(
+                md_request_missing)
+
+            ref_data_cache.put(data_frame, missing_tickers, missing_fields,
+                               context)
+            ref_data_cache.flush()
+
+        if cached == {}:
+            return data_frame
+
+        cached = pd.DataFrame(cached)
+
+        if data_frame is None or data_frame.empty:
+            return cached
+
+        # We might have downloaded some of the cached values again (when a
+        # ticker was missing for other fields)
+        cached = cached[[c for c in cached.columns
+                         if c not in data_frame.columns]]
+
+        return pd.concat([data_frame, cached], axis=1)
+
     # Populate options for Bloomberg request for reference request
     def fill_options(self, md_request):
         options = OptionsBBG()
@@ -1119,12 +1952,26 @@ class BBGLowLevelIntraday(BBGLowLevelTemplate):
         self.NUM_EVENTS = blpapi.Name("numEvents")
         self.TIME = blpapi.Name("time")
 
+        # Names of the elements read by BBGIntradayDecoder
+        self._decoder_names = {
+            str(name): name for name in
+            [self.BAR_DATA, self.BAR_TICK_DATA, self.OPEN, self.HIGH,
+             self.LOW, self.CLOSE, self.VOLUME, self.NUM_EVENTS, self.TIME]}
+
     def combine_slices(self, data_frame_cols, data_frame_slice):
         # return data_frame.append(data_frame_slice)
         return data_frame_slice
 
+    def combine_data_frames(self, options_list, data_frame_list):
+        return self.combine_shards(options_list, data_frame_list)
+
+    def shard_cache_key(self, options):
+        return shard_cache_key("IntradayBarRequest", options)
+
     # Populate options for Bloomberg request for asset intraday request
     def fill_options(self, md_request):
+        constants = DataConstants()
+
         options = OptionsBBG()
 
         options.security = md_request.tickers[
@@ -1143,40 +1990,21 @@ class BBGLowLevelIntraday(BBGLowLevelTemplate):
         if hasattr(options.endDateTime, 'microsecond'):
             options.endDateTime = options.endDateTime.replace(microsecond=0)
 
-        return options
+        # Split long requests into shards (barInterval is in minutes)
+        return self.shard_options(
+            options, 1.0 / max(options.barInterval, 1),
+            constants.bbg_max_shard_rows['intraday'])
+
+    def create_decoder(self):
+        return BBGIntradayDecoder(names=self._decoder_names)
 
     # iterate through Bloomberg output creating a DataFrame output
     # implements abstract method
     def process_message(self, msg):
-        data = msg.getElement(self.BAR_DATA).getElement(self.BAR_TICK_DATA)
-
-        logger = LoggerManager().getLogger(__name__)
+        decoder = self.create_decoder()
+        decoder.decode(msg)
 
-        data_vals = list(data.values())
-
-        # Each price time point has multiple fields - marginally quicker
-        tuple = [([bar.getElementAsFloat(self.OPEN),
-                   bar.getElementAsFloat(self.HIGH),
-                   bar.getElementAsFloat(self.LOW),
-                   bar.getElementAsFloat(self.CLOSE),
-                   bar.getElementAsInteger(self.VOLUME),
-                   bar.getElementAsInteger(self.NUM_EVENTS)],
-                   bar.getElementAsDatetime(self.TIME)) for bar in data_vals]
-
-        data_table = list(map(itemgetter(0), tuple))
-        time_list = list(map(itemgetter(1), tuple))
-
-        try:
-            logger.info("Dates between " + str(time_list[0]) + " - " + str(
-                time_list[-1]))
-        except:
-            logger.info("No dates retrieved")
-            return None
-
-        # create pandas dataframe with the Bloomberg output
-        return pd.DataFrame(data=data_table, index=time_list,
-                            columns=["open", "high", "low", "close", "volume",
-                                     "events"])
+        return decoder.to_data_frame()
 
     # Implement abstract method: create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -1213,22 +2041,29 @@ class BBGLowLevelTick(BBGLowLevelTemplate):
 
         # constants
         self.TICK_DATA = blpapi.Name("tickData")
-        self.COND_CODE = blpapi.Name("conditionCodes")
         self.TICK_SIZE = blpapi.Name("size")
         self.TIME = blpapi.Name("time")
-        self.TYPE = blpapi.Name("type")
         self.VALUE = blpapi.Name("value")
-        self.RESPONSE_ERROR = blpapi.Name("responseError")
-        self.CATEGORY = blpapi.Name("category")
-        self.MESSAGE = blpapi.Name("message")
-        self.SESSION_TERMINATED = blpapi.Name("SessionTerminated")
+
+        # Names of the elements read by BBGTickDecoder
+        self._decoder_names = {
+            str(name): name for name in
+            [self.TICK_DATA, self.TICK_SIZE, self.TIME, self.VALUE]}
 
     def combine_slices(self, data_frame, data_frame_slice):
         # return data_frame.append(data_frame_slice)
         return data_frame_slice
 
+    def combine_data_frames(self, options_list, data_frame_list):
+        return self.combine_shards(options_list, data_frame_list)
+
+    def shard_cache_key(self, options):
+        return shard_cache_key("IntradayTickRequest", options)
+
     # Populate options for Bloomberg request for asset intraday request
     def fill_options(self, md_request):
+        constants = DataConstants()
+
         options = OptionsBBG()
 
         options.security = md_request.tickers[
@@ -1246,47 +2081,20 @@ class BBGLowLevelTick(BBGLowLevelTemplate):
         if hasattr(options.endDateTime, "microsecond"):
             options.endDateTime = options.endDateTime.replace(microsecond=0)
 
-        return options
+        # Split long requests into shards
+        return self.shard_options(options, constants.bbg_tick_rows_per_minute,
+                                  constants.bbg_max_shard_rows['tick'])
+
+    def create_decoder(self):
+        return BBGTickDecoder(names=self._decoder_names)
 
     # iterate through Bloomberg output creating a DataFrame output
     # implements abstract method
     def process_message(self, msg):
-        data = msg.getElement(self.TICK_DATA).getElement(self.TICK_DATA)
-        logger = LoggerManager().getLogger(__name__)
-
-        #  logger.info("Processing tick data for " + str(self._options.security))
-
-        data_vals = data.values()
-
-        # for item in list(data_vals):
-        #     if item.hasElement(self.COND_CODE):
-        #         cc = item.getElementAsString(self.COND_CODE)
-        #     else:
-        #         cc = ""
-        #
-        #     # each price time point has multiple fields - marginally quicker
-        #     tuple.append(([item.getElementAsFloat(self.VALUE),
-        #                     item.getElementAsInteger(self.TICK_SIZE)],
-        #                     item.getElementAsDatetime(self.TIME)))
-
-        # slightly faster this way (note, we are skipping trade & CC fields)
-        tuple = [([item.getElementAsFloat(self.VALUE),
-                   item.getElementAsInteger(self.TICK_SIZE)],
-                  item.getElementAsDatetime(self.TIME)) for item in data_vals]
-
-        data_table = list(map(itemgetter(0), tuple))
-        time_list = list(map(itemgetter(1), tuple))
-
-        try:
-            logger.info("Dates between " + str(time_list[0]) + " - " + str(
-                time_list[-1]))
-        except:
-            logger.info("No dates retrieved")
-            return None
+        decoder = self.create_decoder()
+        decoder.decode(msg)
 
-        # create pandas dataframe with the Bloomberg output
-        return pd.DataFrame(data=data_table, index=time_list,
-                            columns=["close", "ticksize"])
+        return decoder.to_data_frame()
 
     # Implement abstract method: create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -0,0 +1,162 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import importlib
+import threading
+
+from findatapy.util.loggermanager import LoggerManager
+
+
+class DataVendorRegistry(object):
+    """Registry of the DataVendor class for each data_source eg.
+    "bloomberg". Classes are stored as "module:class" strings, and their
+    modules are only imported the first time we need them, so we don't pay
+    for importing every vendor's libraries up front.
+
+    Other packages can add their own data vendors through the
+    "findatapy.data_vendors" entry point group in their package metadata eg.
+
+        entry_points={"findatapy.data_vendors":
+            ["mydata = mypackage.datavendormydata:DataVendorMyData"]}
+
+    and they can also be added at runtime with DataVendorRegistry.register.
+    """
+
+    entry_point_group = "findatapy.data_vendors"
+
+    _data_vendors = {
+        "bloomberg": "findatapy.market.datavendorbbg:DataVendorBBGOpen",
+        "quandl": "findatapy.market.datavendorweb:DataVendorQuandl",
+        "eikon": "findatapy.market.datavendorweb:DataVendorEikon",
+        "ons": "findatapy.market.datavendorweb:DataVendorONS",
+        "boe": "findatapy.market.datavendorweb:DataVendorBOE",
+        "dukascopy": "findatapy.market.datavendorweb:DataVendorDukasCopy",
+        "fxcm": "findatapy.market.datavendorweb:DataVendorFXCM",
+        "alfred": "findatapy.market.datavendorweb:DataVendorALFRED",
+        "yahoo": "findatapy.market.datavendorweb:DataVendorYahoo",
+        "google": "findatapy.market.datavendorweb:DataVendorPandasWeb",
+        "fred": "findatapy.market.datavendorweb:DataVendorPandasWeb",
+        "oecd": "findatapy.market.datavendorweb:DataVendorPandasWeb",
+        "eurostat": "findatapy.market.datavendorweb:DataVendorPandasWeb",
+        "edgar-index": "findatapy.market.datavendorweb:DataVendorPandasWeb",
+        "bitcoincharts":
+            "findatapy.market.datavendorweb:DataVendorBitcoincharts",
+        "poloniex": "findatapy.market.datavendorweb:DataVendorPoloniex",
+        "binance": "findatapy.market.datavendorweb:DataVendorBinance",
+        "bitfinex": "findatapy.market.datavendorweb:DataVendorBitfinex",
+        "gdax": "findatapy.market.datavendorweb:DataVendorGdax",
+        "kraken": "findatapy.market.datavendorweb:DataVendorKraken",
+        "bitmex": "findatapy.market.datavendorweb:DataVendorBitmex",
+        "alphavantage":
+            "findatapy.market.datavendorweb:DataVendorAlphaVantage",
+        "huobi": "findatapy.market.datavendorweb:DataVendorHuobi",
+        "flatfile": "findatapy.market.datavendorweb:DataVendorFlatFile",
+    }
+
+    _entry_points_loaded = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def register(data_source, data_vendor):
+        """Registers a DataVendor for a data_source (replacing any existing
+        one)
+
+        Parameters
+        ----------
+        data_source : str
+            Data source eg. "bloomberg"
+        data_vendor : str or class
+            DataVendor class, or "module:class" string to import it lazily
+        """
+        with DataVendorRegistry._lock:
+            DataVendorRegistry._data_vendors[data_source] = data_vendor
+
+    @staticmethod
+    def get_data_sources():
+        """Gets all the data sources with a registered DataVendor
+
+        Returns
+        -------
+        str (list)
+        """
+        DataVendorRegistry._load_entry_points()
+
+        return list(DataVendorRegistry._data_vendors.keys())
+
+    @staticmethod
+    def get_data_vendor_class(data_source):
+        """Gets the DataVendor class for a data_source, importing its
+        module if it hasn't been imported yet
+
+        Parameters
+        ----------
+        data_source : str
+            Data source eg. "bloomberg"
+
+        Returns
+        -------
+        class
+            DataVendor class (or None if data_source hasn't been registered)
+        """
+        DataVendorRegistry._load_entry_points()
+
+        data_vendor = DataVendorRegistry._data_vendors.get(data_source)
+
+        if data_vendor is None or not isinstance(data_vendor, str):
+            return data_vendor
+
+        module_name, class_name = data_vendor.split(":")
+
+        data_vendor = getattr(importlib.import_module(module_name),
+                              class_name)
+
+        with DataVendorRegistry._lock:
+            DataVendorRegistry._data_vendors[data_source] = data_vendor
+
+        return data_vendor
+
+    @staticmethod
+    def _load_entry_points():
+        if DataVendorRegistry._entry_points_loaded:
+            return
+
+        with DataVendorRegistry._lock:
+            if DataVendorRegistry._entry_points_loaded:
+                return
+
+            DataVendorRegistry._entry_points_loaded = True
+
+            try:
+                from importlib.metadata import entry_points
+
+                try:
+                    eps = entry_points(
+                        group=DataVendorRegistry.entry_point_group)
+                except TypeError:
+                    # Older versions of Python return a dict of groups
+                    eps = entry_points().get(
+                        DataVendorRegistry.entry_point_group, [])
+            except Exception as e:
+                LoggerManager().getLogger(__name__).warning(
+                    "Couldn't load data vendor entry points: " + str(e))
+
+                return
+
+            # Don't replace the data vendors which come with findatapy
+            for ep in eps:
+                if ep.name not in DataVendorRegistry._data_vendors:
+                    DataVendorRegistry._data_vendors[ep.name] = ep.value
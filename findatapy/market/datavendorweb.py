@@ -42,18 +42,18 @@ from datetime import timedelta
 import time as time_library
 import re
 import concurrent.futures
+import threading
 
 import requests
 
 import pandas as pd
 import numpy as np
 
+from findatapy.util.lazymodule import lazy_import
+
 # support Quandl 3.x.x
-try:
-    import quandl as Quandl
-except:
-    # if import fails use Quandl 2.x.x
-    import Quandl
+# if import fails use Quandl 2.x.x
+Quandl = lazy_import("quandl", "Quandl")
 
 from findatapy.market import IOEngine
 
@@ -69,6 +69,8 @@ class DataVendorQuandl(DataVendor):
 
     """
 
+    credential_attributes = ["quandl_api_key"]
+
     def __init__(self):
         super(DataVendorQuandl, self).__init__()
 
@@ -199,6 +201,8 @@ class DataVendorEikon(DataVendor):
 
     """
 
+    credential_attributes = ["eikon_api_key"]
+
     def __init__(self):
         super(DataVendorEikon, self).__init__()
 
@@ -324,9 +328,41 @@ class DataVendorALFRED(DataVendor):
 
     """
 
+    credential_attributes = ["fred_api_key"]
+
     def __init__(self):
         super(DataVendorALFRED, self).__init__()
 
+        self._fred = None
+        self._fred_lock = threading.Lock()
+        self._reuse_fred = False
+
+    def open(self):
+        # Keep the same Fred client (and its pool of HTTP connections) for
+        # every request, rather than opening new connections each time
+        self._reuse_fred = True
+
+    def close(self):
+        with self._fred_lock:
+            self._reuse_fred = False
+
+            if self._fred is not None:
+                self._fred.close()
+                self._fred = None
+
+    def _get_fred(self, md_request):
+        """Gets the Fred client for a request, and whether it should be
+        closed afterwards (ie. if it's not being kept for later requests)
+        """
+        with self._fred_lock:
+            if not self._reuse_fred:
+                return Fred(api_key=md_request.fred_api_key), True
+
+            if self._fred is None:
+                self._fred = Fred(api_key=md_request.fred_api_key)
+
+            return self._fred, False
+
     # implement method in abstract superclass
     def load_ticker(self, md_request):
         logger = LoggerManager().getLogger(__name__)
@@ -374,178 +410,233 @@ class DataVendorALFRED(DataVendor):
         return data_frame
 
     def download_daily(self, md_request):
-        logger = LoggerManager().getLogger(__name__)
+        """Downloads every ticker in the request from ALFRED/FRED in parallel
+        threads, which all share a single Fred client (and hence a single
+        pooled HTTP session). Each ticker keeps its own retry count, so a
+        flaky series won't use up the attempts of the other tickers.
 
-        trials = 0
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Vendor request with ALFRED/FRED tickers and fields
 
-        data_frame_list = []
-        data_frame_release = []
+        Returns
+        -------
+        DataFrame
+        """
+        fred, close_fred = self._get_fred(md_request)
 
-        # TODO refactor this code, a bit messy at the moment!
-        for i in range(0, len(md_request.tickers)):
-            while (trials < 5):
-                try:
-                    fred = Fred(api_key=md_request.fred_api_key)
-
-                    # acceptable fields: close, actual-release,
-                    # release-date-time-full
-                    if 'close' in md_request.fields and \
-                            'release-date-time-full' in md_request.fields:
-                        data_frame = fred.get_series_all_releases(
-                            md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame.rename(
-                            columns={
-                                "realtime_start":
-                                    md_request.tickers[
-                                                      i]
-                                    + '.release-date-time-full',
-                                "date": "Date",
-                                "value": md_request.tickers[
-                                             i] + '.close'})
-
-                        data_frame = data_frame.sort_values(
-                            by=['Date', md_request.tickers[
-                                i] + '.release-date-time-full'])
-                        data_frame = data_frame.drop_duplicates(
-                            subset=['Date'], keep='last')
-                        data_frame = data_frame.set_index(['Date'])
-
-                        filter = Filter()
-                        data_frame = filter.filter_time_series_by_date(
-                            md_request.start_date,
-                            md_request.finish_date, data_frame)
-
-                        data_frame_list.append(data_frame)
-                    elif 'close' in md_request.fields:
-
-                        data_frame = fred.get_series(
-                            series_id=md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame.to_frame(
-                            name=md_request.tickers[i] + '.close')
-                        data_frame.index.name = 'Date'
-
-                        data_frame_list.append(data_frame)
-
-                    if 'first-revision' in md_request.fields:
-                        data_frame = fred.get_series_first_revision(
-                            md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame.to_frame(
-                            name=md_request.tickers[
-                                     i] + '.first-revision')
-                        data_frame.index.name = 'Date'
-
-                        filter = Filter()
-                        data_frame = filter.filter_time_series_by_date(
-                            md_request.start_date,
-                            md_request.finish_date, data_frame)
-
-                        data_frame_list.append(data_frame)
-
-                    if 'actual-release' in md_request.fields and \
-                            'release-date-time-full' in md_request.fields:
-                        data_frame = fred.get_series_all_releases(
-                            md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame.rename(
-                            columns={
-                                "realtime_start": md_request.tickers[
-                                                      i]
-                                                  + '.release-date-time-full',
-                                "date": "Date",
-                                "value": md_request.tickers[
-                                             i] + '.actual-release'})
-
-                        data_frame = data_frame.sort_values(
-                            by=['Date', md_request.tickers[
-                                i] + '.release-date-time-full'])
-                        data_frame = data_frame.drop_duplicates(
-                            subset=['Date'], keep='first')
-                        data_frame = data_frame.set_index(['Date'])
-
-                        filter = Filter()
-                        data_frame = filter.filter_time_series_by_date(
-                            md_request.start_date,
-                            md_request.finish_date, data_frame)
-
-                        data_frame_list.append(data_frame)
-
-                    elif 'actual-release' in md_request.fields:
-                        data_frame = fred.get_series_first_release(
-                            md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame.to_frame(
-                            name=md_request.tickers[
-                                     i] + '.actual-release')
-                        data_frame.index.name = 'Date'
-                        # data_frame = data_frame.rename(columns={"value" :
-                        # md_request.tickers[i] + '.actual-release'})
-
-                        filter = Filter()
-                        data_frame = filter.filter_time_series_by_date(
-                            md_request.start_date,
-                            md_request.finish_date, data_frame)
-
-                        data_frame_list.append(data_frame)
-
-                    elif 'release-date-time-full' in md_request.fields:
-                        data_frame = fred.get_series_all_releases(
-                            md_request.tickers[i],
-                            observation_start=md_request.start_date,
-                            observation_end=md_request.finish_date)
-
-                        data_frame = data_frame['realtime_start']
-
-                        data_frame = data_frame.to_frame(
-                            name=md_request.tickers[
-                                     i] + '.release-date-time-full')
-
-                        data_frame.index = data_frame[
-                            md_request.tickers[
-                                i] + '.release-date-time-full']
-                        data_frame = data_frame.sort_index()
-                        data_frame = data_frame.drop_duplicates()
-
-                        filter = Filter()
-                        data_frame_release.append(
-                            filter.filter_time_series_by_date(
-                                md_request.start_date,
-                                md_request.finish_date,
-                                data_frame))
+        thread_no = max(min(constants.fred_thread_no,
+                            len(md_request.tickers)), 1)
 
-                    break
-                except Exception as e:
-                    trials = trials + 1
-                    logger.info("Attempting... " + str(
-                        trials) + " request to download from ALFRED/FRED"
-                                + str(e))
+        try:
+            if thread_no == 1:
+                result_list = [self._download_ticker_with_retries(
+                    fred, md_request, ticker)
+                    for ticker in md_request.tickers]
+            else:
+                with concurrent.futures.ThreadPoolExecutor(
+                        max_workers=thread_no) as executor:
+                    result_list = list(executor.map(
+                        lambda ticker: self._download_ticker_with_retries(
+                            fred, md_request, ticker),
+                        md_request.tickers))
+        finally:
+            if close_fred:
+                fred.close()
 
-            if trials == 5:
-                logger.error(
-                    "Couldn't download from ALFRED/FRED after several "
-                    "attempts!")
+        data_frame_list = []
+        data_frame_release = []
+
+        # Keep the same ordering as the tickers in the request
+        for df_list, df_release in result_list:
+            data_frame_list.extend(df_list)
+            data_frame_release.extend(df_release)
 
         calc = Calculations()
 
         data_frame1 = calc.join(data_frame_list, how='outer')
         data_frame2 = calc.join(data_frame_release, how='outer')
 
-        data_frame = pandas.concat([data_frame1, data_frame2], axis=1)
+        data_frame = pd.concat([data_frame1, data_frame2], axis=1)
 
         return data_frame
 
+    def _download_ticker_with_retries(self, fred, md_request, ticker):
+        """Downloads a single ALFRED/FRED ticker, retrying with exponential
+        backoff on failure (the retry state is local to this ticker).
+
+        Parameters
+        ----------
+        fred : Fred
+            Client to use for the HTTP calls (shared between threads)
+        md_request : MarketDataRequest
+            Vendor request with the fields we want
+        ticker : str
+            ALFRED/FRED ticker
+
+        Returns
+        -------
+        list(DataFrame), list(DataFrame)
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        for trials in range(1, constants.fred_retries + 1):
+            try:
+                return self._download_ticker(fred, md_request, ticker)
+            except Exception as e:
+                logger.info("Attempting... " + str(trials) +
+                            " request to download " + ticker +
+                            " from ALFRED/FRED " + str(e))
+
+                if trials < constants.fred_retries:
+                    time_library.sleep(constants.fred_retry_backoff_seconds
+                                       * 2 ** (trials - 1))
+
+        logger.error("Couldn't download " + ticker +
+                     " from ALFRED/FRED after several attempts!")
+
+        return [], []
+
+    def _download_ticker(self, fred, md_request, ticker):
+        """Downloads all the requested fields for a single ALFRED/FRED ticker.
+
+        Parameters
+        ----------
+        fred : Fred
+            Client to use for the HTTP calls
+        md_request : MarketDataRequest
+            Vendor request with the fields we want
+        ticker : str
+            ALFRED/FRED ticker
+
+        Returns
+        -------
+        list(DataFrame), list(DataFrame)
+            Time series indexed by observation date, and release dates
+            indexed by release date
+        """
+        data_frame_list = []
+        data_frame_release = []
+
+        filter = Filter()
+
+        # acceptable fields: close, actual-release,
+        # release-date-time-full
+        if 'close' in md_request.fields and \
+                'release-date-time-full' in md_request.fields:
+            data_frame = fred.get_series_all_releases(
+                ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame.rename(
+                columns={
+                    "realtime_start": ticker + '.release-date-time-full',
+                    "date": "Date",
+                    "value": ticker + '.close'})
+
+            data_frame = data_frame.sort_values(
+                by=['Date', ticker + '.release-date-time-full'])
+            data_frame = data_frame.drop_duplicates(
+                subset=['Date'], keep='last')
+            data_frame = data_frame.set_index(['Date'])
+
+            data_frame = filter.filter_time_series_by_date(
+                md_request.start_date,
+                md_request.finish_date, data_frame)
+
+            data_frame_list.append(data_frame)
+        elif 'close' in md_request.fields:
+
+            data_frame = fred.get_series(
+                series_id=ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame.to_frame(name=ticker + '.close')
+            data_frame.index.name = 'Date'
+
+            data_frame_list.append(data_frame)
+
+        if 'first-revision' in md_request.fields:
+            data_frame = fred.get_series_first_revision(
+                ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame.to_frame(name=ticker + '.first-revision')
+            data_frame.index.name = 'Date'
+
+            data_frame = filter.filter_time_series_by_date(
+                md_request.start_date,
+                md_request.finish_date, data_frame)
+
+            data_frame_list.append(data_frame)
+
+        if 'actual-release' in md_request.fields and \
+                'release-date-time-full' in md_request.fields:
+            data_frame = fred.get_series_all_releases(
+                ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame.rename(
+                columns={
+                    "realtime_start": ticker + '.release-date-time-full',
+                    "date": "Date",
+                    "value": ticker + '.actual-release'})
+
+            data_frame = data_frame.sort_values(
+                by=['Date', ticker + '.release-date-time-full'])
+            data_frame = data_frame.drop_duplicates(
+                subset=['Date'], keep='first')
+            data_frame = data_frame.set_index(['Date'])
+
+            data_frame = filter.filter_time_series_by_date(
+                md_request.start_date,
+                md_request.finish_date, data_frame)
+
+            data_frame_list.append(data_frame)
+
+        elif 'actual-release' in md_request.fields:
+            data_frame = fred.get_series_first_release(
+                ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame.to_frame(name=ticker + '.actual-release')
+            data_frame.index.name = 'Date'
+
+            data_frame = filter.filter_time_series_by_date(
+                md_request.start_date,
+                md_request.finish_date, data_frame)
+
+            data_frame_list.append(data_frame)
+
+        elif 'release-date-time-full' in md_request.fields:
+            data_frame = fred.get_series_all_releases(
+                ticker,
+                observation_start=md_request.start_date,
+                observation_end=md_request.finish_date)
+
+            data_frame = data_frame['realtime_start']
+
+            data_frame = data_frame.to_frame(
+                name=ticker + '.release-date-time-full')
+
+            data_frame.index = data_frame[ticker + '.release-date-time-full']
+            data_frame = data_frame.sort_index()
+            data_frame = data_frame.drop_duplicates()
+
+            data_frame_release.append(
+                filter.filter_time_series_by_date(
+                    md_request.start_date,
+                    md_request.finish_date,
+                    data_frame))
+
+        return data_frame_list, data_frame_release
+
 
 ###############################################################################
 
@@ -693,10 +784,7 @@ class DataVendorBOE(DataVendor):
 
 ###############################################################################
 
-try:
-    import yfinance as yf
-except:
-    pass
+yf = lazy_import("yfinance")
 
 
 class DataVendorYahoo(DataVendor):
@@ -832,10 +920,7 @@ try:
 except:
     pass
 
-try:
-    import pandas_datareader.data as web
-except:
-    pass
+web = lazy_import("pandas_datareader.data")
 
 
 class DataVendorPandasWeb(DataVendor):
@@ -1511,11 +1596,6 @@ class DataVendorHuobi(DataVendor):
 
 ###############################################################################
 
-try:
-    from numba import jit
-finally:
-    pass
-
 # decompress binary files fetched from Dukascopy
 try:
     import lzma
@@ -2155,7 +2235,6 @@ class DataVendorFXCM(DataVendor):
 from urllib.request import urlopen
 from urllib.parse import quote_plus
 from urllib.parse import urlencode
-from urllib.error import HTTPError
 
 import xml.etree.ElementTree as ET
 
@@ -2173,11 +2252,26 @@ class Fred(object):
 
     def __init__(self,
                  api_key=None,
-                 api_key_file=None):
+                 api_key_file=None,
+                 root_url=None,
+                 session=None,
+                 file_type=None,
+                 vintage_store_folder=None):
         """Initialize the Fred class that provides useful functions to query the Fred dataset. You need to specify a valid
         API key in one of 3 ways: pass the string via api_key, or set api_key_file to a file with the api key in the
         first line, or set the environment variable 'FRED_API_KEY' to the value of your api key. You can sign up for a
         free api key on the Fred website at http://research.stlouisfed.org/fred2/
+
+        All HTTP calls go through a single requests.Session (with a connection pool big enough for every download
+        thread), so the same Fred object can be shared between threads. Pass session to reuse an existing one, and
+        root_url to point at another server with the same API (eg. a local mirror).
+
+        Observations are requested as file_type 'xml' (default) or 'json'. XML responses are parsed incrementally
+        straight into columns, rather than building a full element tree. JSON responses are read into memory in
+        one go before being converted into columns, so use XML for very long histories.
+
+        If vintage_store_folder is set (local or S3), all the vintages of each series are kept there as Parquet, and
+        later calls to get_series_all_releases only download vintages newer than the last stored one.
         """
         self.api_key = None
         if api_key is not None:
@@ -2188,7 +2282,34 @@ class Fred(object):
             f.close()
         else:
             self.api_key = os.environ.get('FRED_API_KEY')
-        self.root_url = 'https://api.stlouisfed.org/fred'
+        self.root_url = constants.fred_root_url
+
+        if root_url is not None:
+            self.root_url = root_url
+
+        self._own_session = session is None
+
+        if session is None:
+            session = requests.Session()
+
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=constants.fred_thread_no,
+                pool_maxsize=constants.fred_thread_no)
+
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+        self._session = session
+
+        if file_type is None:
+            file_type = constants.fred_file_type
+
+        self.file_type = file_type
+
+        if vintage_store_folder is None:
+            vintage_store_folder = constants.alfred_vintage_store_folder
+
+        self.vintage_store_folder = vintage_store_folder
 
         if self.api_key is None:
             import textwrap
@@ -2201,16 +2322,97 @@ class Fred(object):
                     api key. You can sign up for a free api key on the Fred
                     website at http://research.stlouisfed.org/fred2/"""))
 
+    def close(self):
+        """Closes the underlying HTTP session (unless it was passed in by the caller)
+        """
+        if self._own_session:
+            self._session.close()
+
     def __fetch_data(self, url):
         """Helper function for fetching data given a request URL
         """
+        response = self._session.get(url,
+                                     timeout=constants.fred_timeout_seconds)
+
+        if response.status_code != 200:
+            self.__raise_error(response)
+
+        return ET.fromstring(response.content)
+
+    def __raise_error(self, response):
+        """Helper function for raising the error message returned by Fred (in either XML or JSON)
+        """
+        message = None
+
         try:
-            response = urlopen(url)
-            root = ET.fromstring(response.read())
-        except HTTPError as exc:
-            root = ET.fromstring(exc.read())
-            raise ValueError(root.get('message'))
-        return root
+            if self.file_type == 'json':
+                message = response.json().get('error_message')
+            else:
+                message = ET.fromstring(response.content).get('message')
+        except Exception:
+            pass
+
+        if message is None:
+            message = "HTTP error " + str(response.status_code)
+
+        raise ValueError(message)
+
+    def __fetch_observations(self, url):
+        """Helper function for fetching observations given a request URL. The XML response is parsed incrementally
+        (clearing each element once read, so memory doesn't grow with the size of the document) into columns, which
+        are then converted in one go. The JSON response is not streamed, the whole body is decoded before it is read
+        into columns.
+
+        Returns
+        -------
+        data : DataFrame
+            a DataFrame with columns 'realtime_start', 'date' and 'value'
+        """
+        realtime_starts = []
+        dates = []
+        values = []
+
+        if self.file_type == 'json':
+            response = self._session.get(url + '&file_type=json',
+                                         timeout=constants.fred_timeout_seconds)
+
+            if response.status_code != 200:
+                self.__raise_error(response)
+
+            for obs in response.json().get('observations', []):
+                realtime_starts.append(obs.get('realtime_start'))
+                dates.append(obs.get('date'))
+                values.append(obs.get('value'))
+        else:
+            response = self._session.get(url,
+                                         timeout=constants.fred_timeout_seconds,
+                                         stream=True)
+
+            if response.status_code != 200:
+                self.__raise_error(response)
+
+            with response:
+                response.raw.decode_content = True
+
+                root = None
+
+                for event, elem in ET.iterparse(response.raw,
+                                                events=('start', 'end')):
+                    if root is None:
+                        root = elem
+                    elif event == 'end' and elem.tag == 'observation':
+                        realtime_starts.append(elem.get('realtime_start'))
+                        dates.append(elem.get('date'))
+                        values.append(elem.get('value'))
+
+                        root.clear()
+
+        from pandas import DataFrame, to_datetime, to_numeric
+
+        # Missing values are marked with nan_char, which to_numeric will coerce to NaN
+        return DataFrame({'realtime_start': to_datetime(realtime_starts, format='%Y-%m-%d'),
+                          'date': to_datetime(dates, format='%Y-%m-%d'),
+                          'value': to_numeric(values, errors='coerce')})
 
     def _parse(self, date_str, format='%Y-%m-%d'):
         """Helper function for parsing FRED date string into datetime
@@ -2281,20 +2483,10 @@ class Fred(object):
         if kwargs is not None:
             url += '&' + urlencode(kwargs)
 
-        root = self.__fetch_data(url)
-        if root is None:
+        data = self.__fetch_observations(url)
+        if data.empty:
             raise ValueError('No data exists for series id: ' + series_id)
-        data = {}
-        for child in root.iter():
-            val = child.get('value')
-            if val is None:
-                float('NaN')
-            elif val == self.nan_char:
-                val = float('NaN')
-            else:
-                val = float(val)
-            data[self._parse(child.get('date'))] = val
-        return Series(data)
+        return Series(data['value'].values, index=data['date'].values)
 
     def get_series_latest_release(self, series_id, observation_start=None,
                                   observation_end=None):
@@ -2390,7 +2582,7 @@ class Fred(object):
         return data
 
     def get_series_all_releases(self, series_id, observation_start=None,
-                                observation_end=None):
+                                observation_end=None, realtime_start=None):
         """Get all data for a Fred series id including first releases and all revisions.
 
         This returns a DataFrame
@@ -2400,10 +2592,15 @@ class Fred(object):
         different 'realtime_start' of 2014-01-30, 2014-02-28, and 2014-03-27 with corresponding 'value' of 17102.5, 17080.7
         and 17089.6
 
+        If a vintage store folder has been set, the vintages are read from the store, after first downloading any
+        vintages newer than those already stored.
+
         Parameters
         ----------
         series_id : str
             Fred series id such as 'GDP'
+        realtime_start : datetime or datetime-like str such as '7/1/2014', optional
+            only get vintages which were current on or after this date (bypasses the vintage store)
 
         Returns
         -------
@@ -2411,15 +2608,30 @@ class Fred(object):
             a DataFrame with columns 'date', 'realtime_start' and 'value' where 'date' is the observation period and 'realtime_start'
             is when the corresponding value (either first release or revision) is reported.
         """
+        from pandas import to_datetime
+
+        if self.vintage_store_folder is not None and realtime_start is None:
+            data = self.__update_vintage_store(series_id)
+
+            if observation_start is not None:
+                data = data[data['date'] >= to_datetime(observation_start)]
+            if observation_end is not None:
+                data = data[data['date'] <= to_datetime(observation_end)]
+
+            return data.reset_index(drop=True)
+
+        if realtime_start is None:
+            realtime_start = self.earliest_realtime_start
+        else:
+            realtime_start = to_datetime(realtime_start).strftime('%Y-%m-%d')
+
         url = "%s/series/observations?series_id=%s&api_key=%s&realtime_start=%s&realtime_end=%s" % (
         self.root_url,
         series_id,
         self.api_key,
-        self.earliest_realtime_start,
+        realtime_start,
         self.latest_realtime_end)
 
-        from pandas import to_datetime
-
         if observation_start is not None:
             observation_start = to_datetime(observation_start, errors='raise')
             url += '&observation_start=' + observation_start.strftime(
@@ -2428,30 +2640,62 @@ class Fred(object):
             observation_end = to_datetime(observation_end, errors='raise')
             url += '&observation_end=' + observation_end.strftime('%Y-%m-%d')
 
-        root = self.__fetch_data(url)
-        if root is None:
+        data = self.__fetch_observations(url)
+
+        # Only later vintages are requested when updating the vintage store, and there might not be any new ones
+        if data.empty and realtime_start == self.earliest_realtime_start:
             raise ValueError('No data exists for series id: ' + series_id)
-        data = {}
-        i = 0
-        for child in root.iter():
-            val = child.get('value')
-            if val is None:
-                val = float("NaN")
-            elif val == self.nan_char:
-                val = float('NaN')
-            else:
-                val = float(val)
-            realtime_start = self._parse(child.get('realtime_start'))
-            # realtime_end = self._parse(child.get('realtime_end'))
-            date = self._parse(child.get('date'))
-
-            data[i] = {'realtime_start': realtime_start,
-                       # 'realtime_end': realtime_end,
-                       'date': date,
-                       'value': val}
-            i += 1
-        from pandas import DataFrame
-        data = DataFrame(data).T
+
+        return data
+
+    def __update_vintage_store(self, series_id):
+        """Helper function for getting all the vintages for a series from the vintage store, after adding any vintages
+        which have been released since it was last updated (if nothing is stored yet, the whole history is downloaded)
+        """
+        io_engine = IOEngine()
+
+        path = io_engine.path_join(self.vintage_store_folder,
+                                   series_id + '.parquet')
+
+        stored = None
+
+        if io_engine.path_exists(path):
+            stored = io_engine.read_parquet(path).reset_index(drop=True)
+
+        if stored is None or stored.empty:
+            data = self.get_series_all_releases(
+                series_id, realtime_start=self.earliest_realtime_start)
+        else:
+            last_realtime_start = stored['realtime_start'].max()
+
+            new = self.get_series_all_releases(
+                series_id, realtime_start=last_realtime_start)
+
+            # Fred sets the realtime_start of every value which was still current on last_realtime_start to that date,
+            # so ignore these if they are unchanged from what we have stored (and keep any later vintages)
+            latest = stored.drop_duplicates(subset=['date'], keep='last') \
+                .set_index('date')['value']
+
+            previous = new['date'].map(latest)
+
+            unchanged = (new['realtime_start'] == last_realtime_start) & \
+                        new['date'].isin(latest.index) & \
+                        ((new['value'] == previous) |
+                         (new['value'].isna() & previous.isna()))
+
+            new = new[~unchanged]
+
+            if new.empty:
+                return stored
+
+            data = pd.concat([stored, new]) \
+                .drop_duplicates(subset=['date', 'realtime_start'], keep='last')
+
+        data = data.sort_values(by=['date', 'realtime_start'],
+                                kind='stable').reset_index(drop=True)
+
+        io_engine.to_parquet(data, path)
+
         return data
 
     def get_series_vintage_dates(self, series_id):
@@ -2895,7 +3139,7 @@ class DataVendorFlatFile(DataVendor):
 
 ###############################################################################
 
-from alpha_vantage.timeseries import TimeSeries
+alpha_vantage_timeseries = lazy_import("alpha_vantage.timeseries")
 
 
 class DataVendorAlphaVantage(DataVendor):
@@ -2903,6 +3147,8 @@ class DataVendorAlphaVantage(DataVendor):
 
     """
 
+    credential_attributes = ["alpha_vantage_api_key"]
+
     def __init__(self):
         super(DataVendorAlphaVantage, self).__init__()
 
@@ -2965,8 +3211,9 @@ class DataVendorAlphaVantage(DataVendor):
 
         trials = 0
 
-        ts = TimeSeries(key=md_request.alpha_vantage_api_key,
-                        output_format='pandas', indexing_type='date')
+        ts = alpha_vantage_timeseries.TimeSeries(
+            key=md_request.alpha_vantage_api_key,
+            output_format='pandas', indexing_type='date')
 
         data_frame = None
 
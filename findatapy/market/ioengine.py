@@ -32,50 +32,34 @@ import math
 import numpy as np
 import pandas as pd
 
+from findatapy.util.dataconstants import DataConstants
+from findatapy.util.lazymodule import lazy_import
+from findatapy.util.loggermanager import LoggerManager
+
+# The optional libraries for each storage engine are only imported when
+# they are first used
+
 # For deprecated Arctic
-try:
-    from arctic import Arctic
-    import pymongo
-except:
-    pass
+arctic = lazy_import("arctic")
+pymongo = lazy_import("pymongo")
 
 # For ArcticDB
-try:
-    import arcticdb as adb
-except:
-    pass
+adb = lazy_import("arcticdb")
 
 # Needs this for AWS S3 bucket support
-try:
-    from s3fs import S3FileSystem
-except:
-    pass
+s3fs = lazy_import("s3fs")
 
 # pyarrow necessary for caching
-try:
-    import pyarrow as pa
-except:
-    pass
+pa = lazy_import("pyarrow")
 
 # For reading and writing to S3
-try:
-    import pyarrow.fs
-    import pyarrow.parquet as pq
-
-    from s3fs import S3FileSystem
-except:
-    pass
+pyarrow_fs = lazy_import("pyarrow.fs")
+pq = lazy_import("pyarrow.parquet")
 
-try:
-    import redis
-except:
-    pass
+redis = lazy_import("redis")
 
 # For accessing Excel
-from openpyxl import load_workbook
-
-from findatapy.util.dataconstants import DataConstants
-from findatapy.util.loggermanager import LoggerManager
+openpyxl = lazy_import("openpyxl")
 
 constants = DataConstants()
 
@@ -120,7 +104,7 @@ class IOEngine(object):
             writer = pd.ExcelWriter(fname, engine="xlsxwriter")
         else:
             if self.path_exists(fname):
-                book = load_workbook(fname)
+                book = openpyxl.load_workbook(fname)
                 writer = pd.ExcelWriter(fname, engine="xlsxwriter")
                 writer.book = book
                 writer.sheets = dict((ws.title, ws) for ws in book.worksheets)
@@ -514,9 +498,9 @@ class IOEngine(object):
                     host="mongodb://" + str(db_server) + ":" + str(db_port),
                     connect=False)
 
-            store = Arctic(c, socketTimeoutMS=socketTimeoutMS,
-                           serverSelectionTimeoutMS=socketTimeoutMS,
-                           connectTimeoutMS=socketTimeoutMS)
+            store = arctic.Arctic(c, socketTimeoutMS=socketTimeoutMS,
+                                 serverSelectionTimeoutMS=socketTimeoutMS,
+                                 connectTimeoutMS=socketTimeoutMS)
 
             database = None
 
@@ -1160,7 +1144,7 @@ class IOEngine(object):
         # os.environ["AWS_SESSION_TOKEN"] = cloud_credentials["aws_session_token"]
 
         if "s3_pyarrow" == filesystem_type:
-            return pyarrow.fs.S3FileSystem(anon=cloud_credentials["aws_anon"],
+            return pyarrow_fs.S3FileSystem(anon=cloud_credentials["aws_anon"],
                                            access_key=cloud_credentials[
                                                "aws_access_key"],
                                            secret_key=cloud_credentials[
@@ -1169,10 +1153,11 @@ class IOEngine(object):
                                                "aws_session_token"])
 
         elif "s3_filesystem" == filesystem_type:
-            return S3FileSystem(anon=cloud_credentials["aws_anon"],
-                                key=cloud_credentials["aws_access_key"],
-                                secret=cloud_credentials["aws_secret_key"],
-                                token=cloud_credentials["aws_session_token"])
+            return s3fs.S3FileSystem(anon=cloud_credentials["aws_anon"],
+                                     key=cloud_credentials["aws_access_key"],
+                                     secret=cloud_credentials["aws_secret_key"],
+                                     token=cloud_credentials[
+                                         "aws_session_token"])
 
     def _convert_cred(self, cloud_credentials: dict,
                       convert_to_s3fs: bool = False):
@@ -1363,7 +1348,7 @@ class IOEngine(object):
                             coerce_timestamps=constants.default_time_units,
                             allow_truncated_timestamps=True)
 
-            except pyarrow.lib.ArrowMemoryError as e:
+            except pa.lib.ArrowMemoryError as e:
                 logger.warning(
                     f"Could not dump using Pandas/pyarrow, will instead try chunking with pyarrow directly {str(e)}")
 
@@ -1785,12 +1770,14 @@ class SpeedCache(object):
         key_drop.append("logger")
         key = []
 
-        for k in obj.__dict__:
+        attributes = self._get_attributes(obj)
+
+        for k in attributes:
 
             if "api_key" not in k:
                 # provided the key is not in one of the dropped keys
                 if not (any(a == k for a in key_drop)):
-                    add = obj.__dict__[k]
+                    add = attributes[k]
 
                     if add is not None:
                         if isinstance(add, list):
@@ -1804,6 +1791,33 @@ class SpeedCache(object):
 
         return type(obj).__name__ + "_" + str(len(str(key))) + "_" + str(key)
 
+    def _get_attributes(self, obj):
+        # Attributes can be in __slots__ (with private names mangled), as
+        # well as in __dict__
+        attributes = {}
+
+        for cls in type(obj).__mro__:
+            slots = cls.__dict__.get("__slots__", ())
+
+            if isinstance(slots, str):
+                slots = [slots]
+
+            for k in slots:
+                if k in ["__dict__", "__weakref__"]:
+                    continue
+
+                if k.startswith("__") and not k.endswith("__"):
+                    k = "_" + cls.__name__.lstrip("_") + k
+
+                try:
+                    attributes[k] = getattr(obj, k)
+                except AttributeError:
+                    pass
+
+        attributes.update(getattr(obj, "__dict__", {}))
+
+        return attributes
+
 
 # TODO refactor code to use DBEngine
 class DBEngine(object):
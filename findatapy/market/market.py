@@ -22,12 +22,110 @@ from findatapy.util import DataConstants
 from findatapy.market.ioengine import SpeedCache
 
 import concurrent.futures
+import functools
 
 import json
 
 constants = DataConstants()
 
 
+def _split_list_str(val):
+    # eg. "EURUSD,GBPUSD" -> ("EURUSD", "GBPUSD")
+    if ',' in val:
+        return tuple(val.split(','))
+
+    return val
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_md_request_str(md_request_str):
+    """Parses a MarketDataRequest string, which is either JSON or in the form
+    environment.category.data_source.freq.cut.tickers.fields (or the raw/_
+    forms). The same strings tend to be used over and over again, so the
+    results are memoised (and so are immutable, with lists as tuples).
+
+    Parameters
+    ----------
+    md_request_str : str
+        MarketDataRequest string
+
+    Returns
+    -------
+    tuple
+        Kind of string ("json", "raw", "_" or "template") and its parameters
+    """
+
+    # Try to parse str as JSON if that fails, then try as a str
+    try:
+        json_md_request = json.loads(md_request_str)
+
+        if isinstance(json_md_request, dict):
+            return ("json", tuple(json_md_request.items()))
+    except:
+        pass
+
+    return _parse_md_request_template_str(md_request_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_md_request_template_str(md_request_str):
+    # Split up ticker string
+    md_request_params = ConfigManager.split_ticker_string(md_request_str)
+
+    environment = md_request_params[0]
+
+    # The user can omit the environment
+    if environment in constants.possible_data_environment:
+        i = 0
+
+    # Otherwise, what if the user wants to specify each property manually?
+    elif environment == "raw" or environment == "r":
+        return ("raw", tuple(
+            (md_request_params[c], _split_list_str(md_request_params[c + 1]))
+            for c in range(1, len(md_request_params), 2)))
+
+    # Otherwise we do a partial match of predefined tickers
+    elif environment == "_":
+        return ("_", tuple(md_request_params[1:]))
+
+    else:
+        i = -1
+        environment = None
+
+    # Otherwise the user has specified the MarketDataRequest str in the form
+    # category.data_source.freq.cut.tickers.field =
+    # fx.bloomberg.daily.NYC.EURUSD.close
+    category = md_request_params[i + 1]
+    data_source = md_request_params[i + 2]
+
+    # The freq, cut, tickers, fields are optional (in which case defaults will
+    # be used), and we can have multiple tickers and fields separated by a
+    # comma
+    optional = [None] * 4
+
+    for j in range(0, 4):
+        if len(md_request_params) > i + 3 + j:
+            optional[j] = md_request_params[i + 3 + j]
+
+    freq, cut, tickers, fields = optional
+
+    if tickers is not None:
+        tickers = _split_list_str(tickers)
+
+    if fields is not None:
+        fields = _split_list_str(fields)
+
+    return ("template", (environment, category, data_source, freq, cut,
+                         tickers, fields))
+
+
+def _to_list(val):
+    if isinstance(val, tuple):
+        return list(val)
+
+    return val
+
+
 # from deco import *
 
 class Market(object):
@@ -60,6 +158,13 @@ class Market(object):
         self._calculations = Calculations()
         self.md_request = md_request
 
+    def close(self):
+        """Closes the data vendors kept by the underlying
+        MarketDataGenerator (eg. their HTTP sessions)
+        """
+        if hasattr(self._market_data_generator, "close_data_vendors"):
+            self._market_data_generator.close_data_vendors()
+
     def fetch_market(self, md_request=None, md_request_df=None,
                      md_request_str=None, md_request_dict=None, tickers=None,
                      start_date=None, finish_date=None, best_match_only=False,
@@ -119,6 +224,18 @@ class Market(object):
             md_request_df = md_request
             md_request = MarketDataRequest()
 
+        # A list of MarketDataRequest strings/dicts/DataFrames is converted
+        # in bulk, combining requests which only differ by tickers
+        if isinstance(md_request, list):
+            md_request = self.flatten_list_of_lists(md_request)
+
+            if not all(isinstance(md, MarketDataRequest)
+                       for md in md_request):
+                md_request = self.create_md_request_list(
+                    md_request, start_date=start_date,
+                    finish_date=finish_date,
+                    best_match_only=best_match_only)
+
         # Any kwargs are assumed to be to set MarketDataRequest attributes
         if kwargs != {}:
             md_request = self._kwargs_to_md_request(kwargs, md_request)
@@ -514,39 +631,66 @@ class Market(object):
                 .smart_group_dataframe_tickers(
                 md_request_df, ret_fields=md_request_df.columns.tolist())
 
+        # Look up the setter for each column once, rather than for every cell
+        # (columns which aren't MarketDataRequest properties are ignored)
+        setters = []
+
+        for col in md_request_df.columns:
+            prop = getattr(MarketDataRequest, col, None)
+
+            if isinstance(prop, property) and prop.fset is not None:
+                setters.append((col, prop.fset,
+                                col in keep_initial_md_request_att_cols))
+
+        # The same cells (eg. category, data_source) tend to repeat down the
+        # rows, so only convert each of them once
+        converted = {}
+
+        def convert(val):
+            if isinstance(val, str):
+                if val not in converted:
+                    if "," in val:
+                        converted[val] = val.split(",")
+                    else:
+                        converted[val] = val
+
+                val = converted[val]
+
+                # Don't share split lists between requests
+                if isinstance(val, list):
+                    return list(val)
+
+                return val
+
+            if isinstance(val, list):
+                return self.flatten_list_of_lists(val)
+
+            return val
+
         # Now populate MarketDataRequests based on the DataFrame
-        for index, row in md_request_df.iterrows():
+        for row in md_request_df[[col for col, _, _ in setters]].itertuples(
+                index=False, name=None):
             if md_request is None:
                 md_request_copy = MarketDataRequest()
             else:
                 md_request_copy = MarketDataRequest(md_request=md_request)
 
-            for col, val in row.items():
+            for (col, fset, keep_initial), val in zip(setters, row):
+
+                # Only override the initial setting in md_request if they are
+                # None, or the user has specified this
+                if keep_initial and getattr(md_request_copy, col) is not None:
+                    continue
 
                 try:
-                    if "," in val:
-                        val = val.split(",")
+                    fset(md_request_copy, convert(val))
                 except:
                     pass
 
-                # Only override the initial setting in md_request if they are
-                # None, or the user has specified this
-                if getattr(md_request_copy,
-                           col) is None or col not \
-                        in keep_initial_md_request_att_cols:
-                    try:
-                        if isinstance(val, list):
-                            val = self.flatten_list_of_lists(val)
-
-                        getattr(type(md_request_copy), col).fset(
-                            md_request_copy, val)
-                    except:
-                        pass
-
-            if start_date is not None: 
+            if start_date is not None:
                 md_request_copy.start_date = start_date
-                
-            if finish_date is not None: 
+
+            if finish_date is not None:
                 md_request_copy.finish_date = finish_date
 
             md_request_copy = self._kwargs_to_md_request(kwargs,
@@ -556,6 +700,145 @@ class Market(object):
 
         return md_list
 
+    def create_md_request_list(self, md_request_list, start_date=None,
+                               finish_date=None, best_match_only=False,
+                               group_tickers=True, **kwargs):
+        """Creates MarketDataRequests in bulk, from a list of
+        MarketDataRequest strings, dicts, DataFrames and/or MarketDataRequest
+        objects. Requests which are identical apart from their tickers are
+        combined into single multi-ticker requests, so we don't end up
+        sending one request for every ticker to our data vendor.
+
+        Parameters
+        ----------
+        md_request_list : list
+            MarketDataRequests (or shorthand str/DataFrame/dict) to create
+
+        start_date : str or datetime
+            Start date for every request (optional)
+
+        finish_date : str or datetime
+            Finish date for every request (optional)
+
+        best_match_only : bool
+            Only return the best match for free form ticker queries
+            (default: False)
+
+        group_tickers : bool
+            Combine requests which only differ by tickers (default: True)
+
+        Returns
+        -------
+        MarketDataRequest (list)
+        """
+        if not isinstance(md_request_list, list):
+            md_request_list = [md_request_list]
+
+        md_list = []
+
+        for md in self.flatten_list_of_lists(md_request_list):
+            if isinstance(md, str):
+                md = self.create_md_request_from_str(
+                    md, start_date=start_date, finish_date=finish_date,
+                    best_match_only=best_match_only, **kwargs)
+            elif isinstance(md, dict):
+                md = self.create_md_request_from_dict(
+                    md, start_date=start_date, finish_date=finish_date,
+                    **kwargs)
+            elif isinstance(md, pd.DataFrame):
+                md = self.create_md_request_from_dataframe(
+                    md, start_date=start_date, finish_date=finish_date,
+                    **kwargs)
+            else:
+                if start_date is not None or finish_date is not None \
+                        or kwargs != {}:
+                    md = MarketDataRequest(md_request=md)
+
+                    if start_date is not None: md.start_date = start_date
+                    if finish_date is not None: md.finish_date = finish_date
+
+                md = self._kwargs_to_md_request(kwargs, md)
+
+            if isinstance(md, list):
+                md_list.extend(self.flatten_list_of_lists(md))
+            else:
+                md_list.append(md)
+
+        if group_tickers:
+            md_list = self.group_md_requests(md_list)
+
+        return md_list
+
+    def group_md_requests(self, md_request_list):
+        """Combines MarketDataRequests which are identical apart from their
+        tickers (and vendor_tickers) into single multi-ticker requests,
+        keeping the order in which each group first appears.
+
+        Parameters
+        ----------
+        md_request_list : MarketDataRequest (list)
+            MarketDataRequests to group
+
+        Returns
+        -------
+        MarketDataRequest (list)
+        """
+        groups = {}
+
+        # API keys are left out of generate_key, but requests with different
+        # credentials can't be combined
+        api_key_attributes = [a for a in dir(MarketDataRequest)
+                              if 'api_key' in a and not a.startswith('_')]
+
+        for md in md_request_list:
+            if md.tickers is None:
+                key = id(md)
+            else:
+                # Requests with and without vendor_tickers can't be combined
+                key = (md.vendor_tickers is None,
+                       tuple(getattr(md, a) for a in api_key_attributes),
+                       self.speed_cache.generate_key(md, [
+                           "_MarketDataRequest__tickers",
+                           "_MarketDataRequest__vendor_tickers",
+                           "_MarketDataRequest__old_tickers",
+                           "_MarketDataRequest__category_key"]))
+
+            groups.setdefault(key, []).append(md)
+
+        md_list = []
+
+        for group in groups.values():
+            if len(group) == 1:
+                md_list.append(group[0])
+
+                continue
+
+            tickers = []
+            vendor_tickers = []
+            seen = set()
+
+            for md in group:
+                if md.vendor_tickers is None:
+                    md_vendor_tickers = [None] * len(md.tickers)
+                else:
+                    md_vendor_tickers = md.vendor_tickers
+
+                for t, v in zip(md.tickers, md_vendor_tickers):
+                    if (t, v) not in seen:
+                        seen.add((t, v))
+                        tickers.append(t)
+                        vendor_tickers.append(v)
+
+            md = MarketDataRequest(md_request=group[0])
+            md.tickers = tickers
+
+            if group[0].vendor_tickers is not None:
+                md.vendor_tickers = vendor_tickers
+
+            md_list.append(md)
+
+        return md_list
+
     def create_md_request_from_dict(self, md_request_dict, md_request=None,
                                     start_date=None, finish_date=None,
                                     **kwargs):
@@ -630,150 +913,89 @@ class Market(object):
                                    best_match_only=False,
                                    smart_group=True, **kwargs):
 
-        json_md_request = None
-
-        # Try to parse str as JSON if that fails, then try as a str
-        try:
-            json_md_request = json.loads(md_request_str)
-
-            if md_request is None:
-                md_request = MarketDataRequest()
-
-            for k in json_md_request.keys():
-                getattr(type(md_request), k).fset(md_request,
-                                                  json_md_request[k])
-
-            if start_date is not None: md_request.start_date = start_date
-            if finish_date is not None: md_request.finish_date = finish_date
-
-            return md_request
-        except:
-            pass
-
-        # If we failed to parse as a JSON, let's try as string
-        if json_md_request is None:
-
-            # Split up ticker string
-            md_request_params = ConfigManager.split_ticker_string(
-                md_request_str)
-
-            environment = md_request_params[0]
+        # Parsing is memoised, given the same strings are often reused
+        kind, params = _parse_md_request_str(md_request_str)
 
-            # The user can omit the environment
-            if environment in constants.possible_data_environment:
-                i = 0
-
-            # Otherwise, what if the user wants to specify each 
-            # property manually?
-            elif environment == "raw" or environment == "r":
-                # Here the user can specify any tickers/fields etc. they want, 
-                # they don't have to be predefined
-                # eg. raw.data_source.bloomberg.tickers.EURUSD.vendor_tickers.EURUSD Curncy
+        if kind == "json":
+            try:
                 if md_request is None:
                     md_request = MarketDataRequest()
 
-                freeform_md_request = {}
-
-                for c in range(1, len(md_request_params), 2):
-                    f = md_request_params[c + 1]
-
-                    if "," in f:
-                        f = f.split(",")
-
-                    freeform_md_request[md_request_params[c]] = f
+                # The parsed values are shared by every call, so copy any
+                # lists/dicts before setting them
+                for k, v in params:
+                    if isinstance(v, (list, dict)):
+                        v = copy.deepcopy(v)
 
-                md_request.freeform_md_request = freeform_md_request
+                    getattr(type(md_request), k).fset(md_request, v)
 
-                if start_date is not None: 
-                    md_request.start_date = start_date
-                    
+                if start_date is not None: md_request.start_date = start_date
                 if finish_date is not None: 
                     md_request.finish_date = finish_date
 
-                md_request = self.create_md_request_from_freeform(md_request)
-                md_request = self._kwargs_to_md_request(kwargs, md_request)
-
                 return md_request
+            except:
+                # If we failed to use it as JSON, let's try as string
+                kind, params = _parse_md_request_template_str(md_request_str)
 
-            # Otherwise we do a partial match of predefined tickers
-            elif environment == "_":
-                # Try a heuristic/approximate match eg. _.quandl.fx
-                md_request_df = ConfigManager().get_instance()\
-                    .free_form_tickers_query(
-                    md_request_params[1:],
-                    best_match_only=best_match_only,
-                    smart_group=smart_group)
+        # Here the user can specify any tickers/fields etc. they want, they
+        # don't have to be predefined
+        # eg. raw.data_source.bloomberg.tickers.EURUSD.vendor_tickers.EURUSD Curncy
+        if kind == "raw":
+            if md_request is None:
+                md_request = MarketDataRequest()
 
-                md_request = self.create_md_request_from_dataframe(
-                    md_request_df,
-                    md_request=md_request, start_date=start_date,
-                    finish_date=finish_date)
+            md_request.freeform_md_request = {k: _to_list(f)
+                                              for k, f in params}
 
-                md_request = self._kwargs_to_md_request(kwargs,
-                                                           md_request)
+            if start_date is not None:
+                md_request.start_date = start_date
 
-                # if best_match_only:
-                return md_request
+            if finish_date is not None:
+                md_request.finish_date = finish_date
 
+            md_request = self.create_md_request_from_freeform(md_request)
+            md_request = self._kwargs_to_md_request(kwargs, md_request)
 
-            else:
-                i = -1
-                environment = None
-
-            # Otherwise the user has specified the MarketDataRequest str in 
-            # the form
-            # category.data_source.freq.cut.tickers.field = fx.bloomberg.daily.NYC.EURUSD.close
-            category = md_request_params[i + 1]
-            data_source = md_request_params[i + 2]
-
-            cut = None
-            freq = None
-            tickers = None
-            fields = None
-
-            # The freq, cut, tickers, fields are optional (in which case 
-            # defaults will be used)
-            try:
-                freq = md_request_params[i + 3]
-            except:
-                pass
+            return md_request
 
-            try:
-                cut = md_request_params[i + 4]
-            except:
-                pass
+        # Otherwise we do a partial match of predefined tickers
+        if kind == "_":
+            # Try a heuristic/approximate match eg. _.quandl.fx
+            md_request_df = ConfigManager().get_instance()\
+                .free_form_tickers_query(
+                list(params),
+                best_match_only=best_match_only,
+                smart_group=smart_group)
 
-            # We can have multiple tickers and fields separately by a ticker
-            try:
-                tickers = md_request_params[i + 5]
+            md_request = self.create_md_request_from_dataframe(
+                md_request_df,
+                md_request=md_request, start_date=start_date,
+                finish_date=finish_date)
 
-                if ',' in tickers:
-                    tickers = tickers.split(',')
-            except:
-                pass
+            md_request = self._kwargs_to_md_request(kwargs, md_request)
 
-            try:
-                fields = md_request_params[i + 6]
+            return md_request
 
-                if ',' in fields:
-                    fields = fields.split(',')
-            except:
-                pass
+        # Otherwise the user has specified the MarketDataRequest str in the 
+        # form category.data_source.freq.cut.tickers.field
+        environment, category, data_source, freq, cut, tickers, fields = \
+            params
 
-            if md_request is None:
-                md_request = MarketDataRequest(category=category,
-                                               data_source=data_source)
-            else:
-                md_request.category = category
-                md_request.data_source = data_source
-
-            if environment is not None: md_request.environment = environment
-            if start_date is not None: md_request.start_date = start_date
-            if finish_date is not None: md_request.finish_date = finish_date
-            if freq is not None: md_request.freq = freq
-            if cut is not None: md_request.cut = cut
-            if tickers is not None: md_request.tickers = tickers
-            if fields is not None: md_request.fields = fields
+        if md_request is None:
+            md_request = MarketDataRequest(category=category,
+                                           data_source=data_source)
+        else:
+            md_request.category = category
+            md_request.data_source = data_source
+
+        if environment is not None: md_request.environment = environment
+        if start_date is not None: md_request.start_date = start_date
+        if finish_date is not None: md_request.finish_date = finish_date
+        if freq is not None: md_request.freq = freq
+        if cut is not None: md_request.cut = cut
+        if tickers is not None: md_request.tickers = _to_list(tickers)
+        if fields is not None: md_request.fields = _to_list(fields)
 
         return md_request
 
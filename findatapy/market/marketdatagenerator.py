@@ -18,9 +18,11 @@ __author__ = "saeedamen"  # Saeed Amen
 import copy
 
 import datetime
+import threading
 
 import pandas as pd
 
+from findatapy.market.datavendorregistry import DataVendorRegistry
 from findatapy.market.ioengine import IOEngine
 from findatapy.market.marketdatarequest import MarketDataRequest
 from findatapy.timeseries import Filter, Calculations
@@ -48,6 +50,11 @@ class MarketDataGenerator(object):
         self._days_expired_intraday_contract_download = -1
         self._data_vendor_dict = data_vendor_dict
 
+        # DataVendor instances we've created, so they can be reused by
+        # later requests with the same data source/credentials
+        self._data_vendor_cache = {}
+        self._data_vendor_cache_lock = threading.Lock()
+
         return
 
     def set_intraday_code(self, code):
@@ -72,14 +79,15 @@ class MarketDataGenerator(object):
         data_source = md_request.data_source
         data_engine = md_request.data_engine
 
+        data_vendor = None
+
         # Special case for files (csv, h5, parquet or zip) or arcticdb
         if ".csv" in str(data_source) or ".h5" in str(data_source) or \
                 ".parquet" in str(data_source) or ".zip" in str(data_source) \
                 or (data_engine is not None
                     and md_request.category is not None
                     and "internet_load" not in md_request.cache_algo):
-            from findatapy.market.datavendorweb import DataVendorFlatFile
-            data_vendor = DataVendorFlatFile()
+            data_source = "flatfile"
         else:
             try:
                 data_source = data_source.split("-")[0]
@@ -88,90 +96,77 @@ class MarketDataGenerator(object):
 
                 return None
 
-            if data_source == "bloomberg":
-                try:
-                    from findatapy.market.datavendorbbg import \
-                        DataVendorBBGOpen
-                    data_vendor = DataVendorBBGOpen()
-                except:
-                    logger.warn("Bloomberg needs to be installed")
-
-            elif data_source == "quandl":
-                from findatapy.market.datavendorweb import DataVendorQuandl
-                data_vendor = DataVendorQuandl()
-
-            elif data_source == "eikon":
-                from findatapy.market.datavendorweb import DataVendorEikon
-                data_vendor = DataVendorEikon()
-
-            elif data_source == "ons":
-                from findatapy.market.datavendorweb import DataVendorONS
-                data_vendor = DataVendorONS()
-
-            elif data_source == "boe":
-                from findatapy.market.datavendorweb import DataVendorBOE
-                data_vendor = DataVendorBOE()
-
-            elif data_source == "dukascopy":
-                from findatapy.market.datavendorweb import DataVendorDukasCopy
-                data_vendor = DataVendorDukasCopy()
-
-            elif data_source == "fxcm":
-                from findatapy.market.datavendorweb import DataVendorFXCM
-                data_vendor = DataVendorFXCM()
-
-            elif data_source == "alfred":
-                from findatapy.market.datavendorweb import DataVendorALFRED
-                data_vendor = DataVendorALFRED()
-
-            elif data_source == "yahoo":
-                from findatapy.market.datavendorweb import DataVendorYahoo
-                data_vendor = DataVendorYahoo()
-
-            elif data_source in ["google", "fred", "oecd", "eurostat",
-                                 "edgar-index"]:
-                from findatapy.market.datavendorweb import DataVendorPandasWeb
-                data_vendor = DataVendorPandasWeb()
-
-            elif data_source == "bitcoincharts":
-                from findatapy.market.datavendorweb import \
-                    DataVendorBitcoincharts
-                data_vendor = DataVendorBitcoincharts()
-            elif data_source == "poloniex":
-                from findatapy.market.datavendorweb import DataVendorPoloniex
-                data_vendor = DataVendorPoloniex()
-            elif data_source == "binance":
-                from findatapy.market.datavendorweb import DataVendorBinance
-                data_vendor = DataVendorBinance()
-            elif data_source == "bitfinex":
-                from findatapy.market.datavendorweb import DataVendorBitfinex
-                data_vendor = DataVendorBitfinex()
-            elif data_source == "gdax":
-                from findatapy.market.datavendorweb import DataVendorGdax
-                data_vendor = DataVendorGdax()
-            elif data_source == "kraken":
-                from findatapy.market.datavendorweb import DataVendorKraken
-                data_vendor = DataVendorKraken()
-            elif data_source == "bitmex":
-                from findatapy.market.datavendorweb import DataVendorBitmex
-                data_vendor = DataVendorBitmex()
-            elif data_source == "alphavantage":
-                from findatapy.market.datavendorweb import \
-                    DataVendorAlphaVantage
-                data_vendor = DataVendorAlphaVantage()
-            elif data_source == "huobi":
-                from findatapy.market.datavendorweb import DataVendorHuobi
-                data_vendor = DataVendorHuobi()
-            elif data_source in self._data_vendor_dict:
+        # Vendor modules are only imported when they are first used
+        try:
+            data_vendor_class = DataVendorRegistry.get_data_vendor_class(
+                data_source)
+
+            if data_vendor_class is not None:
+                data_vendor = self._get_cached_data_vendor(
+                    data_source, data_vendor_class, md_request)
+        except ImportError as e:
+            logger.warning(str(data_source) + " needs to be installed: "
+                           + str(e))
+
+            return None
+
+        if data_vendor is None:
+            if data_source in self._data_vendor_dict:
                 data_vendor = self._data_vendor_dict[data_source]
             elif data_source in md_request.data_vendor_custom:
                 data_vendor = md_request.data_vendor_custom[data_source]
             else:
-                logger.warn(str(data_source) +
-                            " is an unrecognized data source")
+                logger.warning(str(data_source) +
+                               " is an unrecognized data source")
+
+        return data_vendor
+
+    def _get_cached_data_vendor(self, data_source, data_vendor_class,
+                                md_request):
+        """Gets the DataVendor for a data source, reusing the instance from
+        earlier requests with the same credentials (and thread, if the
+        DataVendor isn't thread safe), creating and opening it otherwise
+        """
+        key = (data_source, data_vendor_class) + tuple(
+            getattr(md_request, attr, None)
+            for attr in getattr(data_vendor_class,
+                                "credential_attributes", []))
+
+        if not getattr(data_vendor_class, "thread_safe", True):
+            key = key + (threading.get_ident(),)
+
+        with self._data_vendor_cache_lock:
+            data_vendor = self._data_vendor_cache.get(key)
+
+            if data_vendor is None:
+                data_vendor = data_vendor_class()
+
+                if hasattr(data_vendor, "open"):
+                    data_vendor.open()
+
+                self._data_vendor_cache[key] = data_vendor
 
         return data_vendor
 
+    def close_data_vendors(self):
+        """Closes all the DataVendor instances kept by MarketDataGenerator,
+        releasing any resources they hold (later requests will create new
+        ones)
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        with self._data_vendor_cache_lock:
+            data_vendors = list(self._data_vendor_cache.values())
+            self._data_vendor_cache = {}
+
+        for data_vendor in data_vendors:
+            try:
+                if hasattr(data_vendor, "close"):
+                    data_vendor.close()
+            except Exception as e:
+                logger.warning("Couldn't close " + type(data_vendor).__name__
+                               + ": " + str(e))
+
     def fetch_market_data(self, md_request):
         """Loads time series from specified data provider
 
@@ -399,20 +394,25 @@ class MarketDataGenerator(object):
 
         current_date = pd.Timestamp(datetime.datetime.utcnow().date())
 
-        tickers = md_request.tickers
+        # Take copies, because the lists in the request can't be changed
+        tickers = list(md_request.tickers)
         vendor_tickers = md_request.vendor_tickers
 
-        expiry_date = pd.Timestamp(md_request.expiry_date)
+        if vendor_tickers is not None:
+            vendor_tickers = list(vendor_tickers)
 
         config = ConfigManager().get_instance()
 
-        # In many cases no expiry is defined so skip them
+        # Look up the expiries of all the tickers in one go (in many cases
+        # no expiry is defined, so use the one from the request)
+        expiry_dates = config.get_expiry_for_tickers(md_request.data_source,
+                                                     tickers)
+
         for i in range(0, len(tickers)):
-            try:
-                expiry_date = config.get_expiry_for_ticker(
-                    md_request.data_source, tickers[i])
-            except:
-                pass
+            expiry_date = expiry_dates[i]
+
+            if expiry_date is None:
+                expiry_date = md_request.expiry_date
 
             if expiry_date is not None:
                 expiry_date = pd.Timestamp(expiry_date)
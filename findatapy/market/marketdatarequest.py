@@ -15,13 +15,152 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 from datetime import timedelta
+import copy
 import datetime
+import functools
+import re
 
 from typing import List
 
 from findatapy.util.dataconstants import DataConstants
 from findatapy.util.loggermanager import LoggerManager
 
+
+# Relative dates (the offsets are from now)
+_relative_date_offsets = {"midnight": None,
+                          "decade": timedelta(days=365 * 10),
+                          "year": timedelta(days=365),
+                          "month": timedelta(days=30),
+                          "week": timedelta(days=7),
+                          "day": timedelta(days=1),
+                          "hour": timedelta(hours=1)}
+
+# Relative dates are only calculated once a minute
+_relative_dates = {}
+_relative_dates_minute = [None]
+
+# Possible formats for each shape of date string eg. "Jun 1 2005 01:33" has
+# the format "%b %d %Y %H:%M" (if several formats match, the last one is used)
+_date_str_formats = [
+    (re.compile(r"^[A-Za-z]+\s+\d+\s+\d+\s+\d+:\d+$"),
+     ["%b %d %Y %H:%M"]),
+    (re.compile(r"^\d+\s+[A-Za-z]+\s+\d+\s+\d+:\d+$"),
+     ["%d %b %Y %H:%M", "%d %B %Y %H:%M"]),
+    (re.compile(r"^\d+:\d+\s+\d+\s+[A-Za-z]+\s+\d+$"),
+     ["%H:%M %d %b %Y", "%H:%M %d %B %Y"]),
+    (re.compile(r"^[A-Za-z]+\s+\d+\s+\d+$"),
+     ["%b %d %Y", "%B %d %Y"]),
+    (re.compile(r"^\d+\s+[A-Za-z]+\s+\d+$"),
+     ["%d %b %Y", "%d %B %Y"])
+]
+
+# Try every format for any other date strings
+_all_date_str_formats = ["%b %d %Y %H:%M", "%d %b %Y %H:%M", "%d %B %Y %H:%M",
+                         "%H:%M %d %b %Y", "%H:%M %d %B %Y", "%b %d %Y",
+                         "%d %b %Y", "%B %d %Y", "%d %B %Y"]
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_str(date):
+    """Parses a date string (eg. "1 Jun 2005 01:33"), first recognising its
+    shape, so we only need to try the formats which could match. Results are
+    memoised (they never change).
+
+    Parameters
+    ----------
+    date : str
+        Date string
+
+    Returns
+    -------
+    datetime.datetime
+        None if the date string can't be parsed
+    """
+    date_formats = _all_date_str_formats
+
+    for pattern, pattern_formats in _date_str_formats:
+        if pattern.match(date):
+            date_formats = pattern_formats
+            break
+
+    # Last format to match is used
+    for date_format in reversed(date_formats):
+        try:
+            return datetime.datetime.strptime(date, date_format)
+        except ValueError:
+            pass
+
+    return None
+
+
+def _parse_relative_date(date):
+    """Converts a relative date string (eg. "year") to a date relative to now,
+    which is only calculated once for each wall clock minute.
+
+    Parameters
+    ----------
+    date : str
+        Relative date string (see _relative_date_offsets)
+
+    Returns
+    -------
+    datetime.datetime
+    """
+    now = datetime.datetime.utcnow()
+    minute = now.replace(second=0, microsecond=0)
+
+    if _relative_dates_minute[0] != minute:
+        _relative_dates.clear()
+        _relative_dates_minute[0] = minute
+
+    date1 = _relative_dates.get(date)
+
+    if date1 is None:
+        if date == "midnight":
+            date1 = datetime.datetime(now.year, now.month, now.day, 0, 0, 0)
+        else:
+            date1 = now - _relative_date_offsets[date]
+
+        _relative_dates[date] = date1
+
+    return date1
+
+
+class FrozenList(list):
+    """List which can't be changed after it has been created, so it can be
+    shared between copies of a MarketDataRequest, rather than copied (to
+    change it, assign a new list to the MarketDataRequest instead).
+
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("MarketDataRequest lists can't be changed, assign a "
+                        "new list instead")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = \
+        _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def _freeze(obj):
+    # Lists are frozen, so they can be shared between copies
+    if isinstance(obj, FrozenList):
+        return obj
+    elif isinstance(obj, (list, tuple)):
+        return FrozenList(obj)
+
+    return obj
+
+
 class MarketDataRequest:
     """Provides parameters for requesting market data.
 
@@ -29,8 +168,41 @@ class MarketDataRequest:
     finish dates for our request, as well as
     the various fields we would like and also the frequency of the data.
 
+    The lists in a MarketDataRequest (eg. tickers and fields) are immutable
+    FrozenList objects, so copies share them and only replace them when a
+    new list is assigned (copy on write). Hence, creating a new
+    MarketDataRequest from an existing one is cheap.
+
     """
 
+    # Attributes copied when creating a MarketDataRequest from another one
+    _copy_attributes = (
+        "__freq_mult", "__gran_freq", "__freq", "__data_source", "__category",
+        "__cut", "__fields", "__cache_algo", "__vendor_tickers",
+        "__vendor_fields", "__environment", "__trade_side", "__resample",
+        "__resample_how", "__split_request_chunks", "__list_threads",
+        "__fx_vol_part", "__fx_vol_tenor", "__fx_forwards_tenor",
+        "__base_depos_currencies", "__base_depos_tenor", "__data_engine",
+        "__abstract_curve_key", "__quandl_api_key", "__fred_api_key",
+        "__alpha_vantage_api_key", "__eikon_api_key", "__pretransformation",
+        "__vintage_as_index", "__push_to_cache", "__tickers",
+        "__data_vendor_custom", "__as_of")
+
+    # Mutable attributes which are deep copied (rather than shared)
+    _deep_copy_attributes = ("__abstract_curve", "__overrides",
+                             "__freeform_md_request", "__arcticdb_dict")
+
+    # Still has a __dict__ so other attributes can be added to a request
+    __slots__ = _copy_attributes + _deep_copy_attributes + (
+        "__start_date", "__finish_date", "__expiry_date", "__old_tickers",
+        "__category_key", "__dict__")
+
+    # Private names in __slots__ are mangled
+    _copy_attributes = tuple("_MarketDataRequest" + a
+                             for a in _copy_attributes)
+    _deep_copy_attributes = tuple("_MarketDataRequest" + a
+                                  for a in _deep_copy_attributes)
+
     # properties
     #
     # data_source eg. bbg, yahoo, quandl
@@ -123,105 +295,53 @@ class MarketDataRequest:
                  as_of: str = None
                  ):
 
-        data_constants = DataConstants()
-
-        if environment is None:
-            environment = data_constants.default_data_environment
-        if fx_vol_part is None:
-            fx_vol_part = data_constants.fx_vol_part
-        if fx_vol_tenor is None:
-            fx_vol_tenor = data_constants.fx_vol_tenor
-        if fx_forwards_tenor is None:
-            fx_forwards_tenor = data_constants.fx_forwards_tenor
-        if base_depos_currencies is None:
-            base_depos_currencies = data_constants.base_depos_currencies
-        if base_depos_tenor is None:
-            base_depos_tenor = data_constants.base_depos_tenor
-        if data_engine is None:
-            data_engine = data_constants.default_data_engine
-        if quandl_api_key is None:
-            quandl_api_key = data_constants.quandl_api_key
-        if fred_api_key is None:
-            fred_api_key = data_constants.fred_api_key
-        if alpha_vantage_api_key is None:
-            alpha_vantage_api_key = data_constants.alpha_vantage_api_key
-        if eikon_api_key is None:
-            eikon_api_key = data_constants.eikon_api_key
-        if data_vendor_custom is None:
-            data_vendor_custom = data_constants.data_vendor_custom
-        if arcticdb_dict is None:
-            arcticdb_dict = data_constants.arcticdb_dict
-
-        # Can deep copy MarketDataRequest (use a lock, so can be used with 
-        # threading when downloading time series)
+        # Copying a MarketDataRequest shares the (immutable) lists and only
+        # deep copies the dicts, so it's thread safe without a lock
         if md_request is not None:
-            import threading
-            lock = threading.Lock()
-
-            with lock:
-                import copy
-
-                self.freq_mult = copy.deepcopy(md_request.freq_mult)
-
-                # define frequency of data
-                self.gran_freq = copy.deepcopy(md_request.gran_freq)
-                self.freq_mult = copy.deepcopy(md_request.freq_mult)
-                self.freq = copy.deepcopy(md_request.freq)
-
-                # data source, start and fin
-                self.data_source = copy.deepcopy(md_request.data_source)
-                self.start_date = copy.deepcopy(md_request.start_date)
-                self.finish_date = copy.deepcopy(md_request.finish_date)
-
-                self.category = copy.deepcopy(md_request.category)  # special predefined categories
-
-                self.cut = copy.deepcopy(md_request.cut)  # closing time of the data (eg. NYC, LDN, TOK etc)
-                self.fields = copy.deepcopy(md_request.fields)  # fields, eg. close, high, low, open
-                self.cache_algo = copy.deepcopy(
-                    md_request.cache_algo)  # internet_load_return (cache_algo_return is for future use)
-                self.vendor_tickers = copy.deepcopy(md_request.vendor_tickers)  # define vendor tickers
-                self.vendor_fields = copy.deepcopy(md_request.vendor_fields)  # define vendor fields
-                self.environment = copy.deepcopy(
-                    md_request.environment)  # backtest environment only supported at present
-                self.trade_side = copy.deepcopy(md_request.trade_side)
-                self.expiry_date = copy.deepcopy(md_request.expiry_date)
-                self.resample = copy.deepcopy(md_request.resample)
-                self.resample_how = copy.deepcopy(md_request.resample_how)
-
-                self.split_request_chunks = \
-                    copy.deepcopy(md_request.split_request_chunks)
-                self.list_threads = copy.deepcopy(md_request.list_threads)
-
-                self.fx_vol_part = copy.deepcopy(md_request.fx_vol_part)
-                self.fx_vol_tenor = copy.deepcopy(md_request.fx_vol_tenor)
-                self.fx_forwards_tenor = copy.deepcopy(md_request.fx_forwards_tenor)
-                self.base_depos_currencies = \
-                    copy.deepcopy(md_request.base_depos_currencies)
-                self.base_depos_tenor = \
-                    copy.deepcopy(md_request.base_depos_tenor)
-                
-                self.data_engine = copy.deepcopy(md_request.data_engine)
-
-                self.abstract_curve = copy.deepcopy(md_request.abstract_curve)
-                self.quandl_api_key = copy.deepcopy(md_request.quandl_api_key)
-                self.fred_api_key = copy.deepcopy(md_request.fred_api_key)
-                self.alpha_vantage_api_key = \
-                    copy.deepcopy(md_request.alpha_vantage_api_key)
-                self.eikon_api_key = copy.deepcopy(md_request.eikon_api_key)
-                
-                self.pretransformation = copy.deepcopy(md_request.pretransformation)
-                self.vintage_as_index = copy.deepcopy(md_request.vintage_as_index)
-
-                self.overrides = copy.deepcopy(md_request.overrides)
-                self.push_to_cache = copy.deepcopy(md_request.push_to_cache)
-                self.freeform_md_request = \
-                    copy.deepcopy(md_request.freeform_md_request)
-
-                self.tickers = copy.deepcopy(md_request.tickers)  # Need this after category in case have wildcard
-                self.data_vendor_custom = md_request.data_vendor_custom
-                self.arcticdb_dict = copy.deepcopy(md_request.arcticdb_dict)
-                self.as_of = copy.deepcopy(md_request.as_of)
+            for attribute in MarketDataRequest._copy_attributes:
+                setattr(self, attribute, getattr(md_request, attribute))
+
+            for attribute in MarketDataRequest._deep_copy_attributes:
+                value = getattr(md_request, attribute)
+
+                if value is not None:
+                    value = copy.deepcopy(value)
+
+                setattr(self, attribute, value)
+
+            self.start_date = md_request.start_date
+            self.finish_date = md_request.finish_date
+            self.expiry_date = md_request.expiry_date
         else:
+            data_constants = DataConstants()
+
+            if environment is None:
+                environment = data_constants.default_data_environment
+            if fx_vol_part is None:
+                fx_vol_part = data_constants.fx_vol_part
+            if fx_vol_tenor is None:
+                fx_vol_tenor = data_constants.fx_vol_tenor
+            if fx_forwards_tenor is None:
+                fx_forwards_tenor = data_constants.fx_forwards_tenor
+            if base_depos_currencies is None:
+                base_depos_currencies = data_constants.base_depos_currencies
+            if base_depos_tenor is None:
+                base_depos_tenor = data_constants.base_depos_tenor
+            if data_engine is None:
+                data_engine = data_constants.default_data_engine
+            if quandl_api_key is None:
+                quandl_api_key = data_constants.quandl_api_key
+            if fred_api_key is None:
+                fred_api_key = data_constants.fred_api_key
+            if alpha_vantage_api_key is None:
+                alpha_vantage_api_key = data_constants.alpha_vantage_api_key
+            if eikon_api_key is None:
+                eikon_api_key = data_constants.eikon_api_key
+            if data_vendor_custom is None:
+                data_vendor_custom = data_constants.data_vendor_custom
+            if arcticdb_dict is None:
+                arcticdb_dict = data_constants.arcticdb_dict
+
             self.freq_mult = freq_mult
 
             # define frequency of data
@@ -285,6 +405,25 @@ class MarketDataRequest:
     def __str__(self):
         return "MarketDataRequest summary - " + self.generate_key()
 
+    def __copy__(self):
+        # Shallow copy (all the lists are immutable, so can be shared)
+        md_request = MarketDataRequest.__new__(MarketDataRequest)
+
+        for attribute in MarketDataRequest.__slots__:
+            if attribute == "__dict__":
+                continue
+
+            attribute = "_MarketDataRequest" + attribute
+
+            try:
+                setattr(md_request, attribute, getattr(self, attribute))
+            except AttributeError:
+                pass
+
+        md_request.__dict__.update(self.__dict__)
+
+        return md_request
+
     def create_category_key(self, md_request=None, ticker=None):
         """Returns a category key for the associated MarketDataRequest, which 
         can be used to create filenames (or as part of a storage key in a cache)
@@ -392,7 +531,7 @@ class MarketDataRequest:
 
             new_tickers = self._flatten_list(new_tickers)
 
-            self.__tickers = new_tickers
+            self.__tickers = FrozenList(new_tickers)
         else:
             self.__tickers = tickers
     
@@ -403,7 +542,7 @@ class MarketDataRequest:
 
     @old_tickers.setter
     def old_tickers(self, old_tickers):
-        self.__old_tickers = old_tickers
+        self.__old_tickers = _freeze(old_tickers)
         
     @property
     def fields(self):
@@ -422,7 +561,7 @@ class MarketDataRequest:
                 # self.logger.warning(field_entry + " is not a valid field.")
 
         # Add error checking
-        self.__fields = fields
+        self.__fields = _freeze(fields)
 
     @property
     def vendor_tickers(self):
@@ -434,7 +573,7 @@ class MarketDataRequest:
             if not isinstance(vendor_tickers, list):
                 vendor_tickers = [vendor_tickers]
 
-        self.__vendor_tickers = vendor_tickers
+        self.__vendor_tickers = _freeze(vendor_tickers)
 
     @property
     def vendor_fields(self):
@@ -446,7 +585,7 @@ class MarketDataRequest:
             if not isinstance(vendor_fields, list):
                 vendor_fields = [vendor_fields]
 
-        self.__vendor_fields = vendor_fields
+        self.__vendor_fields = _freeze(vendor_fields)
 
     @property
     def freq(self):
@@ -560,85 +699,14 @@ class MarketDataRequest:
 
     def date_parser(self, date):
         if isinstance(date, str):
+            if date in _relative_date_offsets:
+                return _parse_relative_date(date)
 
-            date1 = datetime.datetime.utcnow()
-
-            if date == "midnight":
-                date1 = datetime.datetime(date1.year, date1.month, 
-                                          date1.day, 0, 0, 0)
-            elif date == "decade":
-                date1 = date1 - timedelta(days=365 * 10)
-            elif date == "year":
-                date1 = date1 - timedelta(days=365)
-            elif date == "month":
-                date1 = date1 - timedelta(days=30)
-            elif date == "week":
-                date1 = date1 - timedelta(days=7)
-            elif date == "day":
-                date1 = date1 - timedelta(days=1)
-            elif date == "hour":
-                date1 = date1 - timedelta(hours=1)
-            else:
-                # format expected "Jun 1 2005 01:33", "%b %d %Y %H:%M"
-                try:
-                    date1 = datetime.datetime.strptime(date, "%b %d %Y %H:%M")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                # format expected "1 Jun 2005 01:33", "%d %b %Y %H:%M"
-                try:
-                    date1 = datetime.datetime.strptime(date, "%d %b %Y %H:%M")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                # format expected "1 June 2005 01:33", "%d %B %Y %H:%M"
-                try:
-                    date1 = datetime.datetime.strptime(date, "%d %B %Y %H:%M")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                # format expected "01:33 1 Jun 2005", "%H:%M %d %b %Y"
-                try:
-                    date1 = datetime.datetime.strptime(date,
-                                                       "%H:%M %d %b %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                # format expected "01:33 1 June 2005", "%H:%M %d %B %Y"
-                try:
-                    date1 = datetime.datetime.strptime(date,
-                                                       "%H:%M %d %B %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                try:
-                    date1 = datetime.datetime.strptime(date, "%b %d %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                try:
-                    date1 = datetime.datetime.strptime(date, "%d %b %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                try:
-                    date1 = datetime.datetime.strptime(date, "%B %d %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
-
-                try:
-                    date1 = datetime.datetime.strptime(date, "%d %B %Y")
-                except:
-                    # logger.warning("Attempted to parse date")
-                    pass
+            date1 = _parse_date_str(date)
+
+            # If we can't parse the date, default to now
+            if date1 is None:
+                date1 = datetime.datetime.utcnow()
         else:
             import pandas
 
@@ -710,7 +778,7 @@ class MarketDataRequest:
 
     @fx_vol_part.setter
     def fx_vol_part(self, fx_vol_part):
-        self.__fx_vol_part = fx_vol_part
+        self.__fx_vol_part = _freeze(fx_vol_part)
         
     @property
     def fx_vol_tenor(self):
@@ -718,7 +786,7 @@ class MarketDataRequest:
 
     @fx_vol_tenor.setter
     def fx_vol_tenor(self, fx_vol_tenor):
-        self.__fx_vol_tenor = fx_vol_tenor
+        self.__fx_vol_tenor = _freeze(fx_vol_tenor)
         
     @property
     def fx_forwards_tenor(self):
@@ -726,7 +794,7 @@ class MarketDataRequest:
 
     @fx_forwards_tenor.setter
     def fx_forwards_tenor(self, fx_forwards_tenor):
-        self.__fx_forwards_tenor = fx_forwards_tenor
+        self.__fx_forwards_tenor = _freeze(fx_forwards_tenor)
 
     @property
     def base_depos_currencies(self):
@@ -734,7 +802,7 @@ class MarketDataRequest:
 
     @base_depos_currencies.setter
     def base_depos_currencies(self, base_depos_currencies):
-        self.__base_depos_currencies = base_depos_currencies
+        self.__base_depos_currencies = _freeze(base_depos_currencies)
         
     @property
     def base_depos_tenor(self):
@@ -742,7 +810,7 @@ class MarketDataRequest:
 
     @base_depos_tenor.setter
     def base_depos_tenor(self, base_depos_tenor):
-        self.__base_depos_tenor = base_depos_tenor
+        self.__base_depos_tenor = _freeze(base_depos_tenor)
         
     @property
     def data_engine(self):
@@ -807,7 +875,7 @@ class MarketDataRequest:
         if not isinstance(pretransformation, list):
             pretransformation = [pretransformation]
 
-        self.__pretransformation = pretransformation
+        self.__pretransformation = _freeze(pretransformation)
         
     @property
     def vintage_as_index(self):
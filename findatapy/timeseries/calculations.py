@@ -23,20 +23,22 @@ import numpy
 import pandas as pd
 import pandas.tseries.offsets
 
-try:
-    from pandas.stats.api import ols
-except:
-    # temporary fix to get compilation, need to rewrite regression code to get
-    # this to work
-    # later versions of pandas no longer support OLS
+
+def __getattr__(name):
+    # Later versions of pandas no longer support OLS, so ols comes from
+    # StatsModels, which is slow to import, so only import it if it's used
     #
     # fails with SciPy 1.3.0 unless we have the very latest version of
     # StatsModels pip install statsmodels==0.10.0rc2 --pre
-    #
-    try:
-        from statsmodels.formula.api import ols
-    except:
-        pass
+    if name == "ols":
+        try:
+            from pandas.stats.api import ols
+        except:
+            from statsmodels.formula.api import ols
+
+        return ols
+
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
 
 from findatapy.timeseries import Filter, Calendar, Timezone
 from findatapy.util.dataconstants import DataConstants
@@ -16,6 +16,9 @@ __author__ = "saeedamen"  # Saeed Amen
 #
 
 import re
+import threading
+
+from functools import reduce
 
 import numpy as np
 import pandas as pd
@@ -23,8 +26,6 @@ import pandas as pd
 import datetime
 from datetime import timedelta
 
-from pandas.tseries.offsets import BDay, CustomBusinessDay, Day, \
-    CustomBusinessMonthEnd, DateOffset
 from findatapy.timeseries.timezone import Timezone
 
 from findatapy.util.dataconstants import DataConstants
@@ -32,8 +33,327 @@ from findatapy.util.loggermanager import LoggerManager
 
 constants = DataConstants()
 
-# To speed up CustomBusinessDay
-# https://stackoverflow.com/questions/31523302/performance-of-pandas-custom-business-day-offset
+# Rather than applying pandas CustomBusinessDay offsets date by date, we move
+# whole arrays of dates with np.busday_offset (and a cached busdaycalendar)
+
+def _get_day_of_week(dates):
+    """Gets the day of the week (Monday = 0) for datetime64 dates"""
+    # 1 Jan 1970 was a Thursday
+    return (dates.astype("datetime64[D]").view("int64") + 3) % 7
+
+
+def _add_bus_days(days, n, busdaycal):
+    """Adds n business days to datetime64[D] dates, in the same way as
+    adding pandas CustomBusinessDay(n) (ie. dates which aren't business days
+    are first rolled back if n > 0, otherwise forward)"""
+    roll = 'forward' if n <= 0 else 'backward'
+
+    return np.busday_offset(days, n, roll=roll, busdaycal=busdaycal)
+
+
+def _add_months(days, months):
+    """Adds months to datetime64[D] dates, in the same way as adding pandas
+    DateOffset(months=months) (ie. the day is capped at the month end)"""
+    month = days.astype("datetime64[M]")
+    day_of_month = days - month.astype("datetime64[D]")
+
+    new_month = month + months
+    month_length = (new_month + 1).astype("datetime64[D]") \
+        - new_month.astype("datetime64[D]")
+
+    return new_month.astype("datetime64[D]") + np.minimum(
+        day_of_month, month_length - 1)
+
+
+def _add_bus_month_ends(days, n, busdaycal):
+    """Adds n (> 0) business month ends to datetime64[D] dates, in the same
+    way as adding pandas CustomBusinessMonthEnd(n)"""
+    month = days.astype("datetime64[M]")
+
+    # If we're before this month's business month end, it counts as the first
+    month_end = np.busday_offset((month + 1).astype("datetime64[D]") - 1, 0,
+                                 roll='backward', busdaycal=busdaycal)
+    month = month + n - (days < month_end)
+
+    return np.busday_offset((month + 1).astype("datetime64[D]") - 1, 0,
+                            roll='backward', busdaycal=busdaycal)
+
+
+def _get_year_start(year):
+    """Gets 1st Jan of a year as datetime64[D]"""
+    return np.datetime64(year - 1970, "Y").astype("datetime64[D]")
+
+
+class HolidayStore(object):
+    """Holds the holidays for each calendar as sorted (and unique) numpy
+    datetime64[ns] arrays. Calendars made from several others (eg. EURUSD
+    from EUR and USD) are combined the first time they are needed and then
+    kept.
+
+    Holidays are compiled for a range of years (by default
+    DataConstants.holidays_start_year to holidays_finish_year), which is
+    extended when dates outside it are needed (see extend_years). Calendars
+    are then only compiled for the years they don't already have.
+
+    Every Calendar shares the same HolidayStore (see get_instance) unless it
+    is given its own holidays, so the holidays table is read from disk at
+    most once per process, and only when holidays are first needed.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, holiday_df=None):
+        self._holiday_df = holiday_df
+        self._lock = threading.RLock()
+
+        self._start_year = constants.holidays_start_year
+        self._finish_year = constants.holidays_finish_year
+
+        # For each calendar, the holidays (and with weekends removed) with
+        # the years (start, finish) they have been compiled for
+        self._all_holidays = {}
+        self._weekday_holidays = {}
+
+        self._busdaycalendars = {}
+        self._table_holidays = {}
+
+    @staticmethod
+    def get_instance():
+        """Gets the HolidayStore shared by every Calendar, which uses the
+        holidays table in DataConstants.holidays_parquet_table
+
+        Returns
+        -------
+        HolidayStore
+        """
+        if HolidayStore._instance is None:
+            with HolidayStore._instance_lock:
+                if HolidayStore._instance is None:
+                    HolidayStore._instance = HolidayStore()
+
+        return HolidayStore._instance
+
+    def get_holiday_df(self):
+        """Gets the table of holidays for each calendar (reading it from
+        disk the first time)
+
+        Returns
+        -------
+        DataFrame
+        """
+        if self._holiday_df is None:
+            with self._lock:
+                if self._holiday_df is None:
+                    self._holiday_df = pd.read_parquet(
+                        constants.holidays_parquet_table)
+
+        return self._holiday_df
+
+    def get_years(self):
+        """Gets the years which holidays are compiled for
+
+        Returns
+        -------
+        int, int
+            Start and finish year (inclusive)
+        """
+        return self._start_year, self._finish_year
+
+    def extend_years(self, start_year=None, finish_year=None):
+        """Makes sure holidays are compiled for (at least) these years, any
+        calendars we already have are extended the next time they are used
+
+        Parameters
+        ----------
+        start_year : int
+            First year we need holidays for
+        finish_year : int
+            Last year we need holidays for
+        """
+        if (start_year is None or start_year >= self._start_year) and \
+                (finish_year is None or finish_year <= self._finish_year):
+            return
+
+        with self._lock:
+            if start_year is not None:
+                self._start_year = min(self._start_year, int(start_year))
+
+            if finish_year is not None:
+                self._finish_year = max(self._finish_year, int(finish_year))
+
+    def get_holidays(self, cal, weekdays_only=True):
+        """Gets the holidays for a calendar
+
+        Parameters
+        ----------
+        cal : str
+            Holiday calendar eg. "EUR" or "EURUSD"
+        weekdays_only : bool
+            Remove any holidays at weekends (default: True)
+
+        Returns
+        -------
+        np.ndarray (datetime64[ns])
+            Sorted holidays (read only, as they are shared)
+        """
+        if not weekdays_only:
+            return self._get_all_holidays(cal)
+
+        holidays, years = self._weekday_holidays.get(cal, (None, None))
+
+        if years != self.get_years():
+            with self._lock:
+                years = self.get_years()
+
+                holidays = self._get_all_holidays(cal)
+                holidays = holidays[_get_day_of_week(holidays) <= 4]
+                holidays.setflags(write=False)
+
+                self._weekday_holidays[cal] = (holidays, years)
+
+        return holidays
+
+    def get_busdaycalendar(self, cal=None):
+        """Gets a numpy busdaycalendar for a calendar, to use with
+        np.busday_offset etc.
+
+        Parameters
+        ----------
+        cal : str
+            Holiday calendar eg. "EURUSD" (or None for only weekends)
+
+        Returns
+        -------
+        np.busdaycalendar
+        """
+        if cal is None:
+            years = None
+        else:
+            years = self.get_years()
+
+        busdaycal, busdaycal_years = self._busdaycalendars.get(cal,
+                                                               (None, None))
+
+        if busdaycal is None or busdaycal_years != years:
+            with self._lock:
+                if cal is None:
+                    busdaycal = np.busdaycalendar()
+                else:
+                    years = self.get_years()
+                    busdaycal = np.busdaycalendar(
+                        holidays=self.get_holidays(cal).astype(
+                            "datetime64[D]"))
+
+                self._busdaycalendars[cal] = (busdaycal, years)
+
+        return busdaycal
+
+    def _get_all_holidays(self, cal):
+        holidays, years = self._all_holidays.get(cal, (None, None))
+
+        if years == self.get_years():
+            return holidays
+
+        with self._lock:
+            start_year, finish_year = self.get_years()
+            holidays, years = self._all_holidays.get(cal, (None, None))
+
+            if holidays is None:
+                holidays = self._compile_holidays(cal, start_year, finish_year)
+            elif years != (start_year, finish_year):
+                # Only compile the years we don't have yet (the years only
+                # ever get extended, so these are before/after what we have)
+                holidays_list = [holidays]
+
+                if start_year < years[0]:
+                    holidays_list.insert(0, self._compile_holidays(
+                        cal, start_year, years[0] - 1))
+
+                if finish_year > years[1]:
+                    holidays_list.append(self._compile_holidays(
+                        cal, years[1] + 1, finish_year))
+
+                holidays = np.concatenate(holidays_list)
+
+            holidays.setflags(write=False)
+
+            self._all_holidays[cal] = (holidays, (start_year, finish_year))
+
+        return holidays
+
+    def _compile_holidays(self, cal, start_year, finish_year):
+        """Creates the holidays for a calendar, for the years start_year to
+        finish_year (inclusive)
+        """
+        start_date = _get_year_start(start_year)
+        finish_date = _get_year_start(finish_year + 1)
+
+        # Eg. EURUSD (combine the holidays of EUR and USD, which are
+        # compiled for at least the same years)
+        if len(cal) == 6 or len(cal) == 9:
+            return reduce(np.union1d, [
+                self._slice_holidays(self._get_all_holidays(cal[i:i + 3]),
+                                     start_date, finish_date)
+                for i in range(0, len(cal), 3)])
+
+        years = np.arange(start_year - 1970, finish_year - 1970 + 1).astype(
+            "datetime64[Y]")
+        new_years_day = years.astype("datetime64[D]")
+
+        if cal == 'FX' or cal == 'NYX':
+            # Christmas & New Year's Day
+            christmas = (years.astype("datetime64[M]") + 11).astype(
+                "datetime64[D]") + 24
+
+            holidays = np.concatenate([christmas, new_years_day])
+
+        elif cal == 'NYD' or cal == 'NEWYEARSDAY':
+            holidays = new_years_day
+
+        elif cal == 'WDY' or cal == 'WEEKDAY':
+            # Weekends
+            days = np.arange(start_date, finish_date)
+
+            holidays = days[_get_day_of_week(days) >= 5]
+
+        elif cal == 'WKD':
+            holidays = np.array([], dtype="datetime64[D]")
+
+        else:
+            # Calendars which have been hardcoded in the parquet file (which
+            # users may also edit), so can't be created for other years
+            holidays = self._slice_holidays(self._get_table_holidays(cal),
+                                            start_date, finish_date)
+
+        return np.unique(holidays.astype("datetime64[ns]"))
+
+    def _get_table_holidays(self, cal):
+        holidays = self._table_holidays.get(cal)
+
+        if holidays is None:
+            label = cal + ".holiday-dates"
+
+            try:
+                holidays = np.unique(self.get_holiday_df()[label].dropna()
+                                     .to_numpy(dtype="datetime64[ns]"))
+            except:
+                logger = LoggerManager().getLogger(__name__)
+                logger.warning(cal + " holiday calendar not found.")
+
+                holidays = np.array([], dtype="datetime64[ns]")
+
+            self._table_holidays[cal] = holidays
+
+        return holidays
+
+    def _slice_holidays(self, holidays, start_date, finish_date):
+        """Gets the (sorted) holidays on or after start_date and before
+        finish_date
+        """
+        return holidays[holidays.searchsorted(start_date):
+                        holidays.searchsorted(finish_date)]
+
 
 class Calendar(object):
     """Provides calendar based functions for working out options expiries,
@@ -60,8 +380,11 @@ class Calendar(object):
                            '5Y': 252 * 5
                            }
 
-    def __init__(self):
-        self._holiday_df = pd.read_parquet(constants.holidays_parquet_table)
+    def __init__(self, holiday_store=None):
+        if holiday_store is None:
+            holiday_store = HolidayStore.get_instance()
+
+        self._holiday_store = holiday_store
 
     def flatten_list_of_lists(self, list_of_lists):
         """Flattens lists of obj, into a single list of strings (rather than
@@ -90,50 +413,7 @@ class Calendar(object):
         return list_of_lists
 
     def _get_full_cal(self, cal):
-        holidays_list = []
-
-        # Calendars which have been hardcoded in the parquet file (which users
-        # may also edit)
-        if len(cal) == 6:
-            # Eg. EURUSD (load EUR and USD calendars and combine the holidays)
-            holidays_list.append(
-                [self._get_full_cal(cal[0:3]), self._get_full_cal(cal[3:6])])
-        elif len(cal) == 9:
-            holidays_list.append(
-                [self._get_full_cal(cal[0:3]), self._get_full_cal(cal[3:6]),
-                 self._get_full_cal(cal[6:9])])
-        else:
-            if cal == 'FX' or cal == 'NYX':
-                # Filter for Christmas & New Year's Day
-                for i in range(1999, 2025):
-                    holidays_list.append(pd.Timestamp(str(i) + "-12-25"))
-                    holidays_list.append(pd.Timestamp(str(i) + "-01-01"))
-
-            elif cal == 'NYD' or cal == 'NEWYEARSDAY':
-                # Filter for New Year's Day
-                for i in range(1999, 2025):
-                    holidays_list.append(pd.Timestamp(str(i) + "-01-01"))
-
-            elif cal == 'WDY' or cal == 'WEEKDAY':
-                bday = CustomBusinessDay(weekmask='Sat Sun')
-
-                holidays_list.append([x for x in pd.date_range('01 Jan 1999',
-                                                               '31 Dec 2025',
-                                                               freq=bday)])
-            elif cal == 'WKD':  #
-                pass
-                # holidays_list.append()
-
-            else:
-                label = cal + ".holiday-dates"
-
-                try:
-                    holidays_list = self._holiday_df[label].dropna().tolist()
-                except:
-                    logger = LoggerManager().getLogger(__name__)
-                    logger.warning(cal + " holiday calendar not found.")
-
-        return holidays_list
+        return self._holiday_store.get_holidays(cal, weekdays_only=False)
 
     def create_calendar_bus_days(self, start_date, end_date, cal='FX'):
         """Creates a calendar of business days
@@ -174,46 +454,43 @@ class Calendar(object):
         -------
         list
         """
-        # holidays_list ,  = []
-
-        # TODO use Pandas CustomBusinessDays to get more calendars
-        holidays_list = self._get_full_cal(cal)
-        # .append(lst)
-
-        # Use 'set' so we don't have duplicate dates if we are incorporating
-        # multiple calendars
-        holidays_list = np.array(
-            list(set(self.flatten_list_of_lists(holidays_list))))
-        holidays_list = pd.to_datetime(
-            holidays_list).sort_values().tz_localize('UTC')
-
         # Floor start date
         if start_date is not None:
-            start_date = pd.Timestamp(start_date).floor('D')
+            start_date = self._to_utc_datetime64(
+                pd.Timestamp(start_date).floor('D'))
 
-            try:
-                start_date = start_date.tz_localize('UTC')
-            except:
-                pass
+        if end_date is not None:
+            # Ceiling end date
+            end_date = self._to_utc_datetime64(
+                pd.Timestamp(end_date).ceil('D'))
 
-            holidays_list = holidays_list[(holidays_list >= start_date)]
+        # Compile holidays for any years we don't have yet
+        self._holiday_store.extend_years(self._get_year(start_date),
+                                         self._get_year(end_date))
+
+        # Remove all weekends (note: even for the WEEKDAY calendar)
+        holidays = self._holiday_store.get_holidays(cal)
+
+        if start_date is not None:
+            holidays = holidays[holidays.searchsorted(start_date):]
 
         if end_date is not None:
-            # Ceiling end date
-            end_date = pd.Timestamp(end_date).ceil('D')
+            holidays = holidays[:holidays.searchsorted(end_date,
+                                                       side='right')]
 
-            try:
-                end_date = end_date.tz_localize('UTC')
-            except:
-                pass
+        return pd.DatetimeIndex(holidays).tz_localize('UTC')
 
-            holidays_list = holidays_list[(holidays_list <= end_date)]
+    def _to_utc_datetime64(self, date):
+        if date.tz is not None:
+            date = date.tz_convert('UTC').tz_localize(None)
 
-        # Remove all weekends unless it is WEEKDAY calendar
-        if cal != 'WEEKDAY' or cal != 'WKY':
-            holidays_list = holidays_list[holidays_list.dayofweek <= 4]
+        return date.to_datetime64().astype("datetime64[ns]")
 
-        return holidays_list
+    def _get_year(self, date):
+        if date is None or np.isnat(date):
+            return None
+
+        return int(date.astype("datetime64[Y]").astype("int64")) + 1970
 
     def get_business_days_tenor(self, tenor):
         if tenor in self._tenor_bus_day_dict.keys():
@@ -229,65 +506,161 @@ class Calendar(object):
         if unit == 'days':
             return (date2 - date1).days
 
+    def get_busdaycalendar(self, cal=None):
+        """Gets a numpy busdaycalendar for a holiday calendar (these are
+        kept, so they are only created once for each calendar)
+
+        Parameters
+        ----------
+        cal : str
+            Holiday calendar eg. "EURUSD" (or None for only weekends)
+
+        Returns
+        -------
+        np.busdaycalendar
+        """
+        return self._holiday_store.get_busdaycalendar(cal)
+
+    def _split_dates(self, dates, years_ahead=1):
+        """Splits dates into numpy datetime64[D] days, and the details we
+        need to convert them back (time of day, time zone etc.), so we can
+        move them by business days in one call, rather than date by date.
+
+        Also makes sure holidays are compiled for the years of the dates
+        (and years_ahead after them, which we might move the dates into).
+        """
+        is_scalar = isinstance(dates, (datetime.date, np.datetime64))
+        series_index = dates.index if isinstance(dates, pd.Series) else None
+
+        dates = pd.DatetimeIndex([dates] if is_scalar else dates)
+        tz = dates.tz
+
+        if tz is not None:
+            dates = dates.tz_localize(None)
+
+        values = dates.values
+        days = values.astype("datetime64[D]")
+
+        years = days[~np.isnat(days)]
+
+        if len(years) > 0:
+            self._holiday_store.extend_years(
+                self._get_year(years.min()),
+                self._get_year(years.max()) + years_ahead)
+
+        return days, (values - days, tz, is_scalar, series_index)
+
+    def _join_dates(self, days, dates_info, as_index=False):
+        """Converts days back into the same type of dates as given to
+        _split_dates (or always a DatetimeIndex if as_index is True)
+        """
+        time_of_day, tz, is_scalar, series_index = dates_info
+
+        dates = pd.DatetimeIndex(days.astype("datetime64[ns]") + time_of_day)
+
+        if tz is not None:
+            dates = dates.tz_localize(tz)
+
+        if as_index:
+            return dates
+
+        if is_scalar:
+            return dates[0]
+
+        if series_index is not None:
+            return pd.Series(dates, index=series_index)
+
+        return dates
+
+    def _get_tenor(self, tenor):
+        tenor_unit = ''.join(re.compile(r'\D+').findall(tenor))
+        tenor_digit = ''.join(re.compile(r'\d+').findall(tenor))
+
+        if tenor_digit != '':
+            tenor_digit = int(tenor_digit)
+
+        return tenor_unit, tenor_digit
+
+    def _get_tenor_years(self, tenor_unit, tenor_digit):
+        """Approximately how many years ahead a tenor could move dates"""
+        if tenor_unit == 'Y':
+            return tenor_digit + 1
+        elif tenor_unit == 'M':
+            return tenor_digit // 12 + 1
+
+        return 1
+
     def get_delivery_date_from_horizon_date(self, horizon_date, tenor,
                                             cal=None, asset_class='fx'):
+        """Calculates the delivery date of FX forwards, based on the horizon
+        date, the tenor and the holiday calendar associated with the asset.
+
+        Parameters
+        ----------
+        horizon_date : pd.Timestamp (collection)
+            Horizon date of contract
+
+        tenor : str
+            Tenor of the contract
+
+        cal : str
+            Holiday calendar (usually related to the asset)
+
+        asset_class : str
+            'fx' - FX forwards (default)
+
+        Returns
+        -------
+        pd.Timestamp (collection)
+        """
         if 'fx' in asset_class:
-            tenor_unit = ''.join(re.compile(r'\D+').findall(tenor))
-            asset_holidays = self.get_holidays(cal=cal)
+            tenor_unit, tenor_digit = self._get_tenor(tenor)
+
+            days, dates_info = self._split_dates(
+                horizon_date, self._get_tenor_years(tenor_unit, tenor_digit))
+
+            busdaycal = self.get_busdaycalendar(cal)
 
             if tenor_unit == 'ON':
-                return horizon_date + CustomBusinessDay(n=1,
-                                                        holidays=asset_holidays)
+                return self._join_dates(
+                    _add_bus_days(days, 1, busdaycal), dates_info)
             elif tenor_unit == 'TN':
-                return horizon_date + CustomBusinessDay(n=2,
-                                                        holidays=asset_holidays)
-            elif tenor_unit == 'SP':
-                pass
+                return self._join_dates(
+                    _add_bus_days(days, 2, busdaycal), dates_info)
             elif tenor_unit == 'SN':
                 tenor_unit = 'D'
                 tenor_digit = 1
-            else:
-                tenor_digit = int(''.join(re.compile(r'\d+').findall(tenor)))
 
-            horizon_date = self.get_spot_date_from_horizon_date(
-                horizon_date, cal, asset_holidays=asset_holidays)
+            days = self._get_spot_days(days, cal, busdaycal)
 
             if 'SP' in tenor_unit:
-                return horizon_date
+                return self._join_dates(days, dates_info)
             elif tenor_unit == 'D':
-                return horizon_date + CustomBusinessDay(
-                    n=tenor_digit, holidays=asset_holidays)
+                return self._join_dates(
+                    _add_bus_days(days, tenor_digit, busdaycal), dates_info)
             elif tenor_unit == 'W':
-                return horizon_date + Day(
-                    n=tenor_digit * 7) + CustomBusinessDay(
-                    n=0, holidays=asset_holidays)
+                return self._join_dates(
+                    _add_bus_days(days + tenor_digit * 7, 0, busdaycal),
+                    dates_info)
             else:
                 if tenor_unit == 'Y':
                     tenor_digit = tenor_digit * 12
 
-                horizon_period_end = horizon_date + CustomBusinessMonthEnd(
-                    tenor_digit + 1)
-                horizon_floating = horizon_date + DateOffset(
-                    months=tenor_digit)
-
-                cbd = CustomBusinessDay(n=1, holidays=asset_holidays)
-
-                delivery_date = []
-
-                if isinstance(horizon_period_end, pd.Timestamp):
-                    horizon_period_end = [horizon_period_end]
-
-                if isinstance(horizon_floating, pd.Timestamp):
-                    horizon_floating = [horizon_floating]
+                return self._join_dates(
+                    self._get_delivery_days(days, tenor_digit, busdaycal),
+                    dates_info, as_index=True)
 
-                for period_end, floating in zip(horizon_period_end,
-                                                horizon_floating):
-                    if floating < period_end:
-                        delivery_date.append(floating - cbd + cbd)
-                    else:
-                        delivery_date.append(period_end)
+    def _get_delivery_days(self, spot_days, months, busdaycal):
+        """Delivery dates for monthly tenors, from the spot dates (if the
+        spot date is the last business day of the month, delivery is also
+        at the month end)
+        """
+        period_end = _add_bus_month_ends(spot_days, months + 1,
+                                         self.get_busdaycalendar())
+        floating = _add_months(spot_days, months)
 
-                return pd.DatetimeIndex(delivery_date)
+        return np.where(floating < period_end,
+                        _add_bus_days(floating, 0, busdaycal), period_end)
 
     def get_expiry_date_from_horizon_date(self, horizon_date, tenor, cal=None,
                                           asset_class='fx-vol'):
@@ -315,57 +688,34 @@ class Calendar(object):
         pd.Timestamp (collection)
         """
         if asset_class == 'fx-vol':
+            tenor_unit, tenor_digit = self._get_tenor(tenor)
 
-            tenor_unit = ''.join(re.compile(r'\D+').findall(tenor))
+            days, dates_info = self._split_dates(
+                horizon_date, self._get_tenor_years(tenor_unit, tenor_digit))
 
-            asset_holidays = self.get_holidays(cal=cal)
+            busdaycal = self.get_busdaycalendar(cal)
 
             if tenor_unit == 'ON':
-                tenor_digit = 1;
+                tenor_digit = 1
                 tenor_unit = 'D'
-            else:
-                tenor_digit = int(''.join(re.compile(r'\d+').findall(tenor)))
 
             if tenor_unit == 'D':
-                return horizon_date + CustomBusinessDay(
-                    n=tenor_digit, holidays=asset_holidays)
+                return self._join_dates(
+                    _add_bus_days(days, tenor_digit, busdaycal), dates_info)
             elif tenor_unit == 'W':
-                return horizon_date + Day(
-                    n=tenor_digit * 7) + CustomBusinessDay(
-                    n=0, holidays=asset_holidays)
+                return self._join_dates(
+                    _add_bus_days(days + tenor_digit * 7, 0, busdaycal),
+                    dates_info)
             else:
-                horizon_date = self.get_spot_date_from_horizon_date(
-                    horizon_date, cal, asset_holidays=asset_holidays)
+                days = self._get_spot_days(days, cal, busdaycal)
 
-                if tenor_unit == 'M':
-                    pass
-                elif tenor_unit == 'Y':
+                if tenor_unit == 'Y':
                     tenor_digit = tenor_digit * 12
 
-                cbd = CustomBusinessDay(n=1, holidays=asset_holidays)
-
-                horizon_period_end = horizon_date + CustomBusinessMonthEnd(
-                    tenor_digit + 1)
-                horizon_floating = horizon_date + DateOffset(
-                    months=tenor_digit)
-
-                delivery_date = []
-
-                if isinstance(horizon_period_end, pd.Timestamp):
-                    horizon_period_end = [horizon_period_end]
-
-                if isinstance(horizon_floating, pd.Timestamp):
-                    horizon_floating = [horizon_floating]
-
                 # TODO: double check this!
-                for period_end, floating in zip(horizon_period_end,
-                                                horizon_floating):
-                    if floating < period_end:
-                        delivery_date.append(floating - cbd + cbd)
-                    else:
-                        delivery_date.append(period_end)
-
-                delivery_date = pd.DatetimeIndex(delivery_date)
+                delivery_date = self._join_dates(
+                    self._get_delivery_days(days, tenor_digit, busdaycal),
+                    dates_info, as_index=True)
 
                 return self.get_expiry_date_from_delivery_date(delivery_date,
                                                                cal)
@@ -381,39 +731,54 @@ class Calendar(object):
 
     def get_spot_date_from_horizon_date(self, horizon_date, asset,
                                         asset_holidays=None):
+        busdaycal = None
+
+        if asset_holidays is not None:
+            asset_holidays = pd.DatetimeIndex(asset_holidays)
+
+            if asset_holidays.tz is not None:
+                asset_holidays = asset_holidays.tz_localize(None)
+
+            busdaycal = np.busdaycalendar(
+                holidays=asset_holidays.values.astype("datetime64[D]"))
+
+        days, dates_info = self._split_dates(horizon_date)
+
+        return self._join_dates(
+            self._get_spot_days(days, asset, busdaycal), dates_info)
+
+    def _get_spot_days(self, days, asset, busdaycal=None):
         base = asset[0:3]
         terms = asset[3:6]
 
         settlement_T = self._get_settlement_T(asset)
 
-        if asset_holidays is None:
-            asset_holidays = self.get_holidays(cal=asset)
+        if busdaycal is None:
+            busdaycal = self.get_busdaycalendar(asset)
 
         # First adjustment step
         if settlement_T == 2:
             if base in ['MXN', 'ARS', 'CLP'] or terms in ['MXN', 'ARS', 'CLP']:
-                horizon_date = horizon_date + BDay(1)
+                days = _add_bus_days(days, 1, self.get_busdaycalendar())
             else:
                 if base == 'USD':
-                    horizon_date = horizon_date + CustomBusinessDay(
-                        holidays=self.get_holidays(cal=terms))
+                    days = _add_bus_days(days, 1,
+                                         self.get_busdaycalendar(terms))
                 elif terms == 'USD':
-                    horizon_date = horizon_date + CustomBusinessDay(
-                        holidays=self.get_holidays(cal=base))
+                    days = _add_bus_days(days, 1,
+                                         self.get_busdaycalendar(base))
                 else:
-                    horizon_date = horizon_date + CustomBusinessDay(
-                        holidays=asset_holidays)
+                    days = _add_bus_days(days, 1, busdaycal)
 
         if 'USD' not in asset:
-            asset_holidays = self.get_holidays(cal='USD' + asset)
+            busdaycal = self.get_busdaycalendar('USD' + asset)
 
         # Second adjustment step - move forward if horizon_date isn't a good
         # business day in base, terms or USD
         if settlement_T <= 2:
-            horizon_date = horizon_date + CustomBusinessDay(
-                holidays=asset_holidays)
+            days = _add_bus_days(days, 1, busdaycal)
 
-        return horizon_date
+        return days
 
     def get_delivery_date_from_spot_date(self, spot_date, cal):
         pass
@@ -427,12 +792,11 @@ class Calendar(object):
         elif terms == 'USD':
             cal = base
 
-        hols = self.get_holidays(cal=cal + 'NYD')
+        days, dates_info = self._split_dates(delivery_date)
 
-        # cbd = CustomBusinessDay(1, holidays=self.get_holidays(cal=cal))
-
-        return delivery_date - CustomBusinessDay(self._get_settlement_T(cal),
-                                                 holidays=hols)  # - cbd + cbd
+        return self._join_dates(
+            _add_bus_days(days, -self._get_settlement_T(cal),
+                          self.get_busdaycalendar(cal + 'NYD')), dates_info)
 
     def align_to_NY_cut_in_UTC(self, date_time, hour_of_day=10):
 
@@ -460,44 +824,19 @@ class Calendar(object):
         """ Returns the business day of the month (ie. 3rd Jan, on a Monday,
         would be the 1st business day of the month)
         """
+        # Strip times off the dates - for business dates just want dates!
+        days, _ = self._split_dates(date)
 
-        try:
-            # Strip times off the dates - for business dates just want dates!
-            date = date.normalize()
-        except:
-            pass
-
-        start = pd.to_datetime(
-            datetime.datetime(date.year[0], date.month[0], 1))
-        end = pd.Timestamp(
-            datetime.datetime.today())
-        # pd.to_datetime(datetime.datetime(date.year[-1], date.month[-1], date.day[-1]))
-
-        holidays = self.get_holidays(start_date=start, end_date=end, cal=cal)
-
-        # bday = CustomBusinessDay(holidays=holidays, weekmask='Mon Tue Wed Thu Fri')
-
-        holidays = holidays.tz_localize(None).date
+        busdaycal = self.get_busdaycalendar(cal)
 
-        bus_dates = pd.bdate_range(start, end)
+        # Dates which aren't business days, count as the next business day
+        bus_days = np.busday_offset(days, 0, roll='forward',
+                                    busdaycal=busdaycal)
 
-        # Not most efficient way...
-        bus_dates = pd.to_datetime([x for x in bus_dates if x not in holidays])
+        month_start = bus_days.astype("datetime64[M]").astype("datetime64[D]")
 
-        month = bus_dates.month
-
-        work_day_index = np.zeros(len(bus_dates))
-        work_day_index[0] = 1
-
-        for i in range(1, len(bus_dates)):
-            if month[i] == month[i - 1]:
-                work_day_index[i] = work_day_index[i - 1] + 1
-            else:
-                work_day_index[i] = 1
-
-        bus_day_of_month = work_day_index[bus_dates.searchsorted(date)]
-
-        return bus_day_of_month
+        return np.busday_count(month_start, bus_days,
+                               busdaycal=busdaycal) + 1.0
 
     def set_market_holidays(self, holiday_df):
-        self._holiday_df = holiday_df
+        self._holiday_store = HolidayStore(holiday_df)
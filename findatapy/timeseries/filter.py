@@ -20,6 +20,8 @@ import pandas as pd
 import pytz
 
 import datetime
+import threading
+import weakref
 from datetime import timedelta
 
 from findatapy.timeseries.calendar import Calendar
@@ -45,9 +47,82 @@ class Filter(object):
 
     _time_series_cache = {}  # shared across all instances of object!
 
+    # Minute of the day for each DatetimeIndex we've filtered by time of day
+    # (for each time zone), shared across all instances and dropped when the
+    # index is garbage collected
+    _minute_of_day_cache = {}
+    _minute_of_day_lock = threading.Lock()
+
+    # Days of the week for the trading sessions of
+    # create_FX_1_min_trading_index
+    _week_days = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5,
+                  'Sun': 6}
+
     def __init__(self):
         self._calendar = Calendar()
 
+    def get_minute_of_day(self, index, tz=None):
+        """Gets the minute of the day (hour * 60 + minute) of each point in a
+        DatetimeIndex, so we can filter by time of day with integer
+        comparisons. These are computed once for each index and time zone,
+        and then kept while the index is being used.
+
+        Parameters
+        ----------
+        index : DatetimeIndex
+            Dates to get the minute of the day for
+        tz : str (optional)
+            Time zone for the time of day (default: time zone of index)
+
+        Returns
+        -------
+        np.ndarray (int16)
+            Minute of the day (-1 for NaT)
+        """
+        key = id(index)
+        tz_key = None if tz is None else str(tz)
+
+        entry = Filter._minute_of_day_cache.get(key)
+
+        if entry is not None and entry[0]() is index:
+            minute_of_day = entry[1].get(tz_key)
+
+            if minute_of_day is not None:
+                return minute_of_day
+
+        dates = index
+
+        if tz is not None:
+            dates = dates.tz_convert(tz)
+
+        # Use the local time of day (rather than UTC)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+
+        minute_of_day = ((dates.asi8 // 60000000000) % 1440).astype(np.int16)
+
+        if dates.hasnans:
+            minute_of_day[dates.isna()] = -1
+
+        minute_of_day.setflags(write=False)
+
+        with Filter._minute_of_day_lock:
+            entry = Filter._minute_of_day_cache.get(key)
+
+            if entry is None or entry[0]() is not index:
+                def remove_entry(index_ref, key=key):
+                    with Filter._minute_of_day_lock:
+                        if Filter._minute_of_day_cache.get(
+                                key, (None,))[0] is index_ref:
+                            del Filter._minute_of_day_cache[key]
+
+                entry = (weakref.ref(index, remove_entry), {})
+                Filter._minute_of_day_cache[key] = entry
+
+            entry[1][tz_key] = minute_of_day
+
+        return minute_of_day
+
     def filter_time_series(self, md_request, data_frame,
                            pad_columns=False, filter_by_column_names=True):
         """Filters a time series given a set of criteria (like start/finish 
@@ -85,7 +160,8 @@ class Filter(object):
         return data_frame
 
     def filter_time_series_by_holidays(self, data_frame, cal='FX',
-                                       holidays_list=[]):
+                                       holidays_list=[], holiday_tz=None,
+                                       holiday_start_hour=0):
         """Removes holidays from a given time series
 
         Parameters
@@ -94,6 +170,14 @@ class Filter(object):
             data frame to be filtered
         cal : str
             business calendar to use
+        holiday_tz : str
+            time zone of the holidays (default: UTC for time zone aware data,
+            otherwise the same time zone as the data), time zone naive data
+            is assumed to be UTC if this is set
+        holiday_start_hour : int
+            hour (in holiday_tz) when each holiday starts, eg. -7 with
+            'America/New_York' for holidays starting at 5pm NY on the
+            previous day (like FX)
 
         Returns
         -------
@@ -104,60 +188,43 @@ class Filter(object):
         if (cal == 'WEEKDAY' or cal == 'WKY'):
             return data_frame[data_frame.index.dayofweek <= 4]
 
+        if len(data_frame.index) == 0:
+            return data_frame
+
+        index = data_frame.index
+
         # Select only those holidays in the sample
-        holidays_start = self._calendar.get_holidays(
-            data_frame.index[0],
-            data_frame.index[-1], cal,
+        holidays = self._calendar.get_holidays(
+            index.min() - pd.Timedelta(days=1),
+            index.max() + pd.Timedelta(days=1), cal,
             holidays_list=holidays_list)
 
-        if holidays_start.size == 0:
+        if holidays.size == 0:
             return data_frame
 
-        holidays_end = holidays_start + np.timedelta64(1, 'D')
+        holidays = holidays.tz_localize(None).values.astype("datetime64[D]")
 
-        # floored_dates = data_frame.index.normalize()
-        #
-        # filter_by_index_start = floored_dates.searchsorted(holidays_start)
-        # filter_by_index_end = floored_dates.searchsorted(holidays_end)
-        #
-        # indices_to_keep = []
-        #
-        # if filter_by_index_end[0] == 0:
-        #     counter = filter_by_index_end[0] + 1
-        #     start_index = 1
-        # else:
-        #     counter = 0
-        #     start_index = 0
-        #
-        # for i in range(start_index, len(holidays_start)):
-        #     indices = list(range(counter, filter_by_index_start[i] - 1))
-        #     indices_to_keep = indices_to_keep + indices
-        #
-        #     counter = filter_by_index_end[i] + 1
-        #
-        # indices = list(range(counter, len(floored_dates)))
-        # indices_to_keep = indices_to_keep + indices
-        #
-        # data_frame_filtered = data_frame[indices_to_keep]
+        # Find the day of each point, in the time zone of the holidays
+        if holiday_tz is not None:
+            if index.tz is None:
+                index = index.tz_localize('UTC')
 
-        if data_frame.index.tz is None:
-            holidays_start = holidays_start.tz_localize(None)
-            holidays_end = holidays_end.tz_localize(None)
+            index = index.tz_convert(holiday_tz).tz_localize(None)
+        elif index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
 
-        data_frame_left = data_frame
-        data_frame_filtered = []
+        dates = index.values
 
-        for i in range(0, len(holidays_start)):
-            data_frame_temp = data_frame_left[
-                data_frame_left.index < holidays_start[i]]
-            data_frame_left = data_frame_left[
-                data_frame_left.index >= holidays_end[i]]
+        if holiday_start_hour != 0:
+            dates = dates - np.timedelta64(holiday_start_hour, 'h')
 
-            data_frame_filtered.append(data_frame_temp)
+        dates = dates.astype("datetime64[D]")
 
-        data_frame_filtered.append(data_frame_left)
+        # Holidays are sorted, so we can match every point in one go
+        holiday_pos = np.minimum(holidays.searchsorted(dates),
+                                 len(holidays) - 1)
 
-        return pd.concat(data_frame_filtered)
+        return data_frame[holidays[holiday_pos] != dates]
 
     def filter_time_series_by_date(self, start_date, finish_date, data_frame):
         """Filter time series by start/finish dates
@@ -396,7 +463,21 @@ class Filter(object):
         # Slower method..
         # return data_frame.loc[start_date:finish_date]
 
-        # Much faster, start and finish dates are inclusive
+        index = data_frame.index
+
+        # If the index is sorted (which pandas caches), use a binary search
+        # to find where the window starts/finishes, and slice out a view,
+        # rather than comparing every point (start and finish dates are
+        # inclusive)
+        if isinstance(index, pd.DatetimeIndex) \
+                and start_date is not None and finish_date is not None \
+                and index.is_monotonic_increasing:
+            start_index = index.searchsorted(start_date, side='left')
+            finish_index = index.searchsorted(finish_date, side='right')
+
+            return data_frame.iloc[start_index:finish_index]
+
+        # Otherwise for unsorted data, start and finish dates are inclusive
         return data_frame[(data_frame.index >= start_date) & (
                     data_frame.index <= finish_date)]
 
@@ -404,15 +485,10 @@ class Filter(object):
                                                    data_frame,
                                                    timezone_of_snap='UTC'):
 
-        old_tz = data_frame.index.tz
-        data_frame = data_frame.tz_convert(pytz.timezone(timezone_of_snap))
+        minute_of_day = self.get_minute_of_day(
+            data_frame.index, pytz.timezone(timezone_of_snap))
 
-        data_frame = data_frame[data_frame.index.minute == minute]
-        data_frame = data_frame[data_frame.index.hour == hour]
-
-        data_frame = data_frame.tz_convert(old_tz)
-
-        return data_frame
+        return data_frame[minute_of_day == hour * 60 + minute]
 
     def filter_time_series_by_time_of_day(self, hour, minute, data_frame,
                                           in_tz=None, out_tz=None):
@@ -447,10 +523,9 @@ class Filter(object):
             # change internal representation of time
             data_frame.index = pd.DatetimeIndex(data_frame.index.values)
 
-        data_frame = data_frame[data_frame.index.minute == minute]
-        data_frame = data_frame[data_frame.index.hour == hour]
+        minute_of_day = self.get_minute_of_day(data_frame.index)
 
-        return data_frame
+        return data_frame[minute_of_day == hour * 60 + minute]
 
     def filter_time_series_by_minute_of_hour(self, minute, data_frame,
                                              in_tz=None, out_tz=None):
@@ -480,9 +555,9 @@ class Filter(object):
             # change internal representation of time
             data_frame.index = pd.DatetimeIndex(data_frame.index.values)
 
-        data_frame = data_frame[data_frame.index.minute == minute]
+        minute_of_day = self.get_minute_of_day(data_frame.index)
 
-        return data_frame
+        return data_frame[minute_of_day % 60 == minute]
 
     def filter_time_series_between_hours(self, start_hour, finish_hour,
                                          data_frame):
@@ -502,10 +577,9 @@ class Filter(object):
         DataFrame
         """
 
-        data_frame = data_frame[data_frame.index.hour <= finish_hour]
-        data_frame = data_frame[data_frame.index.hour >= start_hour]
+        hour = self.get_minute_of_day(data_frame.index) // 60
 
-        return data_frame
+        return data_frame[(hour >= start_hour) & (hour <= finish_hour)]
 
     def filter_time_series_by_columns(self, columns, data_frame):
         """Filter time series by certain columns
@@ -541,13 +615,9 @@ class Filter(object):
         -------
         DataFrame
         """
-        old_columns = data_frame.columns.tolist()
-
-        common_columns = [val for val in columns if val in old_columns]
-        uncommon_columns = [val for val in columns if val not in old_columns]
-        uncommon_columns = [str(x) for x in uncommon_columns]
+        old_columns = set(data_frame.columns)
 
-        data_frame = data_frame[common_columns]
+        uncommon_columns = [x for x in columns if x not in old_columns]
 
         if len(uncommon_columns) > 0:
             logger = LoggerManager().getLogger(__name__)
@@ -555,33 +625,45 @@ class Filter(object):
             logger.info(
                 "Padding missing columns...")  # " + str(uncommon_columns))
 
-            new_data_frame = pd.DataFrame(index=data_frame.index,
-                                          columns=uncommon_columns)
+        if not data_frame.columns.is_unique:
+            return self._pad_time_series_columns_duplicated(
+                columns, data_frame, uncommon_columns)
 
-            data_frame = pd.concat([data_frame, new_data_frame], axis=1)
+        # Select and pad the columns (in the final order) in one go, new
+        # columns are float NaNs (not objects which causes problems with
+        # newer pandas versions), and other columns keep their dtypes
+        data_frame = data_frame.reindex(columns=columns)
 
-            # Force new columns to float NaNs (not objects which causes
-            # problems with newer pandas versions)
-            # or to NaT if they are date columns
-            for u in uncommon_columns:
-                is_date = False
+        # Date columns are NaT instead
+        date_columns = [u for u in uncommon_columns
+                        if self._is_date_column(u)]
 
-                for c in constants.always_date_columns:
-                    if c in u:
-                        is_date = True
+        if len(date_columns) > 0:
+            data_frame = data_frame.astype(
+                {u: 'datetime64[ns]' for u in date_columns})
 
-                if is_date:
-                    data_frame[u] = np.datetime64('NaT')
-                else:
-                    data_frame[u] = np.nan
+        return data_frame
 
-            # SLOW method below
-            # for x in uncommon_columns: data_frame.loc[:,x] = np.nan
+    def _is_date_column(self, column):
+        for c in constants.always_date_columns:
+            if c in str(column):
+                return True
 
-        # Get columns in same order again
-        data_frame = data_frame[columns]
+        return False
 
-        return data_frame
+    def _pad_time_series_columns_duplicated(self, columns, data_frame,
+                                            uncommon_columns):
+        # reindex can't be used if data_frame has duplicated columns
+        data_frame = data_frame[[x for x in columns
+                                 if x not in uncommon_columns]].copy()
+
+        for u in uncommon_columns:
+            if self._is_date_column(u):
+                data_frame[u] = np.datetime64('NaT', 'ns')
+            else:
+                data_frame[u] = np.nan
+
+        return data_frame[columns]
 
     def filter_time_series_by_excluded_keyword(self, keyword, data_frame):
         """Filter time series to exclude columns which contain keyword
@@ -662,7 +744,9 @@ class Filter(object):
         -------
         DataFrame
         """
-        return data_frame.loc[data_frame.index.minute % freq == 0]
+        minute_of_day = self.get_minute_of_day(data_frame.index)
+
+        return data_frame.loc[(minute_of_day % 60) % freq == 0]
 
     def create_tickers_fields_list(self, md_request):
         """Creates a list of tickers concatenated with fields from a
@@ -718,12 +802,175 @@ class Filter(object):
         return data_frame_r
 
     def make_FX_1_min_working_days(self, data_frame):
-        data_frame = data_frame.resample('1min').mean()
+        """Resamples FX prices to 1 minute points during FX trading hours (ie.
+        excludes 23h GMT Fri - 19h GMT Sun, FX holidays and New Year's Day),
+        filling forward any minutes without prices
+
+        Parameters
+        ----------
+        data_frame : DataFrame
+            data frame with FX prices (assumed to be GMT if time zone naive)
+
+        Returns
+        -------
+        DataFrame
+        """
+        if len(data_frame.index) == 0:
+            return data_frame
+
+        # Average the prices in each minute (only for minutes which have
+        # prices, rather than every minute in the whole period)
+        data_frame = data_frame.groupby(data_frame.index.floor('1min')).mean()
+
+        start_date = data_frame.index[0]
+        finish_date = data_frame.index[-1]
+
         data_frame = self.filter_time_series_by_holidays(data_frame, 'FX')
-        data_frame = data_frame.fillna(method='ffill')
-        data_frame = self.remove_out_FX_out_of_hours(data_frame)
+        data_frame = data_frame.ffill()
 
-        return data_frame
+        # Create only the FX trading minutes, and fill them in one go
+        index = self.create_FX_1_min_trading_index(
+            start_date, finish_date, cal='FX', session_open='Sun 19:00',
+            session_close='Fri 23:00', session_tz='UTC')
+
+        # New Year's Day is also excluded if it's a weekend
+        index = index[~((index.day == 1) & (index.month == 1))]
+
+        return data_frame.reindex(index, method='ffill')
+
+    def _get_minute_of_week(self, day_time):
+        # eg. "Sun 17:00" (Monday 00:00 is the start of the week)
+        day, time_of_day = day_time.split(' ')
+        hour, minute = [int(x) for x in time_of_day.split(':')]
+
+        return self._week_days[day[0:3].title()] * 1440 + hour * 60 + minute
+
+    def create_FX_1_min_trading_index(self, start_date, finish_date,
+                                      cal='FX', session_open=None,
+                                      session_close=None, session_tz=None):
+        """Creates the 1 minute points when FX is trading between two dates
+        (inclusive), using a weekly trading session (by default from the
+        Sunday open until the Friday close in New York) and excluding
+        holidays. Only the trading minutes are created, rather than creating
+        every minute and then removing those outside trading hours. Minutes
+        which are skipped when clocks go forward in session_tz don't exist,
+        whereas those which are repeated when clocks go back are included
+        twice.
+
+        Parameters
+        ----------
+        start_date : DateTime
+            start date (assumed to be UTC if time zone naive)
+        finish_date : DateTime
+            finish date (assumed to be UTC if time zone naive)
+        cal : str
+            holiday calendar (None for no holidays), days which are holidays
+            in session_tz are excluded
+        session_open : str
+            day and time when trading starts each week eg. "Sun 17:00"
+            (default: DataConstants.fx_session_open)
+        session_close : str
+            day and time when trading stops each week eg. "Fri 17:00"
+            (default: DataConstants.fx_session_close)
+        session_tz : str
+            time zone of the session (default: DataConstants.fx_session_tz)
+
+        Returns
+        -------
+        DatetimeIndex
+            UTC (time zone aware if start_date is, otherwise naive)
+        """
+        if session_open is None:
+            session_open = constants.fx_session_open
+
+        if session_close is None:
+            session_close = constants.fx_session_close
+
+        if session_tz is None:
+            session_tz = constants.fx_session_tz
+
+        start_date = pd.Timestamp(start_date)
+        finish_date = pd.Timestamp(finish_date)
+
+        tz = start_date.tz
+
+        if start_date.tz is None:
+            start_date = start_date.tz_localize('UTC')
+
+        if finish_date.tz is None:
+            finish_date = finish_date.tz_localize('UTC')
+
+        # Trading minutes for each day of the week (in the session time zone)
+        open_minute = self._get_minute_of_week(session_open)
+        close_minute = self._get_minute_of_week(session_close)
+
+        minute_of_week = np.arange(7 * 1440)
+
+        if open_minute < close_minute:
+            is_trading = (minute_of_week >= open_minute) & (
+                    minute_of_week < close_minute)
+        else:
+            # eg. the week's session opens on Sunday and closes on Friday
+            is_trading = (minute_of_week >= open_minute) | (
+                    minute_of_week < close_minute)
+
+        is_trading = is_trading.reshape(7, 1440)
+
+        day_minute_count = is_trading.sum(axis=1)
+        day_minute_start = np.cumsum(day_minute_count) - day_minute_count
+        day_minutes = np.nonzero(is_trading)[1]
+
+        # Every day in the session time zone, apart from holidays
+        days = np.arange(
+            start_date.tz_convert(session_tz).tz_localize(None).floor('D')
+                .to_datetime64().astype("datetime64[D]"),
+            finish_date.tz_convert(session_tz).tz_localize(None).floor('D')
+                .to_datetime64().astype("datetime64[D]") + 1)
+
+        if cal is not None and len(days) > 0:
+            holidays = self._calendar.get_holidays(
+                pd.Timestamp(days[0]), pd.Timestamp(days[-1]), cal)
+
+            days = days[~np.isin(
+                days, holidays.tz_localize(None).values.astype(
+                    "datetime64[D]"))]
+
+        # Monday = 0, ..., Sunday = 6 (1 Jan 1970 was a Thursday)
+        day_of_week = (days.view('int64') + 3) % 7
+
+        # Repeat each day for its number of trading minutes, and add the
+        # trading minutes for that day of the week
+        counts = day_minute_count[day_of_week]
+        position = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+
+        minutes = np.repeat(days.astype("datetime64[m]"), counts) \
+            + day_minutes[np.repeat(day_minute_start[day_of_week], counts)
+                          + position].astype("timedelta64[m]")
+
+        index = pd.DatetimeIndex(minutes.astype("datetime64[ns]"))
+
+        # Times which don't exist when clocks go forward are dropped, and
+        # times which are repeated when clocks go back are kept twice (first
+        # in daylight saving time, then in standard time)
+        is_dst = np.ones(len(index), dtype=bool)
+
+        dst_index = index.tz_localize(session_tz, ambiguous=is_dst,
+                                      nonexistent='NaT')
+        std_index = index.tz_localize(session_tz, ambiguous=~is_dst,
+                                      nonexistent='NaT')
+
+        index = dst_index[~dst_index.isna()].append(
+            std_index[~std_index.isna() & (std_index != dst_index)])
+        index = index.tz_convert('UTC').sort_values()
+
+        index = index[index.searchsorted(start_date, side='left'):
+                      index.searchsorted(finish_date, side='right')]
+
+        if tz is None:
+            return index.tz_localize(None)
+
+        return index.tz_convert(tz)
 
     def remove_out_FX_out_of_hours(self, data_frame):
         """Filtered a time series for FX hours (ie. excludes
@@ -780,47 +1027,23 @@ class Filter(object):
         DataFrame  (which the time zone is 'UTC')
         """
 
-        # Change the time zone from 'UTC' to a given one
-        df.index = df.index.tz_convert(time_zone)
-        df_mask = pd.DataFrame(0, index=df.index, columns=['mask'])
-
-        # Mask data with each given tuple
-        for i in range(0, len(time_list)):
-            start_hour = int(time_list[i][0].split(':')[0])
-            start_minute = int(time_list[i][0].split(':')[1])
-            end_hour = int(time_list[i][1].split(':')[0])
-            end_minute = int(time_list[i][1].split(':')[1])
-
-            # E.g. if tuple is ('01:08', '03:02'),
-            # take hours in target - take values in [01:00,04:00]
-            narray = np.where(
-                df.index.hour.isin(range(start_hour, end_hour + 1)), 1, 0)
-            df_mask_temp = pd.DataFrame(index=df.index,
-                                        columns=df_mask.columns.tolist(),
-                                        data=narray)
-
-            # Remove minutes not in target -
-            # remove values in [01:00,01:07], [03:03,03:59]
-            narray = np.where(((df.index.hour == start_hour) & (
-                        df.index.minute < start_minute)), 0, 1)
-            df_mask_temp = df_mask_temp * pd.DataFrame(
-                index=df.index,
-                columns=df_mask.columns.tolist(),
-                data=narray)
-            narray = np.where(
-                (df.index.hour == end_hour) & (df.index.minute > end_minute),
-                0, 1)
-            df_mask_temp = df_mask_temp * pd.DataFrame(
-                index=df.index,
-                columns=df_mask.columns.tolist(),
-                data=narray)
+        # Time of day in the given time zone
+        minute_of_day = self.get_minute_of_day(df.index, time_zone)
+
+        mask = np.zeros(len(minute_of_day), dtype=int)
+
+        # Mask data with each given tuple, e.g. if tuple is
+        # ('01:08', '03:02'), keep values in [01:08,03:02]
+        for start_time, end_time in time_list:
+            start_hour, start_minute = [int(x) for x in start_time.split(':')]
+            end_hour, end_minute = [int(x) for x in end_time.split(':')]
 
             # Collect all the periods we want to keep the data
-            df_mask = df_mask + df_mask_temp
+            mask += (minute_of_day >= start_hour * 60 + start_minute) & (
+                    minute_of_day <= end_hour * 60 + end_minute)
 
-        narray = np.where(df_mask == 1, df, 0)
-        df = pd.DataFrame(index=df.index, columns=df.columns.tolist(),
-                          data=narray)
-        df.index = df.index.tz_convert('UTC')  # change the time zone to 'UTC'
+        narray = np.where((mask == 1)[:, np.newaxis], df, 0)
+        df = pd.DataFrame(index=df.index.tz_convert('UTC'),
+                          columns=df.columns.tolist(), data=narray)
 
         return df
@@ -15,15 +15,18 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 
+import bisect
+import hashlib
 import os
 
-import csv
+import numpy as np
 import pandas as pd
 
 from findatapy.timeseries import Calculations
 from findatapy.util.dataconstants import DataConstants
 from findatapy.util.singleton import Singleton
 from findatapy.util.loggermanager import LoggerManager
+from findatapy.util.privatejson import read_private_json, write_private_json
 
 from dateutil.parser import parse
 
@@ -32,6 +35,106 @@ import re
 import threading
 
 
+class TickerIndex(object):
+    """Inverted index over the columns of the predefined tickers DataFrame,
+    mapping every (string) value of each column to the positions of the rows
+    which contain it. Each column also has a sorted vocabulary of its values,
+    so we can find all the values with a particular prefix by bisection.
+
+    Queries can then be done with set intersections, rather than scanning
+    the whole table.
+    """
+
+    # Regex characters which stop a literal prefix
+    _regex_special = set(".^$*+?{}[]\\|()")
+
+    def __init__(self, df):
+        self.df = df
+        self.all_rows = np.arange(len(df.index))
+
+        self._postings = {}
+        self._vocab = {}
+
+        for c in df.columns:
+            values = df[c].to_numpy(dtype=object)
+
+            is_str = np.fromiter((isinstance(v, str) for v in values),
+                                 dtype=bool, count=len(values))
+            rows = np.flatnonzero(is_str)
+
+            postings = {}
+
+            if len(rows) > 0:
+                for v, i in pd.Series(rows).groupby(
+                        values[is_str]).indices.items():
+                    postings[v] = rows[i]
+
+            self._postings[c] = postings
+            self._vocab[c] = sorted(postings.keys())
+
+    def _union(self, c, values):
+        postings = self._postings.get(c, {})
+
+        rows = [postings[v] for v in values]
+
+        if rows == []:
+            return self.all_rows[:0]
+
+        if len(rows) == 1:
+            return rows[0]
+
+        return np.unique(np.concatenate(rows))
+
+    def rows_equal(self, c, value):
+        """Positions of the rows where column c equals value"""
+        return self._postings.get(c, {}).get(value, self.all_rows[:0])
+
+    def values_with_prefix(self, c, prefix):
+        """Values of column c which start with prefix"""
+        vocab = self._vocab.get(c, [])
+
+        values = []
+
+        for i in range(bisect.bisect_left(vocab, prefix), len(vocab)):
+            if not vocab[i].startswith(prefix):
+                break
+
+            values.append(vocab[i])
+
+        return values
+
+    def rows_prefix(self, c, prefix):
+        """Positions of the rows where column c starts with prefix"""
+        return self._union(c, self.values_with_prefix(c, prefix))
+
+    def rows_regex_match(self, c, pattern):
+        """Positions of the rows where pattern matches the start of column c
+        (like pd.Series.str.match). Only the values of the column which
+        start with the literal prefix of pattern (if it has one) are tested
+        against the regex."""
+        prefix = ""
+
+        if "|" not in pattern:
+            for ch in pattern:
+                if ch in TickerIndex._regex_special:
+                    # eg. for "EURX?" the X is optional
+                    if ch in "*?{":
+                        prefix = prefix[:-1]
+
+                    break
+
+                prefix = prefix + ch
+
+        regex = re.compile(pattern)
+
+        return self._union(c, [v for v in self.values_with_prefix(c, prefix)
+                               if regex.match(v)])
+
+    @staticmethod
+    def intersect(rows, other_rows):
+        return np.intersect1d(rows, other_rows, assume_unique=True)
+
+
 class ConfigManager(object):
     """Functions for converting between vendor tickers and findatapy tickers 
     (and vice-versa).
@@ -61,6 +164,18 @@ class ConfigManager(object):
     # Store categories ->
     _dict_time_series_tickers_list_library = {}
 
+    # Inverted index over _data_frame_time_series_tickers for free form
+    # queries
+    _ticker_index = None
+
+    # Translation maps for each category.data_source.freq.cut (tickers) and
+    # data_source (fields), made from the dictionaries above when first used
+    _dict_ticker_translation_maps = {}
+    _dict_field_translation_maps = {}
+
+    # Increment when the snapshot format changes
+    _snapshot_version = 2
+
     __lock = threading.Lock()
 
     __instance = None
@@ -119,83 +234,153 @@ class ConfigManager(object):
             time_series_tickers_list_file = \
                 data_constants.time_series_tickers_list
 
+        time_series_tickers_list_file = [
+            f for f in time_series_tickers_list_file if os.path.isfile(f)]
+
+        config_files = time_series_tickers_list_file + [
+            data_constants.time_series_fields_list,
+            data_constants.time_series_categories_fields]
+
+        # Parsing the CSVs is slow, so try to load a snapshot of the
+        # dictionaries made by an earlier process from the same CSVs
+        snapshot_path = ConfigManager._get_snapshot_path(config_files,
+                                                         data_constants)
+        signature = ConfigManager._get_config_signature(config_files)
+
+        tables = ConfigManager._load_snapshot(snapshot_path, signature)
+
+        if tables is None:
+            tables = ConfigManager._parse_time_series_config(
+                time_series_tickers_list_file,
+                data_constants.time_series_fields_list,
+                data_constants.time_series_categories_fields)
+
+            ConfigManager._save_snapshot(snapshot_path, signature, tables)
+        else:
+            logger.debug("Loaded tickers from snapshot " + snapshot_path)
+
+        for name, table in tables.items():
+            if isinstance(table, dict):
+                getattr(ConfigManager, name).update(table)
+            else:
+                setattr(ConfigManager, name, table)
+
+        ConfigManager._ticker_index = None
+        ConfigManager.get_ticker_index()
+
+        ConfigManager._dict_ticker_translation_maps = {}
+        ConfigManager._dict_field_translation_maps = {}
+
+    @staticmethod
+    def get_ticker_index():
+        """Gets the inverted index over the predefined tickers, building it
+        if the tickers have changed since it was last built
+
+        Returns
+        -------
+        TickerIndex
+        """
+        df = ConfigManager._data_frame_time_series_tickers
+
+        if df is None or isinstance(df, list):
+            return None
+
+        ticker_index = ConfigManager._ticker_index
+
+        if ticker_index is None or ticker_index.df is not df:
+            ticker_index = TickerIndex(df)
+            ConfigManager._ticker_index = ticker_index
+
+        return ticker_index
+
+    @staticmethod
+    def _parse_time_series_config(time_series_tickers_list_file,
+                                  time_series_fields_list,
+                                  time_series_categories_fields):
+        """Parses the tickers, fields and categories CSVs into the lookup
+        tables used by ConfigManager, using vectorised pandas operations
+        (rather than going through every row).
+
+        Parameters
+        ----------
+        time_series_tickers_list_file : str (list)
+            Paths of the tickers CSVs
+        time_series_fields_list : str
+            Path of the fields CSV
+        time_series_categories_fields : str
+            Path of the categories CSV
+
+        Returns
+        -------
+        dict
+            Names of the ConfigManager attributes and their values
+        """
+        tables = {}
+
         df_tickers = []
+        df_lookup = []
 
         for tickers_list_file in time_series_tickers_list_file:
+            df = pd.read_csv(tickers_list_file)
+            df = df.dropna(how="all")
+
+            df_tickers.append(df)
+
+            df = df[["category", "data_source", "freq", "tickers",
+                     "cut"]].assign(
+                vendor_tickers=df["vendor_tickers"].astype(str),
+                expiry=df["expiry"] if "expiry" in df.columns else None)
+
+            df_lookup.append(df)
+
+        if df_lookup != []:
+            df = pd.concat(df_lookup, ignore_index=True)
+
+            # A row can have several frequencies eg. "daily,intraday"
+            df = df.assign(freq=df["freq"].str.split(",")).explode("freq")
+            df = df[df["category"] != ""]
+
+            tickers = df["tickers"]
+            vendor_tickers = df["vendor_tickers"]
+
+            # Library of tickers by category
+            key = df["category"] + "." + df["data_source"] + "." \
+                  + df["freq"] + "." + df["cut"]
+
+            # Conversion from library tickers to vendor vendor_tickers
+            tables["_dict_time_series_tickers_list_library_to_vendor"] = dict(
+                zip(key + "." + tickers, vendor_tickers))
+
+            # Conversion from library tickers to library expiry date (the
+            # same expiry dates repeat, so only parse each of them once)
+            expiry_dates = {}
 
-            if os.path.isfile(tickers_list_file):
-                # reader = csv.DictReader(open(tickers_list_file))
-                df = pd.read_csv(tickers_list_file)
-                df = df.dropna(how="all")
-
-                df_tickers.append(df)
-
-                for index, line in df.iterrows():
-                    category = line["category"]
-                    data_source = line["data_source"]
-                    freq_list = line["freq"].split(",")
-
-                    if isinstance(freq_list, str):
-                        freq_list = [freq_list]
-
-                    for freq in freq_list:
-                        tickers = line["tickers"]
-                        cut = line["cut"]
-                        vendor_tickers = str(line["vendor_tickers"])
-                        expiry = None
-
-                        # Skip row where the vendor ticker hasn't been
-                        # specified
-                        if vendor_tickers.strip().lower() != "nan" \
-                            or vendor_tickers.strip() != "" \
-                            or vendor_tickers.strip().lower() != "none":
-
-                            if "expiry" in line.keys():
-                                expiry = line["expiry"]
-
-                            if category != "":
-                                # Conversion from library tickers to vendor vendor_tickers
-                                ConfigManager.\
-                                    _dict_time_series_tickers_list_library_to_vendor[
-                                        category + "." +
-                                        data_source + "." +
-                                        freq + "." +
-                                        cut + "." +
-                                        tickers] = vendor_tickers
-
-                                try:
-                                    if expiry != "":
-                                        expiry = parse(expiry)
-                                    else:
-                                        expiry = None
-                                except:
-                                    pass
-
-                                # Library of tickers by category
-                                key = category + "." + data_source + "." + freq \
-                                      + "." + cut
-
-                                # Conversion from library tickers to library expiry date
-                                ConfigManager._dict_time_series_ticker_expiry_date_library_to_library[
-                                    data_source + "." +
-                                    tickers] = expiry
-
-                                # Conversion from vendor vendor_tickers to library tickers
-                                try:
-                                    ConfigManager._dict_time_series_tickers_list_vendor_to_library[
-                                        key + "." + vendor_tickers] = tickers
-                                except:
-                                    logger.warning(
-                                        "Ticker not specified correctly (is some "
-                                        "of this missing?) " + str(
-                                            key) + "." + str(vendor_tickers))
-
-                                if key in ConfigManager._dict_time_series_category_tickers_library_to_library:
-                                    ConfigManager._dict_time_series_category_tickers_library_to_library[
-                                        key].append(tickers)
-                                else:
-                                    ConfigManager._dict_time_series_category_tickers_library_to_library[
-                                        key] = [tickers]
+            def parse_expiry(expiry):
+                if not isinstance(expiry, str):
+                    return expiry
+
+                if expiry not in expiry_dates:
+                    try:
+                        if expiry != "":
+                            expiry_dates[expiry] = parse(expiry)
+                        else:
+                            expiry_dates[expiry] = None
+                    except:
+                        expiry_dates[expiry] = expiry
+
+                return expiry_dates[expiry]
+
+            tables["_dict_time_series_ticker_expiry_date_library_to_library"] \
+                = dict(zip(df["data_source"] + "." + tickers,
+                           [parse_expiry(e) for e in df["expiry"]]))
+
+            # Conversion from vendor vendor_tickers to library tickers
+            tables["_dict_time_series_tickers_list_vendor_to_library"] = dict(
+                zip(key + "." + vendor_tickers, tickers))
+
+            tables["_dict_time_series_category_tickers_library_to_library"] \
+                = {k: t.tolist() for k, t in tickers.groupby(
+                    key.values, sort=False)}
 
         try:
             df_tickers = pd.concat(df_tickers).sort_values(
@@ -213,54 +398,104 @@ class ConfigManager(object):
         except:
             pass
 
-        ConfigManager._data_frame_time_series_tickers = df_tickers
+        tables["_data_frame_time_series_tickers"] = df_tickers
 
         ## Populate fields conversions
-        # reader = csv.DictReader(open(data_constants.time_series_fields_list))
-        df = pd.read_csv(data_constants.time_series_fields_list)
+        df = pd.read_csv(time_series_fields_list)
         df = df.dropna(how="all")
 
-        for index, line in df.iterrows():
-            data_source = line["data_source"]
-            fields = line["fields"]
-            vendor_fields = line["vendor_fields"]
+        data_source = df["data_source"]
 
-            # Conversion from vendor vendor_fields to library fields
-            ConfigManager._dict_time_series_fields_list_vendor_to_library[
-                data_source + "." + vendor_fields] = fields
+        # Conversion from vendor vendor_fields to library fields
+        tables["_dict_time_series_fields_list_vendor_to_library"] = dict(
+            zip(data_source + "." + df["vendor_fields"], df["fields"]))
 
-            # Conversion from library tickers to vendor vendor_fields
-            ConfigManager._dict_time_series_fields_list_library_to_vendor[
-                data_source + "." + fields] = vendor_fields
+        # Conversion from library tickers to vendor vendor_fields
+        tables["_dict_time_series_fields_list_library_to_vendor"] = dict(
+            zip(data_source + "." + df["fields"], df["vendor_fields"]))
 
         ## Populate categories fields list
-        # reader = csv.DictReader(open(data_constants.time_series_categories_fields))
-        df = pd.read_csv(data_constants.time_series_categories_fields)
+        df = pd.read_csv(time_series_categories_fields)
         df = df.dropna(how="all")
+        df = df[df["category"] != ""]
+
+        key = df["category"] + "." + df["data_source"] + "." + df["freq"] \
+              + "." + df["cut"]
+
+        # Conversion from library category to library fields list
+        tables["_dict_time_series_category_fields_library_to_library"] = \
+            dict(zip(key, df["fields"].str.split(",")))
+
+        # Conversion from library category to library startdate
+        tables["_dict_time_series_category_startdate_library_to_library"] = \
+            dict(zip(key, [parse(startdate).date()
+                           for startdate in df["startdate"]]))
+
+        # Conversion from library category to library revision periods
+        tables[
+            "_dict_time_series_category_revision_periods_library_to_library"] \
+            = dict(zip(key, df["revision_periods"]))
+
+        return tables
 
-        for index, line in df.iterrows():
-            category = line["category"]
-            data_source = line["data_source"]
-            freq = line["freq"]
-            cut = line["cut"]
-            fields = line["fields"].split(",")
+    @staticmethod
+    def _get_snapshot_path(config_files, data_constants):
+        folder = data_constants.config_snapshot_folder
+
+        if folder is None:
+            return None
+
+        # Different sets of CSVs get their own snapshot
+        name = hashlib.sha1(
+            ";".join(os.path.abspath(f) for f in config_files).encode(
+                "utf-8")).hexdigest()
+
+        return os.path.join(folder, "findatapy_config_" + name + ".json")
+
+    @staticmethod
+    def _get_config_signature(config_files):
+        # Snapshots are only valid for CSVs with the same modification time,
+        # size and contents
+        signature = []
+
+        for f in config_files:
+            with open(f, "rb") as csv_file:
+                digest = hashlib.sha1(csv_file.read()).hexdigest()
+
+            stat_result = os.stat(f)
+
+            signature.append([os.path.abspath(f), stat_result.st_mtime_ns,
+                              stat_result.st_size, digest])
+
+        return [ConfigManager._snapshot_version, pd.__version__, signature]
+
+    @staticmethod
+    def _load_snapshot(snapshot_path, signature):
+        # Snapshots are only read if no other user could have written them
+        try:
+            snapshot = read_private_json(snapshot_path)
 
-            startdate = line["startdate"]
-            revision_periods = line["revision_periods"]
+            if snapshot is not None and snapshot["signature"] == signature:
+                return snapshot["tables"]
+        except Exception as e:
+            LoggerManager.getLogger(__name__).warning(
+                "Couldn't read tickers snapshot " + snapshot_path + ": "
+                + str(e))
 
-            if category != "":
-                # Conversion from library category to library fields list
-                ConfigManager._dict_time_series_category_fields_library_to_library[
-                    category + "." + data_source + "." + freq + "." + cut] = fields
+        return None
 
-                # Conversion from library category to library startdate
-                ConfigManager._dict_time_series_category_startdate_library_to_library[
-                    category + "." + data_source + "." + freq + "." + cut] = parse(
-                    startdate).date()
+    @staticmethod
+    def _save_snapshot(snapshot_path, signature, tables):
+        if snapshot_path is None:
+            return
 
-                # Conversion from library category to library revision periods
-                ConfigManager._dict_time_series_category_revision_periods_library_to_library[
-                    category + "." + data_source + "." + freq + "." + cut] = revision_periods
+        try:
+            write_private_json(snapshot_path, {"signature": signature,
+                                               "tables": tables})
+        except Exception as e:
+            LoggerManager.getLogger(__name__).warning(
+                "Couldn't write tickers snapshot " + snapshot_path + ": "
+                + str(e))
 
     def free_form_tickers_regex_query(self, category=None, data_source=None,
                                       freq=None, cut=None, tickers=None,
@@ -271,27 +506,23 @@ class ConfigManager(object):
 
         df = ConfigManager._data_frame_time_series_tickers
 
-        if category is not None and not df.empty:
-            df = df[df["category"].str.match(category) == True]
-
-        if data_source is not None and not df.empty:
-            df = df[df["data_source"].str.match(data_source) == True]
-
-        if freq is not None and not df.empty:
-            df = df[df["freq"].str.match(freq) == True]
+        ticker_index = ConfigManager.get_ticker_index()
 
-        if cut is not None and not df.empty:
-            df = df[df["cut"].str.match(cut) == True]
+        # Filter the rows with the inverted index, so each regex is only run
+        # over the distinct values of each column
+        filters = [("category", category), ("data_source", data_source),
+                   ("freq", freq), ("cut", cut), ("tickers", tickers)] + [
+            (k, dict_filter[k]) for k in dict_filter.keys() if k is not None]
 
-        if tickers is not None and not df.empty:
-            df = df[df["tickers"].str.match(tickers) == True]
+        rows = ticker_index.all_rows
 
-        if cut is not None and not df.empty:
-            df = df[df["cut"].str.match(cut) == True]
+        for c, pattern in filters:
+            if pattern is not None and len(rows) > 0:
+                rows = ticker_index.intersect(
+                    rows, ticker_index.rows_regex_match(c, pattern))
 
-        for k in dict_filter.keys():
-            if k is not None and not df.empty:
-                df = df[df[k].str.match(dict_filter[k]) == True]
+        if len(rows) < len(ticker_index.all_rows):
+            df = df.iloc[rows]
 
         if ret_fields is not None and not (df.empty):
             df = df[ret_fields]
@@ -329,7 +560,7 @@ class ConfigManager(object):
         free_form_query : str
             A query that can be used to generate a MarketDataRequest
 
-            eg. quandl.fx
+            eg. quandl.fx (or quandl.fx.EUR* for tickers starting with EUR)
 
         best_match_only : bool
             Only return at most 1 row of a DataFrame (default: False)
@@ -363,28 +594,33 @@ class ConfigManager(object):
 
         df_joined_list = []
 
+        ticker_index = ConfigManager.get_ticker_index()
+
         for key in free_form_query:
-            df_joined = df
+            rows = ticker_index.all_rows
 
             key = ConfigManager.split_ticker_string(key)
 
             # Search through all the keywords, and see if matches with any 
-            # columns of our predefined tickers
-            try:
-                for k in key:
-                    for c in df.columns:
-                        try:
-                            df_temp = df_joined[df_joined[c] == k]
-                        except:
-                            df_temp = pd.DataFrame()
-
-                        if not (df_temp.empty):
-                            df_joined = df_temp
-                            break
-
-                df_joined_list.append(df_joined)
-            except Exception as e:
-                pass
+            # columns of our predefined tickers (keywords ending with * are
+            # prefixes eg. EUR*)
+            for k in key:
+                for c in df.columns:
+                    if isinstance(k, str) and len(k) > 1 and k[-1] == "*":
+                        rows_temp = ticker_index.rows_prefix(c, k[:-1])
+                    else:
+                        rows_temp = ticker_index.rows_equal(c, k)
+
+                    rows_temp = ticker_index.intersect(rows, rows_temp)
+
+                    if len(rows_temp) > 0:
+                        rows = rows_temp
+                        break
+
+            if len(rows) < len(ticker_index.all_rows):
+                df_joined_list.append(df.iloc[rows])
+            else:
+                df_joined_list.append(df)
 
         # Drop any duplicated tickers
         df = pd.concat(df_joined_list).drop_duplicates()
@@ -461,20 +697,17 @@ class ConfigManager(object):
                 ret_fields):
             group_fields = ret_fields.copy()
 
-            agg_dict = {}
+            agg_fields = []
 
             if "tickers" in ret_fields:
-                df["tickers"] = [[x] for x in df["tickers"].tolist()]
-                agg_dict["tickers"] = "sum"
+                agg_fields.append("tickers")
                 group_fields.remove("tickers")
 
             if "vendor_tickers" in ret_fields:
-                df["vendor_tickers"] = [[x] for x in
-                                        df["vendor_tickers"].tolist()]
-                agg_dict["vendor_tickers"] = "sum"
+                agg_fields.append("vendor_tickers")
                 group_fields.remove("vendor_tickers")
 
-            if agg_dict != {}:
+            if agg_fields != []:
 
                 try:
                     df = df.drop(
@@ -483,19 +716,79 @@ class ConfigManager(object):
                 except:
                     pass
 
-                df_temp = df.groupby(group_fields).agg(agg_dict)
+                df_temp = ConfigManager._group_dataframe_lists(
+                    df, group_fields, agg_fields)
 
                 # If grouping fails (when there aren"t multiple elements to group!)
                 if df_temp.empty:
-                    pass
+                    df = df.assign(**{a: [[x] for x in df[a].tolist()]
+                                      for a in agg_fields})
                 else:
-                    for i, g in enumerate(group_fields):
-                        df_temp[g] = df_temp.index.get_level_values(i)
-
-                    df = df_temp.reset_index(drop=True)
+                    df = df_temp
 
         return df
 
+    @staticmethod
+    def _group_dataframe_lists(df, group_fields, agg_fields):
+        """Groups a DataFrame by group_fields, collecting the values of each
+        of agg_fields in every group into a list (in their original order).
+        Like df.groupby(group_fields) (ie. sorted by group, skipping rows with
+        missing group values), but done with integer codes for the groups and
+        a single sort, so it takes linear time in the size of the groups.
+
+        Parameters
+        ----------
+        df : DataFrame
+            Data to be grouped
+        group_fields : str (list)
+            Columns to group by
+        agg_fields : str (list)
+            Columns to collect into lists
+
+        Returns
+        -------
+        DataFrame
+            Columns agg_fields followed by group_fields, with a row per group
+        """
+        key = np.zeros(len(df.index), dtype=np.int64)
+        valid = np.ones(len(df.index), dtype=bool)
+
+        group_uniques = []
+        group_codes = []
+
+        # Combine the codes of each column into a single key, factorizing
+        # as we go along to keep the key small (and in sorted order)
+        for g in group_fields:
+            codes, uniques = pd.factorize(df[g], sort=True)
+
+            group_codes.append(codes)
+            group_uniques.append(uniques)
+
+            valid &= codes >= 0
+            key, _ = pd.factorize(key * len(uniques) + codes, sort=True)
+
+        rows = np.flatnonzero(valid)
+
+        if len(rows) == 0:
+            return pd.DataFrame()
+
+        # Stable sort, so values stay in their original order in each group
+        rows = rows[np.argsort(key[rows], kind="stable")]
+        starts = np.flatnonzero(np.diff(key[rows], prepend=-1))
+
+        df_grouped = {}
+
+        for a in agg_fields:
+            values = df[a].to_numpy(dtype=object)[rows]
+
+            df_grouped[a] = [v.tolist() for v in np.split(values, starts[1:])]
+
+        for g, codes, uniques in zip(group_fields, group_codes,
+                                     group_uniques):
+            df_grouped[g] = uniques.take(codes[rows[starts]])
+
+        return pd.DataFrame(df_grouped)
+
     @staticmethod
     def get_dataframe_tickers():
         return ConfigManager._data_frame_time_series_tickers
@@ -588,6 +881,28 @@ class ConfigManager(object):
         ConfigManager._dict_time_series_ticker_expiry_date_library_to_library[
             data_source + "." + ticker]
 
+    @staticmethod
+    def get_expiry_for_tickers(data_source, tickers):
+        """Gets the expiry dates for many tickers at once (None for tickers
+        without an expiry date)
+
+        Parameters
+        ----------
+        data_source : str
+            Data source, eg. 'bloomberg'
+        tickers : str (list)
+            Tickers
+
+        Returns
+        -------
+        list
+        """
+        expiry_dict = \
+        ConfigManager._dict_time_series_ticker_expiry_date_library_to_library
+
+        return [expiry_dict.get(data_source + "." + ticker)
+                if ticker is not None else None for ticker in tickers]
+
     @staticmethod
     def get_filtered_tickers_list_for_category(category, data_source, freq,
                                                cut, filter):
@@ -638,6 +953,94 @@ class ConfigManager(object):
 
         return ConfigManager.flatten_list_of_lists(vendor_tickers)
 
+    @staticmethod
+    def get_ticker_translation_maps(category, data_source, freq, cut):
+        """Gets dictionaries for translating tickers to vendor tickers (and
+        back again) for a particular category, data_source, freq and cut,
+        keyed by the tickers themselves, so we can translate many tickers
+        without building a key for each of them
+
+        Parameters
+        ----------
+        category : str
+            Category eg. 'fx'
+        data_source : str
+            Data source eg. 'bloomberg'
+        freq : str
+            Frequency eg. 'daily'
+        cut : str
+            Cut eg. 'NYC'
+
+        Returns
+        -------
+        dict, dict
+            Library to vendor tickers, and vendor to library tickers
+        """
+        try:
+            key = category + "." + data_source + "." + freq + "." + cut
+        except TypeError:
+            return {}, {}
+
+        maps = ConfigManager._dict_ticker_translation_maps.get(key)
+
+        if maps is None:
+            library_to_vendor = {}
+            vendor_to_library = {}
+
+            tickers_to_vendor = \
+                ConfigManager._dict_time_series_tickers_list_library_to_vendor
+            vendor_to_tickers = \
+                ConfigManager._dict_time_series_tickers_list_vendor_to_library
+
+            for ticker in ConfigManager.\
+                    _dict_time_series_category_tickers_library_to_library.get(
+                    key, []):
+                vendor_ticker = tickers_to_vendor[key + "." + ticker]
+
+                library_to_vendor[ticker] = vendor_ticker
+                vendor_to_library[vendor_ticker] = \
+                    vendor_to_tickers[key + "." + vendor_ticker]
+
+            maps = (library_to_vendor, vendor_to_library)
+
+            ConfigManager._dict_ticker_translation_maps[key] = maps
+
+        return maps
+
+    @staticmethod
+    def get_field_translation_maps(data_source):
+        """Gets dictionaries for translating fields to vendor fields (and
+        back again) for a particular data_source, keyed by the fields
+        themselves
+
+        Parameters
+        ----------
+        data_source : str
+            Data source eg. 'bloomberg'
+
+        Returns
+        -------
+        dict, dict
+            Library to vendor fields, and vendor to library fields
+        """
+        maps = ConfigManager._dict_field_translation_maps.get(data_source)
+
+        if maps is None:
+            prefix = str(data_source) + "."
+
+            def strip_prefix(dictionary):
+                return {k[len(prefix):]: v for k, v in dictionary.items()
+                        if k.startswith(prefix)}
+
+            maps = (strip_prefix(ConfigManager.
+                                 _dict_time_series_fields_list_library_to_vendor),
+                    strip_prefix(ConfigManager.
+                                 _dict_time_series_fields_list_vendor_to_library))
+
+            ConfigManager._dict_field_translation_maps[data_source] = maps
+
+        return maps
+
     @staticmethod
     def convert_library_to_vendor_ticker(category, data_source, freq, cut,
                                          ticker):
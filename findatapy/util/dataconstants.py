@@ -19,6 +19,7 @@ Has various constants required for the findatapy project. These have been define
 
 """
 
+import datetime
 import os
 import keyring
 
@@ -126,6 +127,13 @@ class DataConstants(object):
 
     time_series_fields_list = path_join(config_root_folder, "time_series_fields_list.csv")
 
+    # Folder for a snapshot of the lookup tables parsed from the tickers/fields/categories CSVs, which later processes
+    # load instead of parsing the CSVs again (None to always parse the CSVs), by default in the user's own cache folder,
+    # given snapshots in a folder which other users can write to are ignored
+    config_snapshot_folder = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+        or os.path.join(os.path.expanduser("~"), ".cache"), "findatapy")
+
     # Config file for long term econ data
     all_econ_tickers = path_join(config_root_folder, "all_econ_tickers.csv")
     econ_country_codes = path_join(config_root_folder, "econ_country_codes.csv")
@@ -133,6 +141,17 @@ class DataConstants(object):
 
     holidays_parquet_table = path_join(config_root_folder, "holidays_table.parquet")
 
+    # Years which holidays are compiled for by default (eg. for rule based calendars like FX, Christmas & New Year's
+    # Day are created for each year), calendars are extended automatically when dates outside these years are used
+    holidays_start_year = 1999
+    holidays_finish_year = datetime.date.today().year + 10
+
+    # FX trading session (from the Sunday open until the Friday close in New York), used when creating grids of FX
+    # trading minutes (days which are holidays in the session time zone are excluded)
+    fx_session_open = "Sun 17:00"
+    fx_session_close = "Fri 17:00"
+    fx_session_tz = "America/New_York"
+
     # For events filtering
     events_category = 'events'
     events_category_dt = 'events_dt'
@@ -205,6 +224,24 @@ class DataConstants(object):
     bbg_server = "localhost"       # needs changing if you use Bloomberg Server API
     bbg_server_port = 8194
 
+    # Requests are pipelined on a single Bloomberg session (each with its own correlation ID), this is the maximum
+    # number which can be waiting for a response at the same time
+    bbg_max_pipelined_requests = 16
+
+    # Split daily requests with more securities than this into several requests, which are pipelined on the same
+    # session (None means always send all the securities in one request)
+    bbg_max_securities_per_request = 100
+
+    # Long intraday/tick requests are split into time shards with (roughly) at most this many rows, which are
+    # pipelined on the same session, and retried separately if they fail
+    bbg_max_shard_rows = {'intraday': 100000, 'tick': 250000}
+    bbg_tick_rows_per_minute = 30 # estimate used to size tick shards
+    bbg_shard_retries = 2
+
+    # Number of completed intraday/tick shards kept in memory, so retrying a request only downloads the shards which
+    # failed (0 to disable)
+    bbg_shard_cache_size = 256
+
     # These fields are BDS style fields to be downloaded using Bloomberg's Reference Data interface
     # You may need to add to this list
     bbg_ref_fields = {'release-date-time-full' : 'ECO_FUTURE_RELEASE_DATE_LIST',
@@ -216,6 +253,31 @@ class DataConstants(object):
                           'cal-non-settle-dates': 'CALENDAR_NON_SETTLEMENT_DATES'
     }
 
+    # How long (in seconds) to cache Bloomberg reference data fields (BDP/BDS) for, so repeated lookups of static
+    # fields (eg. futures expiries) are answered locally, fields which aren't listed here are never cached
+    bbg_ref_field_ttl_seconds = {'LAST_TRADEABLE_DT' : 7 * 24 * 60 * 60,
+                                 'FUT_NOTICE_FIRST' : 7 * 24 * 60 * 60,
+                                 'FUT_FIRST_TRADE_DT' : 7 * 24 * 60 * 60,
+                                 'FUT_CHAIN_LAST_TRADE_DATES' : 24 * 60 * 60,
+                                 'FUT_CHAIN' : 24 * 60 * 60,
+                                 'FUT_TICK_SIZE' : 24 * 60 * 60,
+                                 'FUT_CONT_SIZE' : 24 * 60 * 60,
+                                 'CALENDAR_NON_SETTLEMENT_DATES' : 24 * 60 * 60
+    }
+
+    # Reference data fields whose values depend on the start/finish dates of the request (sent as the START_DT/END_DT
+    # overrides), which are cached separately for each date range (other fields are cached whatever the dates, given
+    # the finish date is often relative to now)
+    bbg_ref_date_dependent_fields = ['ECO_FUTURE_RELEASE_DATE_LIST', 'CALENDAR_NON_SETTLEMENT_DATES']
+
+    # How long (in seconds) to remember that Bloomberg didn't return a reference data field for a ticker (eg. for an
+    # obsolete ticker), which is kept short in case it was a mistyped field or a temporary problem (eg. entitlements)
+    bbg_ref_missing_ttl_seconds = 5 * 60
+
+    # Folder where the reference data cache is persisted, so it can be shared between sessions (None to only keep it
+    # in memory), cache files which other users can write to are ignored
+    bbg_ref_cache_folder = None
+
     # Depending on the ticker field inclusion of specific keywords,
     # apply a particular BBG override (make sure all lowercase)
     bbg_keyword_dict_override = {
@@ -257,6 +319,24 @@ class DataConstants(object):
 
     ####### FRED (Federal Reserve of St Louis data) settings
     fred_api_key = key_store("FRED")
+    fred_root_url = 'https://api.stlouisfed.org/fred'
+    fred_file_type = 'xml' # 'xml' (parsed incrementally) or 'json'
+
+    # How many ALFRED/FRED series to download in parallel (all share a single
+    # pooled HTTP session), FRED rate limits API keys, so don't go too high!
+    fred_thread_no = 4
+
+    # Retries are counted separately for each series, with the wait between
+    # attempts doubling each time (starting at fred_retry_backoff_seconds)
+    fred_retries = 5
+    fred_retry_backoff_seconds = 0.5
+
+    # Seconds for timeout for each HTTP call to ALFRED/FRED
+    fred_timeout_seconds = 60
+
+    # Folder (local or S3) where all the vintages of each ALFRED series are stored, so only newer vintages need to be
+    # downloaded after the first request (None means don't store and download the full history every time)
+    alfred_vintage_store_folder = None
 
     ####### FX vol fields
     # Default download for FX vol surfaces etc.
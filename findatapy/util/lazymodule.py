@@ -0,0 +1,109 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import importlib
+import threading
+
+
+class LazyModule(object):
+    """Stands in for a module, which is only imported the first time one of
+    its attributes is used. We use it for optional libraries (eg. for
+    particular databases), so we don't pay for importing them (or need them
+    installed) unless they are actually used.
+
+    If the module isn't installed, the ImportError is raised when it is
+    first used (after trying any fallback modules, eg. older names for the
+    same library).
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, name, *fallback_names):
+        self.__dict__["_name"] = name
+        self.__dict__["_fallback_names"] = fallback_names
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+
+        if module is None:
+            with LazyModule._lock:
+                module = self.__dict__["_module"]
+
+                if module is None:
+                    try:
+                        module = importlib.import_module(
+                            self.__dict__["_name"])
+                    except ImportError:
+                        module = self._load_fallback()
+
+                    self.__dict__["_module"] = module
+
+        return module
+
+    def _load_fallback(self):
+        for name in self.__dict__["_fallback_names"]:
+            try:
+                return importlib.import_module(name)
+            except ImportError:
+                pass
+
+        # Raise the ImportError for the original module
+        return importlib.import_module(self.__dict__["_name"])
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self._load(), key, value)
+
+    def __repr__(self):
+        if self.__dict__["_module"] is None:
+            return "<lazy module '" + self.__dict__["_name"] + "'>"
+
+        return repr(self.__dict__["_module"])
+
+    def is_available(self):
+        """Checks if the module can be imported (importing it if so)
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            self._load()
+        except ImportError:
+            return False
+
+        return True
+
+
+def lazy_import(name, *fallback_names):
+    """Creates a LazyModule, which imports the module name on first use
+
+    Parameters
+    ----------
+    name : str
+        Module name eg. 'pyarrow.parquet'
+    fallback_names : str
+        Modules to try if name can't be imported
+
+    Returns
+    -------
+    LazyModule
+    """
+    return LazyModule(name, *fallback_names)
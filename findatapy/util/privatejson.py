@@ -0,0 +1,192 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Reads and writes the files which findatapy persists between sessions (eg.
+snapshots of the config and cached Bloomberg reference data). They are stored
+as JSON (rather than a format like pickle, which could run code when loaded),
+tagging the types which JSON doesn't have (dates, DataFrames etc.). Only the
+current user can read/write them, and files which another user could have
+written are ignored.
+"""
+
+import datetime
+import json
+import os
+import stat
+
+import pandas as pd
+
+from findatapy.util.loggermanager import LoggerManager
+
+
+def is_private_path(path):
+    """Checks that a file/folder is owned by the current user, and can't be
+    written to by anyone else (on Windows, we rely on the permissions of the
+    user's own folders)
+
+    Parameters
+    ----------
+    path : str
+        File or folder
+
+    Returns
+    -------
+    bool
+    """
+    if not hasattr(os, "getuid"):
+        return True
+
+    stat_result = os.stat(path)
+
+    return stat_result.st_uid == os.getuid() and not (
+            stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def to_json_value(obj):
+    """Converts the objects JSON doesn't support into tagged dicts (used as
+    the default of json.dump)
+
+    Parameters
+    ----------
+    obj : object
+        datetime, date, Series or DataFrame
+
+    Returns
+    -------
+    dict
+    """
+    if isinstance(obj, datetime.datetime):
+        return {"__datetime__": obj.isoformat()}
+
+    if isinstance(obj, datetime.date):
+        return {"__date__": obj.isoformat()}
+
+    if isinstance(obj, pd.Series):
+        return {"__series__": {
+            "name": obj.name, "name_is_tuple": isinstance(obj.name, tuple),
+            "dtype": str(obj.dtype), "data": obj.tolist(),
+            "index": obj.index.tolist(),
+            "index_dtype": str(obj.index.dtype)}}
+
+    if isinstance(obj, pd.DataFrame):
+        return {"__data_frame__": {
+            "columns": obj.columns.tolist(),
+            "dtypes": [str(d) for d in obj.dtypes],
+            "data": [obj.iloc[:, i].tolist()
+                     for i in range(len(obj.columns))],
+            "index": obj.index.tolist(),
+            "index_dtype": str(obj.index.dtype)}}
+
+    raise TypeError("Can't store " + type(obj).__name__ + " as JSON")
+
+
+def from_json_value(obj):
+    """Converts the tagged dicts made by to_json_value back to objects (used
+    as the object_hook of json.load)
+
+    Parameters
+    ----------
+    obj : dict
+        Dict read from JSON
+
+    Returns
+    -------
+    object
+    """
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+
+    if "__date__" in obj:
+        return datetime.date.fromisoformat(obj["__date__"])
+
+    if "__series__" in obj:
+        obj = obj["__series__"]
+
+        name = obj["name"]
+
+        if obj["name_is_tuple"]:
+            name = tuple(name)
+
+        return pd.Series(obj["data"], dtype=obj["dtype"], name=name,
+                         index=pd.Index(obj["index"],
+                                        dtype=obj["index_dtype"]))
+
+    if "__data_frame__" in obj:
+        obj = obj["__data_frame__"]
+
+        df = pd.DataFrame(
+            {i: pd.Series(values, dtype=dtype) for i, (values, dtype) in
+             enumerate(zip(obj["data"], obj["dtypes"]))})
+        df.columns = obj["columns"]
+        df.index = pd.Index(obj["index"], dtype=obj["index_dtype"])
+
+        return df
+
+    return obj
+
+
+def read_private_json(path):
+    """Reads a file written by write_private_json, unless it doesn't exist,
+    or another user could have written it (or its folder)
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON file
+
+    Returns
+    -------
+    object
+        Contents of the file (or None)
+    """
+    if path is None or not os.path.exists(path):
+        return None
+
+    if not (is_private_path(os.path.dirname(os.path.abspath(path)))
+            and is_private_path(path)):
+        LoggerManager.getLogger(__name__).warning(
+            "Ignoring " + path + ", which other users can write to")
+
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=from_json_value)
+
+
+def write_private_json(path, obj):
+    """Writes obj to a JSON file which only the current user can read/write
+    (creating its folder if needed). It's written to a temporary file first,
+    so other processes never read a partially written file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON file
+    obj : object
+        Object to write (which can contain the types handled by
+        to_json_value)
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700,
+                exist_ok=True)
+
+    temp_path = path + "." + str(os.getpid()) + ".tmp"
+
+    with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                           0o600), "w", encoding="utf-8") as f:
+        json.dump(obj, f, default=to_json_value)
+
+    os.replace(temp_path, path)
@@ -15,9 +15,10 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 
-from twython import Twython
-
 from findatapy.util import DataConstants, LoggerManager
+from findatapy.util.lazymodule import lazy_import
+
+twython = lazy_import("twython")
 
 
 class Twitter(object):
@@ -29,14 +30,14 @@ class Twitter(object):
         self.logger = LoggerManager().getLogger(__name__)
 
     def set_key(self, APP_KEY, APP_SECRET, OAUTH_TOKEN, OAUTH_TOKEN_SECRET):
-        self.twitter = Twython(APP_KEY, APP_SECRET, OAUTH_TOKEN,
-                               OAUTH_TOKEN_SECRET)
+        self.twitter = twython.Twython(APP_KEY, APP_SECRET, OAUTH_TOKEN,
+                                       OAUTH_TOKEN_SECRET)
 
     def auto_set_key(self):
-        self.twitter = Twython(DataConstants().APP_KEY,
-                               DataConstants().APP_SECRET,
-                               DataConstants().OAUTH_TOKEN,
-                               DataConstants().OAUTH_TOKEN_SECRET)
+        self.twitter = twython.Twython(DataConstants().APP_KEY,
+                                       DataConstants().APP_SECRET,
+                                       DataConstants().OAUTH_TOKEN,
+                                       DataConstants().OAUTH_TOKEN_SECRET)
 
     def update_status(self, msg, link = None, picture = None):
         # 22 chars URL
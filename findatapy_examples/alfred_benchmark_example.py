@@ -0,0 +1,96 @@
+"""
+Benchmarks downloading ALFRED/FRED tickers with different numbers of
+download threads (DataConstants.fred_thread_no). The tickers come from a
+local server serving FRED-style XML observations with a fixed latency, so
+no API key or internet connection is needed, and the timings can be
+reproduced.
+
+"""
+
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+if __name__ == "__main__":
+    import threading
+    import time
+
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    from findatapy.market import MarketDataRequest
+    from findatapy.market.datavendorweb import DataVendorALFRED
+    from findatapy.util.dataconstants import DataConstants
+
+    latency_seconds = 0.05
+    tickers = ["SERIES" + str(i) for i in range(20)]
+
+    # Every series has 24 monthly observations, each released and then
+    # revised a year later
+    rows = []
+
+    for i in range(24):
+        date = "%04d-%02d-01" % (2000 + i // 12, i % 12 + 1)
+        release = "%04d-%02d-15" % (2000 + i // 12, i % 12 + 1)
+        revision = "%04d-%02d-15" % (2001 + i // 12, i % 12 + 1)
+
+        rows.append('<observation realtime_start="%s" realtime_end="%s" '
+                    'date="%s" value="%d"/>' % (release, revision, date, i))
+        rows.append('<observation realtime_start="%s" '
+                    'realtime_end="9999-12-31" date="%s" value="%s"/>'
+                    % (revision, date, i + 0.5))
+
+    body = ('<?xml version="1.0" encoding="utf-8" ?>'
+            '<observations realtime_start="1776-07-04" '
+            'realtime_end="9999-12-31" count="%d">' % len(rows)
+            + "".join(rows) + "</observations>").encode()
+
+    class FredHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_seconds)
+
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FredHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    DataConstants.fred_root_url = "http://127.0.0.1:%d/fred" \
+                                  % server.server_port
+
+    md_request = MarketDataRequest(
+        start_date="01 Jan 2000", finish_date="01 Jan 2002",
+        data_source="alfred", tickers=tickers, vendor_tickers=tickers,
+        fields=["actual-release"], vendor_fields=["actual-release"],
+        fred_api_key="benchmark")
+
+    for thread_no in [1, 2, 4, 8]:
+        DataConstants.fred_thread_no = thread_no
+
+        start = time.perf_counter()
+        df = DataVendorALFRED().download_daily(md_request)
+
+        print("download_daily for " + str(len(tickers)) + " tickers with "
+              + str(thread_no) + " threads: %.2fs" % (
+                      time.perf_counter() - start)
+              + " (" + str(len(df.columns)) + " columns)")
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,62 @@
+"""
+Benchmarks the holiday calendar code: creating Filter objects (which share
+holidays loaded once from disk), looking up holidays for single and cross
+calendars, removing holidays from a time series and calculating expiry dates
+and business days of the month for many dates at once.
+
+"""
+
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+
+if __name__ == "__main__":
+    import timeit
+
+    import pandas as pd
+
+    from findatapy.timeseries import Filter, Calendar
+
+    runs = 1000
+
+    # Calendars share the same holidays, which are only read from disk (and
+    # combined for crosses like EURUSD) the first time they are needed
+    print("Filter(): %.1fus" % (timeit.timeit(
+        lambda: Filter(), number=runs) / runs * 1e6))
+
+    calendar = Calendar()
+
+    for cal in ["FX", "EUR", "EURUSD", "USDJPYNYD"]:
+        print("get_holidays for " + cal + ": %.1fus" % (timeit.timeit(
+            lambda: calendar.get_holidays(start_date="01 Jan 2000",
+                                          end_date="31 Dec 2020", cal=cal),
+            number=runs) / runs * 1e6))
+
+    # Remove EURUSD holidays from a daily time series
+    df = pd.DataFrame(index=pd.bdate_range("1 Jan 2000", "31 Dec 2020"))
+    df["Prices"] = 1
+
+    filter = Filter()
+
+    print("filter_time_series_by_holidays: %.1fus" % (timeit.timeit(
+        lambda: filter.filter_time_series_by_holidays(df, "EURUSD"),
+        number=100) / 100 * 1e6))
+
+    # Spot, delivery and expiry dates for every business day over 20 years
+    horizon_date = pd.bdate_range("1 Jan 2000", "31 Dec 2020")
+
+    for tenor in ["1W", "1M", "1Y"]:
+        print("get_expiry_date_from_horizon_date for " + str(
+            len(horizon_date)) + " dates, " + tenor + ": %.1fus" % (
+            timeit.timeit(lambda: calendar.get_expiry_date_from_horizon_date(
+                horizon_date, tenor, cal="EURUSD"), number=100) / 100 * 1e6))
+
+    print("get_bus_day_of_month for " + str(len(horizon_date)) +
+          " dates: %.1fus" % (timeit.timeit(
+        lambda: calendar.get_bus_day_of_month(horizon_date, cal="EURUSD"),
+        number=100) / 100 * 1e6))
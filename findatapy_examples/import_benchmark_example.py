@@ -0,0 +1,54 @@
+"""
+Measures how long it takes to import findatapy in a new Python process (ie.
+a cold import, as paid by every new worker process), and which optional
+libraries have been imported along the way. Libraries for data vendors and
+storage engines should only be imported when they are first used.
+
+"""
+
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2016 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+if __name__ == "__main__":
+    import json
+    import subprocess
+    import sys
+
+    optional_modules = ["openpyxl", "arctic", "arcticdb", "pymongo", "redis",
+                        "pyarrow", "quandl", "alpha_vantage", "yfinance",
+                        "statsmodels", "numba", "twython", "blpapi"]
+
+    # Each import is done in a fresh process, so nothing is already imported
+    code = "import sys, time, json; start = time.perf_counter(); " \
+           "import findatapy.market; " \
+           "print(json.dumps([time.perf_counter() - start, " \
+           "sorted(sys.modules.keys() & set(" \
+           + json.dumps(optional_modules) + "))]))"
+
+    runs = 5
+    import_times = []
+
+    for i in range(runs):
+        import_time, imported = json.loads(subprocess.check_output(
+            [sys.executable, "-c", code]).decode().splitlines()[-1])
+
+        import_times.append(import_time)
+
+    print("Cold import of findatapy.market over " + str(runs) + " runs: "
+          "min %.3fs, median %.3fs" % (min(import_times),
+                                       sorted(import_times)[runs // 2]))
+    print("Optional libraries imported: " + str(imported))
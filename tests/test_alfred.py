@@ -0,0 +1,307 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import types
+import threading
+import collections
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import pandas as pd
+
+from findatapy.market import MarketDataRequest, MarketDataGenerator
+from findatapy.market import datavendorweb
+from findatapy.market.datavendorweb import DataVendorALFRED, Fred
+from findatapy.util.dataconstants import DataConstants
+
+# Number of times the stub server will fail for these tickers before it
+# returns data (None means fail forever)
+flaky_tickers = {"FLAKY": 2, "BROKEN": None}
+
+
+def day_before(date):
+    return (pd.Timestamp(date) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def fred_observations(realtime_start=None, new_vintages=(), obs_no=24):
+    """Creates ALFRED/FRED style observations, with the first release and
+    one revision for every observation date (the 6th observation is missing
+    in its first release), plus any new vintages as (realtime_start, date,
+    value). Like FRED, only returns the current values if realtime_start is
+    None, otherwise returns every vintage current on or after
+    realtime_start."""
+    observations = []
+
+    for i in range(obs_no):
+        date = "%04d-%02d-01" % (2000 + i // 12, i % 12 + 1)
+        release = "%04d-%02d-15" % (2000 + i // 12, i % 12 + 1)
+        revision = "%04d-%02d-15" % (2001 + i // 12, i % 12 + 1)
+
+        observations.append({"realtime_start": release,
+                             "realtime_end": day_before(revision),
+                             "date": date,
+                             "value": "." if i == 5 else str(i)})
+        observations.append({"realtime_start": revision,
+                             "realtime_end": "9999-12-31", "date": date,
+                             "value": str(i + 0.5)})
+
+    for vintage_start, date, value in new_vintages:
+        for obs in observations:
+            if obs["date"] == date and obs["realtime_end"] == "9999-12-31":
+                obs["realtime_end"] = day_before(vintage_start)
+
+        observations.append({"realtime_start": vintage_start,
+                             "realtime_end": "9999-12-31", "date": date,
+                             "value": value})
+
+    observations.sort(key=lambda obs: (obs["date"], obs["realtime_start"]))
+
+    if realtime_start is None:
+        return [obs for obs in observations
+                if obs["realtime_end"] == "9999-12-31"]
+
+    return [dict(obs, realtime_start=max(obs["realtime_start"],
+                                         realtime_start))
+            for obs in observations if obs["realtime_end"] >= realtime_start]
+
+
+def fred_xml(observations):
+    rows = ['<observation realtime_start="%(realtime_start)s" '
+            'realtime_end="%(realtime_end)s" date="%(date)s" '
+            'value="%(value)s"/>' % obs for obs in observations]
+
+    return ('<?xml version="1.0" encoding="utf-8" ?>'
+            '<observations realtime_start="1776-07-04" '
+            'realtime_end="9999-12-31" count="%d">' % len(observations)
+            + "".join(rows) + "</observations>").encode()
+
+
+@pytest.fixture
+def fred_stub(monkeypatch):
+    # Counts the calls for each ticker, and the observations sent back
+    stub = types.SimpleNamespace(calls=collections.Counter(),
+                                 rows=collections.Counter(), new_vintages=[])
+
+    class FredHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            series_id = query["series_id"][0]
+            stub.calls[series_id] += 1
+
+            if series_id in flaky_tickers and (
+                    flaky_tickers[series_id] is None
+                    or stub.calls[series_id] <= flaky_tickers[series_id]):
+                body = b'<error code="500" message="Internal error"/>'
+                self.send_response(500)
+            else:
+                observations = fred_observations(
+                    query.get("realtime_start", [None])[0],
+                    stub.new_vintages,
+                    obs_no=0 if series_id == "EMPTY" else 24)
+
+                stub.rows[series_id] += len(observations)
+
+                if query.get("file_type") == ["json"]:
+                    body = json.dumps(
+                        {"observations": observations}).encode()
+                else:
+                    body = fred_xml(observations)
+
+                self.send_response(200)
+
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FredHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(DataConstants, "fred_root_url",
+                        "http://127.0.0.1:%d/fred" % server.server_port)
+    monkeypatch.setattr(DataConstants, "fred_retry_backoff_seconds", 0)
+
+    yield stub
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_alfred_retries_are_per_ticker(fred_stub):
+    tickers = ["BROKEN", "FLAKY", "GDP", "CPI"]
+
+    md_request = MarketDataRequest(
+        start_date="01 Jan 2000", finish_date="01 Jan 2002",
+        data_source="alfred", tickers=tickers, vendor_tickers=tickers,
+        fields=["actual-release"], vendor_fields=["actual-release"],
+        fred_api_key="test")
+
+    df = DataVendorALFRED().download_daily(md_request)
+
+    # The broken ticker shouldn't stop any of the later tickers downloading
+    assert fred_stub.calls["BROKEN"] == DataConstants.fred_retries
+    assert fred_stub.calls["FLAKY"] == flaky_tickers["FLAKY"] + 1
+    assert fred_stub.calls["GDP"] == 1 and fred_stub.calls["CPI"] == 1
+
+    assert list(df.columns) == ["FLAKY.actual-release", "GDP.actual-release",
+                                "CPI.actual-release"]
+
+    # First release is the unrevised value
+    assert df.loc[pd.Timestamp("2000-03-01"), "GDP.actual-release"] == 2.0
+
+
+@pytest.mark.parametrize("file_type", ["xml", "json"])
+def test_fred_all_releases_parsing(fred_stub, file_type):
+    fred = Fred(api_key="test", file_type=file_type)
+
+    df = fred.get_series_all_releases("GDP")
+
+    assert list(df.columns) == ["realtime_start", "date", "value"]
+    assert len(df.index) == 48
+    assert df["value"].dtype == "float64"
+    assert df["date"].iloc[0] == pd.Timestamp("2000-01-01")
+    assert df["realtime_start"].iloc[1] == pd.Timestamp("2001-01-15")
+
+    # Missing values in the first release become NaN
+    first_release = fred.get_series_first_release("GDP")
+
+    assert pd.isna(first_release[pd.Timestamp("2000-06-01")])
+    assert first_release[pd.Timestamp("2000-07-01")] == 6.0
+
+    latest = fred.get_series("GDP")
+
+    assert latest.index.is_monotonic_increasing
+    assert latest[pd.Timestamp("2000-06-01")] == 5.5
+
+    fred.close()
+
+
+@pytest.mark.parametrize("file_type", ["xml", "json"])
+def test_fred_no_data_raises(fred_stub, file_type):
+    fred = Fred(api_key="test", file_type=file_type)
+
+    with pytest.raises(ValueError, match="No data exists"):
+        fred.get_series("EMPTY")
+
+    with pytest.raises(ValueError, match="No data exists"):
+        fred.get_series_all_releases("EMPTY")
+
+    fred.close()
+
+
+def test_fred_vintage_store_only_downloads_new_vintages(fred_stub, tmp_path):
+    fred = Fred(api_key="test", vintage_store_folder=str(tmp_path))
+
+    df = fred.get_series_all_releases("GDP")
+
+    assert len(df.index) == 48
+    assert fred_stub.rows["GDP"] == 48
+
+    # Nothing new: only the vintages still current on the last stored
+    # vintage date are sent back, and the store is unchanged
+    fred_stub.rows.clear()
+    df_cached = fred.get_series_all_releases("GDP")
+
+    assert fred_stub.rows["GDP"] < 48
+    pd.testing.assert_frame_equal(df, df_cached, check_dtype=False)
+
+    # A revision to the last observation is merged into the store
+    fred_stub.new_vintages.append(("2003-06-30", "2001-12-01", "99"))
+    fred_stub.rows.clear()
+
+    df_new = fred.get_series_all_releases("GDP",
+                                          observation_start="2001-12-01")
+
+    assert fred_stub.rows["GDP"] < 48
+    assert df_new["value"].tolist() == [23.0, 23.5, 99.0]
+    assert df_new["realtime_start"].iloc[-1] == pd.Timestamp("2003-06-30")
+
+    # And it stays in the store for the next client
+    fred.close()
+
+    fred = Fred(api_key="test", vintage_store_folder=str(tmp_path))
+
+    assert fred.get_series_first_revision("GDP").iloc[-1] == 23.5
+    assert len(fred.get_series_all_releases("GDP").index) == 49
+
+    fred.close()
+
+
+def test_alfred_vendor_reused_between_requests(fred_stub, monkeypatch):
+    fred_clients = []
+
+    class RecordingFred(Fred):
+        def __init__(self, *args, **kwargs):
+            super(RecordingFred, self).__init__(*args, **kwargs)
+            self.closed = False
+            fred_clients.append(self)
+
+        def close(self):
+            self.closed = True
+            super(RecordingFred, self).close()
+
+    monkeypatch.setattr(datavendorweb, "Fred", RecordingFred)
+
+    def create_md_request(fred_api_key):
+        return MarketDataRequest(
+            start_date="01 Jan 2000", finish_date="01 Jan 2002",
+            data_source="alfred", tickers=["GDP"], vendor_tickers=["GDP"],
+            fields=["actual-release"], vendor_fields=["actual-release"],
+            fred_api_key=fred_api_key)
+
+    market_data_generator = MarketDataGenerator()
+
+    data_vendor = market_data_generator.get_data_vendor(
+        create_md_request("test"))
+
+    # Same data source and credentials, so the same DataVendor (and Fred
+    # client) is used for every request
+    for _ in range(3):
+        assert market_data_generator.get_data_vendor(
+            create_md_request("test")) is data_vendor
+
+        data_vendor.download_daily(create_md_request("test"))
+
+    assert len(fred_clients) == 1 and not fred_clients[0].closed
+    assert fred_stub.calls["GDP"] == 3
+
+    # Different credentials need their own DataVendor
+    other_data_vendor = market_data_generator.get_data_vendor(
+        create_md_request("other"))
+
+    assert other_data_vendor is not data_vendor
+
+    market_data_generator.close_data_vendors()
+
+    assert fred_clients[0].closed
+    assert market_data_generator.get_data_vendor(
+        create_md_request("test")) is not data_vendor
+
+    # Outside of MarketDataGenerator, the Fred client is closed after
+    # every request
+    DataVendorALFRED().download_daily(create_md_request("test"))
+
+    assert len(fred_clients) == 2 and fred_clients[1].closed
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,352 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import datetime
+import types
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import findatapy.market.datavendorbbg as datavendorbbg
+from findatapy.market.datavendorbbg import BBGDailyDecoder, \
+    BBGIntradayDecoder, BBGTickDecoder, BBGLowLevelTemplate, OptionsBBG, \
+    shard_cache_key
+from findatapy.util.dataconstants import DataConstants
+
+# Same values as blpapi.DataType
+RecordedDataType = types.SimpleNamespace(
+    BOOL=1, INT32=4, INT64=5, FLOAT32=6, FLOAT64=7, STRING=8, DATE=10,
+    DATETIME=13, SEQUENCE=15)
+
+
+@pytest.fixture
+def recorded_blpapi(monkeypatch):
+    # blpapi constants used by the decoders (so we don't need blpapi
+    # installed to test them)
+    monkeypatch.setattr(datavendorbbg, "blpapi",
+                        types.SimpleNamespace(DataType=RecordedDataType),
+                        raising=False)
+
+
+class RecordedElement(object):
+    """Replays a recorded blpapi Element (implementing only the methods
+    which the decoders use), so we can test them without a Bloomberg
+    connection."""
+
+    def __init__(self, name, value=None, elements=None, values=None,
+                 datatype=None):
+        self._name = name
+        self._value = value
+        self._elements = elements or []
+        self._values = values
+        self._datatype = datatype
+
+    def name(self):
+        return self._name
+
+    def datatype(self):
+        if self._datatype is not None:
+            return self._datatype
+
+        if self._values is not None or self._elements != []:
+            return RecordedDataType.SEQUENCE
+
+        for t, datatype in [(bool, RecordedDataType.BOOL),
+                            (int, RecordedDataType.INT64),
+                            (float, RecordedDataType.FLOAT64),
+                            (datetime.datetime, RecordedDataType.DATETIME),
+                            (datetime.date, RecordedDataType.DATE)]:
+            if isinstance(self._value, t):
+                return datatype
+
+        return RecordedDataType.STRING
+
+    def hasElement(self, name):
+        return any(e.name() == str(name) for e in self._elements)
+
+    def getElement(self, name):
+        if isinstance(name, int):
+            return self._elements[name]
+
+        for e in self._elements:
+            if e.name() == str(name):
+                return e
+
+        raise KeyError(name)
+
+    def numElements(self):
+        return len(self._elements)
+
+    def numValues(self):
+        return len(self._values)
+
+    def values(self):
+        return iter(self._values)
+
+    def getValue(self, index=0):
+        if self._values is not None:
+            return self._values[index]
+
+        return self._value
+
+    def getElementAsFloat(self, name):
+        return float(self.getElement(name).getValue())
+
+    def getElementAsInteger(self, name):
+        return int(self.getElement(name).getValue())
+
+    def getElementAsDatetime(self, name):
+        return self.getElement(name).getValue()
+
+
+def record_historical_message(ticker, dates, fields, datatypes={}):
+    """Creates a HistoricalDataResponse message for a security, where fields
+    is a dict of field names to lists of values (None if not returned), and
+    datatypes has the datatype of any fields where it can't be inferred from
+    the values."""
+    rows = []
+
+    for i, date in enumerate(dates):
+        elements = [RecordedElement("date", date)]
+
+        for field, values in fields.items():
+            if values[i] is not None:
+                elements.append(RecordedElement(
+                    field, values[i], datatype=datatypes.get(field)))
+
+        rows.append(RecordedElement("fieldData", elements=elements))
+
+    return RecordedElement("HistoricalDataResponse", elements=[
+        RecordedElement("securityData", elements=[
+            RecordedElement("security", ticker),
+            RecordedElement("fieldData", values=rows)])])
+
+
+def test_daily_decoder(recorded_blpapi):
+    dates = [datetime.date(2020, 1, 1) + datetime.timedelta(days=i)
+             for i in range(5)]
+
+    decoder = BBGDailyDecoder()
+
+    decoder.decode(record_historical_message(
+        "EURUSD Curncy", dates,
+        {"PX_LAST": [1.1, 1.2, None, 1.4, 1.5],
+         "PX_OPEN": [1.0, 1.1, 1.2, 1.3, 1.4]}))
+
+    # Only has some of the dates, and non-numeric fields (including strings
+    # which look like numbers)
+    decoder.decode(record_historical_message(
+        "USDJPY Curncy", dates[2:],
+        {"PX_LAST": [110.0, 111.0, 112.0],
+         "ECO_RELEASE_DT": [datetime.date(2020, 2, 1), None, "N.A."],
+         "ID_BB_SEC_NUM": ["0001", "0002", "N.A."]},
+        datatypes={"ECO_RELEASE_DT": RecordedDataType.DATE}))
+
+    df = decoder.to_data_frame()
+
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert len(df.index) == 5
+    assert set(df.columns) == {("PX_LAST", "EURUSD Curncy"),
+                               ("PX_OPEN", "EURUSD Curncy"),
+                               ("PX_LAST", "USDJPY Curncy"),
+                               ("ECO_RELEASE_DT", "USDJPY Curncy"),
+                               ("ID_BB_SEC_NUM", "USDJPY Curncy")}
+
+    assert df[("PX_LAST", "EURUSD Curncy")].dtype == np.float64
+    assert np.isnan(df[("PX_LAST", "EURUSD Curncy")].iloc[2])
+    assert np.isnan(df[("PX_LAST", "USDJPY Curncy")].iloc[0])
+    assert df[("PX_LAST", "USDJPY Curncy")].iloc[-1] == 112.0
+    assert df[("ECO_RELEASE_DT", "USDJPY Curncy")].iloc[2] == \
+           datetime.date(2020, 2, 1)
+    assert df[("ID_BB_SEC_NUM", "USDJPY Curncy")].tolist()[2:] == \
+           ["0001", "0002", "N.A."]
+
+
+def record_intraday_message(data_element, times, fields):
+    """Creates an IntradayBarResponse (or IntradayTickResponse if
+    data_element is tickData) message, where fields is a dict of element
+    names to lists of values."""
+    rows = [RecordedElement(data_element, elements=[
+        RecordedElement("time", time)] + [
+        RecordedElement(field, values[i]) for field, values in fields.items()])
+        for i, time in enumerate(times)]
+
+    if data_element == "tickData":
+        name = "tickData"
+    else:
+        name = "barTickData"
+
+    return RecordedElement("IntradayResponse", elements=[
+        RecordedElement(data_element, elements=[
+            RecordedElement(name, values=rows)])])
+
+
+def test_intraday_decoder():
+    times = [datetime.datetime(2020, 1, 2, 8, i) for i in range(6)]
+
+    decoder = BBGIntradayDecoder()
+
+    # Bars can come back in several messages
+    for start in [0, 4]:
+        msg_times = times[start:start + 4]
+
+        decoder.decode(record_intraday_message("barData", msg_times, {
+            "open": [1.0 + i for i in range(len(msg_times))],
+            "high": [2.0] * len(msg_times), "low": [0.5] * len(msg_times),
+            "close": [1.5] * len(msg_times),
+            "volume": [100] * len(msg_times),
+            "numEvents": [start + i for i in range(len(msg_times))]}))
+
+    decoder.decode(record_intraday_message("barData", [], {}))
+
+    df = decoder.to_data_frame()
+
+    assert list(df.columns) == ["open", "high", "low", "close", "volume",
+                                "events"]
+    pd.testing.assert_index_equal(df.index, pd.DatetimeIndex(times))
+    assert df["open"].dtype == np.float64
+    assert df["volume"].dtype == np.int64
+    assert df["events"].tolist() == [0, 1, 2, 3, 4, 5]
+
+    assert BBGIntradayDecoder().to_data_frame() is None
+
+
+class RecordedName(object):
+    """Stands in for blpapi.Name, counting how many times each is used to
+    look up an element."""
+
+    used = collections.Counter()
+
+    def __init__(self, name):
+        self._name = name
+
+    def __str__(self):
+        RecordedName.used[self._name] += 1
+
+        return self._name
+
+
+def test_tick_decoder():
+    times = [datetime.datetime(2020, 1, 2, 8, 0, 0, i * 1000)
+             for i in range(3)]
+
+    # Elements are looked up by the Name objects we pass in
+    RecordedName.used.clear()
+
+    decoder = BBGTickDecoder(names={
+        name: RecordedName(name) for name in
+        ["tickData", "time", "value", "size"]})
+    decoder.decode(record_intraday_message("tickData", times, {
+        "type": ["TRADE"] * 3, "value": [1.1, 1.2, 1.3],
+        "size": [1, 2, 3]}))
+
+    df = decoder.to_data_frame()
+
+    assert list(df.columns) == ["close", "ticksize"]
+    assert df.index[1] == pd.Timestamp("2020-01-02 08:00:00.001")
+    assert df["close"].tolist() == [1.1, 1.2, 1.3]
+    assert df["ticksize"].tolist() == [1, 2, 3]
+    assert RecordedName.used["value"] >= 3 and RecordedName.used["size"] >= 3
+
+
+class ReplayIntradayLoader(BBGLowLevelTemplate):
+    """Intraday loader which replays minute bars instead of sending requests
+    to Bloomberg, failing any shards starting at the times in failing."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def shard_cache_key(self, options):
+        return shard_cache_key("IntradayBarRequest", options)
+
+    def combine_data_frames(self, options_list, data_frame_list):
+        return self.combine_shards(options_list, data_frame_list)
+
+    def pipeline_requests(self, session, eventQueue, options_list):
+        data_frame_list = []
+        failed = set()
+
+        for i, options in enumerate(options_list):
+            self.sent.append(options.startDateTime)
+
+            if options.startDateTime in self.failing:
+                data_frame_list.append(None)
+                failed.add(i)
+            else:
+                # Like Bloomberg, includes both the start and end bars
+                index = pd.date_range(options.startDateTime,
+                                      options.endDateTime, freq="min")
+
+                data_frame_list.append(pd.DataFrame(
+                    {"close": np.arange(len(index), dtype=float)},
+                    index=index))
+
+        return data_frame_list, failed
+
+
+def test_intraday_shards_only_refetch_failures(monkeypatch):
+    monkeypatch.setattr(DataConstants, "bbg_max_shard_rows",
+                        {"intraday": 2000, "tick": 2000})
+    monkeypatch.setattr(DataConstants, "bbg_shard_retries", 1)
+    monkeypatch.setattr(BBGLowLevelTemplate, "_shard_cache",
+                        collections.OrderedDict())
+
+    start = datetime.datetime(2021, 1, 4, 0, 0, 0)
+    end = datetime.datetime(2021, 1, 11, 0, 0, 0)
+
+    loader = ReplayIntradayLoader()
+
+    options_list = loader.shard_options(
+        OptionsBBG(security="EURUSD Curncy", event="TRADE", barInterval=1,
+                   startDateTime=start, endDateTime=end), 1.0, 2000)
+
+    # 7 days of minute bars need 6 shards, which are contiguous
+    assert len(options_list) == 6
+    assert options_list[0].startDateTime == start
+    assert options_list[-1].endDateTime == end
+
+    for prev, curr in zip(options_list[:-1], options_list[1:]):
+        assert prev.endDateTime == curr.startDateTime
+
+    failing_start = options_list[3].startDateTime
+
+    # Shard fails every time, so it is missing from the output
+    loader.failing = {failing_start}
+
+    df = loader.combine_data_frames(
+        options_list, loader.download_options_list(None, None, options_list))
+
+    assert loader.sent.count(failing_start) == 2
+    assert len(df.index) < 7 * 24 * 60
+
+    # Retrying the request only downloads the failed shard
+    loader = ReplayIntradayLoader()
+
+    df = loader.combine_data_frames(
+        options_list, loader.download_options_list(None, None, options_list))
+
+    assert loader.sent == [failing_start]
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    pd.testing.assert_index_equal(
+        df.index, pd.date_range(start, end, freq="min"), check_names=False)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,223 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+import json
+import os
+
+import pytest
+import pandas as pd
+
+from findatapy.market import MarketDataRequest
+from findatapy.market.datavendorbbg import BBGLowLevelTemplate, \
+    BBGLowLevelRef, BBGRefDataCache
+from findatapy.util.dataconstants import DataConstants
+
+
+class ReplayRefLoader(BBGLowLevelRef):
+    """Reference data loader which doesn't need a Bloomberg connection."""
+
+    def __init__(self):
+        pass
+
+
+@pytest.fixture
+def ref_requests(monkeypatch, tmp_path):
+    # Records the tickers/fields of every request sent to Bloomberg, which
+    # returns the last tradeable day for every ticker apart from OBSOLETE
+    requests = []
+
+    def load_time_series(self, md_request):
+        requests.append((list(md_request.tickers), list(md_request.fields)))
+
+        return pd.DataFrame(
+            {(field, ticker): [ticker + " " + field]
+             for ticker in md_request.tickers for field in md_request.fields
+             if ticker != "OBSOLETE"})
+
+    monkeypatch.setattr(BBGLowLevelTemplate, "load_time_series",
+                        load_time_series)
+    monkeypatch.setattr(BBGRefDataCache, "_cache", {})
+    monkeypatch.setattr(BBGRefDataCache, "_loaded_path", None)
+    monkeypatch.setattr(BBGRefDataCache, "_dirty", False)
+    monkeypatch.setattr(DataConstants, "bbg_ref_cache_folder", str(tmp_path))
+
+    return requests
+
+
+def ref_md_request(tickers, fields, finish_date="01 Jan 2021"):
+    return MarketDataRequest(start_date="01 Jan 2020",
+                             finish_date=finish_date,
+                             data_source="bloomberg", freq="daily",
+                             tickers=tickers, fields=fields)
+
+
+def test_ref_cache_batches_misses(ref_requests):
+    df = ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty", "OBSOLETE"], ["LAST_TRADEABLE_DT"]))
+
+    assert ref_requests == [(["CLF1 Comdty", "OBSOLETE"],
+                             ["LAST_TRADEABLE_DT"])]
+    assert list(df.columns) == [("LAST_TRADEABLE_DT", "CLF1 Comdty")]
+
+    # Fields without a TTL are never cached, and all the misses are batched
+    # into one request
+    df = ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty", "OBSOLETE", "COF1 Comdty"],
+        ["LAST_TRADEABLE_DT", "NAME"]))
+
+    assert ref_requests[1] == (["CLF1 Comdty", "OBSOLETE", "COF1 Comdty"],
+                               ["LAST_TRADEABLE_DT", "NAME"])
+
+    # Only the new ticker is requested (not OBSOLETE, which we already know
+    # returns nothing)
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty", "OBSOLETE", "COF1 Comdty", "QSF1 Comdty"],
+        ["LAST_TRADEABLE_DT"]))
+
+    assert ref_requests[2] == (["QSF1 Comdty"], ["LAST_TRADEABLE_DT"])
+    assert set(df.columns) == {("LAST_TRADEABLE_DT", "CLF1 Comdty"),
+                               ("LAST_TRADEABLE_DT", "COF1 Comdty"),
+                               ("NAME", "CLF1 Comdty"),
+                               ("NAME", "COF1 Comdty")}
+
+    assert df[("LAST_TRADEABLE_DT", "COF1 Comdty")].iloc[0] == \
+        "COF1 Comdty LAST_TRADEABLE_DT"
+
+    # Everything is answered from the cache
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty", "COF1 Comdty"], ["LAST_TRADEABLE_DT"]))
+
+    assert len(ref_requests) == 3
+
+
+def test_ref_cache_ttl_persistence_and_invalidation(ref_requests,
+                                                    monkeypatch):
+    md_request = ref_md_request(["CLF1 Comdty", "COF1 Comdty"],
+                                ["LAST_TRADEABLE_DT", "FUT_TICK_SIZE"])
+
+    ReplayRefLoader().load_time_series(md_request)
+
+    # A new process would read the cache from disk
+    monkeypatch.setattr(BBGRefDataCache, "_cache", {})
+    monkeypatch.setattr(BBGRefDataCache, "_loaded_path", None)
+
+    df = ReplayRefLoader().load_time_series(md_request)
+
+    assert len(ref_requests) == 1
+    assert len(df.columns) == 4
+
+    BBGRefDataCache().invalidate(tickers="COF1 Comdty")
+
+    ReplayRefLoader().load_time_series(md_request)
+
+    assert ref_requests[-1] == (["COF1 Comdty"],
+                                ["LAST_TRADEABLE_DT", "FUT_TICK_SIZE"])
+
+    # Expired fields are downloaded again
+    monkeypatch.setitem(DataConstants.bbg_ref_field_ttl_seconds,
+                        "FUT_TICK_SIZE", -1)
+    BBGRefDataCache().invalidate(fields="FUT_TICK_SIZE")
+
+    ReplayRefLoader().load_time_series(md_request)
+    ReplayRefLoader().load_time_series(md_request)
+
+    assert ref_requests[-1] == (["CLF1 Comdty", "COF1 Comdty"],
+                                ["FUT_TICK_SIZE"])
+    assert len(ref_requests) == 4
+
+
+def test_ref_cache_dates_and_missing_fields(ref_requests, monkeypatch):
+    fields = ["LAST_TRADEABLE_DT", "CALENDAR_NON_SETTLEMENT_DATES"]
+
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty", "OBSOLETE"], fields))
+
+    # Only fields which depend on the dates are requested again for a later
+    # finish date (eg. a year from now)
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["CLF1 Comdty"], fields, finish_date="02 Jan 2021"))
+
+    assert ref_requests[-1] == (["CLF1 Comdty"],
+                                ["CALENDAR_NON_SETTLEMENT_DATES"])
+
+    # Fields which weren't returned are only remembered for a short time
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["OBSOLETE"], ["LAST_TRADEABLE_DT"]))
+
+    assert len(ref_requests) == 2
+
+    monkeypatch.setattr(DataConstants, "bbg_ref_missing_ttl_seconds", -1)
+    BBGRefDataCache().invalidate(tickers="OBSOLETE")
+
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["OBSOLETE"], ["LAST_TRADEABLE_DT"]))
+    ReplayRefLoader().load_time_series(ref_md_request(
+        ["OBSOLETE"], ["LAST_TRADEABLE_DT"]))
+
+    assert ref_requests[-1] == (["OBSOLETE"], ["LAST_TRADEABLE_DT"])
+    assert len(ref_requests) == 4
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"),
+                    reason="Needs POSIX file permissions")
+def test_ref_cache_other_users(ref_requests, monkeypatch, tmp_path):
+    md_request = ref_md_request(["CLF1 Comdty"],
+                                ["FUT_CHAIN_LAST_TRADE_DATES"])
+    context = BBGRefDataCache().create_context(md_request)
+
+    # BDS fields can return lists of dates
+    dates = [datetime.date(2021, 1, 20), datetime.date(2021, 2, 19)]
+
+    BBGRefDataCache().put(
+        pd.DataFrame({("FUT_CHAIN_LAST_TRADE_DATES", "CLF1 Comdty"): dates}),
+        ["CLF1 Comdty"], ["FUT_CHAIN_LAST_TRADE_DATES"], context)
+    BBGRefDataCache().flush()
+
+    # The cache is plain JSON, which only we can write to
+    cache_path = tmp_path / "bbg_ref_cache.json"
+
+    assert len(json.loads(cache_path.read_text())) == 1
+    assert os.stat(cache_path).st_mode & 0o077 == 0
+
+    def reload():
+        # A new process would read the cache from disk
+        monkeypatch.setattr(BBGRefDataCache, "_cache", {})
+        monkeypatch.setattr(BBGRefDataCache, "_loaded_path", None)
+
+        return BBGRefDataCache().get(
+            ["CLF1 Comdty"], ["FUT_CHAIN_LAST_TRADE_DATES"], context)[0]
+
+    cached = reload()
+
+    assert cached[("FUT_CHAIN_LAST_TRADE_DATES", "CLF1 Comdty")].tolist() \
+           == dates
+
+    # A cache which another user could have written (or planted) is ignored
+    os.chmod(cache_path, 0o666)
+
+    assert reload() == {}
+
+    if os.getuid() == 0:
+        os.chmod(cache_path, 0o600)
+        os.chown(cache_path, 65534, -1)
+
+        assert reload() == {}
+
+
+if __name__ == '__main__':
+    pytest.main()
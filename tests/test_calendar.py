@@ -0,0 +1,165 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from findatapy.timeseries import Calendar, Filter
+from findatapy.timeseries.calendar import HolidayStore
+
+
+def test_holiday_store():
+    # Every Calendar (including those made by Filter) shares one store
+    assert Calendar()._holiday_store is HolidayStore.get_instance()
+    assert Filter()._calendar._holiday_store is HolidayStore.get_instance()
+
+    holiday_store = HolidayStore.get_instance()
+
+    eur = holiday_store.get_holidays("EUR")
+    usd = holiday_store.get_holidays("USD")
+    eurusd = holiday_store.get_holidays("EURUSD")
+
+    # Combined calendars are kept, and are the union of their components
+    assert holiday_store.get_holidays("EURUSD") is eurusd
+    assert np.array_equal(eurusd, np.union1d(eur, usd))
+    assert np.all(np.diff(eurusd) > np.timedelta64(0))
+    assert not eurusd.flags.writeable
+
+    # Weekends are removed
+    assert (pd.DatetimeIndex(eurusd).dayofweek <= 4).all()
+
+    holidays = Calendar().get_holidays(start_date="01 Jan 2020 10:00",
+                                       end_date="31 Dec 2020", cal="FX")
+
+    assert holidays.tz is not None
+    assert list(holidays.strftime("%Y-%m-%d")) == ["2020-01-01",
+                                                   "2020-12-25"]
+
+    # Calendars with their own holidays don't change the shared store
+    calendar = Calendar()
+    calendar.set_market_holidays(pd.DataFrame(
+        {"ABC.holiday-dates": pd.to_datetime(["2021-01-04", "2021-01-05"])}))
+
+    assert len(calendar.get_holidays(cal="ABC")) == 2
+    assert calendar._holiday_store is not HolidayStore.get_instance()
+    assert len(Calendar().get_holidays(cal="ABC")) == 0
+
+
+def test_business_day_engine():
+    calendar = Calendar()
+
+    # Same busdaycalendar is used for each calendar
+    assert calendar.get_busdaycalendar("EURUSD") \
+           is calendar.get_busdaycalendar("EURUSD")
+
+    horizon_date = pd.to_datetime(["2020-11-02", "2020-11-27", "2020-12-23",
+                                   "2020-12-31"])
+
+    spot_date = calendar.get_spot_date_from_horizon_date(horizon_date,
+                                                         "EURUSD")
+
+    # Skips Christmas and New Year's Day (and the weekend)
+    assert list(spot_date.strftime("%Y-%m-%d")) == [
+        "2020-11-04", "2020-12-01", "2020-12-28", "2021-01-05"]
+
+    # USDCAD settles T+1
+    assert calendar.get_spot_date_from_horizon_date(
+        pd.Timestamp("2020-11-02"), "USDCAD") == pd.Timestamp("2020-11-03")
+
+    delivery_date = calendar.get_delivery_date_from_horizon_date(
+        horizon_date, "1W", cal="EURUSD")
+
+    assert list(delivery_date.strftime("%Y-%m-%d")) == [
+        "2020-11-12", "2020-12-08", "2021-01-04", "2021-01-12"]
+
+    # Delivery dates which are holidays (eg. 1st Jan) are moved forward
+    delivery_date = calendar.get_delivery_date_from_horizon_date(
+        horizon_date, "1M", cal="EURUSD")
+
+    assert list(delivery_date.strftime("%Y-%m-%d")) == [
+        "2020-12-04", "2021-01-04", "2021-01-28", "2021-02-05"]
+
+    expiry_date = calendar.get_expiry_date_from_horizon_date(
+        horizon_date, "1M", cal="EURUSD")
+
+    assert list(expiry_date.strftime("%Y-%m-%d")) == [
+        "2020-12-02", "2020-12-30", "2021-01-26", "2021-02-03"]
+
+    # 1st Jan is a holiday, so 2nd Jan is the first business day
+    bus_day_of_month = calendar.get_bus_day_of_month(
+        pd.to_datetime(["2020-01-02", "2020-01-03", "2020-01-04",
+                        "2020-01-06", "2020-02-03"]), cal="EURUSD")
+
+    assert list(bus_day_of_month) == [1, 2, 3, 3, 1]
+
+
+def test_holiday_years_compiled_on_demand():
+    holiday_store = HolidayStore()
+    calendar = Calendar(holiday_store=holiday_store)
+
+    compiled = []
+    compile_holidays = holiday_store._compile_holidays
+
+    def recording_compile_holidays(cal, start_year, finish_year):
+        compiled.append((cal, start_year, finish_year))
+
+        return compile_holidays(cal, start_year, finish_year)
+
+    holiday_store._compile_holidays = recording_compile_holidays
+
+    start_year, finish_year = holiday_store.get_years()
+
+    calendar.get_holidays(cal="FX")
+
+    assert compiled == [("FX", start_year, finish_year)]
+
+    # Years after (and before) are compiled when we ask for them, and only
+    # those years
+    compiled.clear()
+
+    holidays = calendar.get_holidays(start_date="01 Jan 2060",
+                                     end_date="31 Dec 2061", cal="FX")
+
+    # Other Christmas & New Year's Days are at weekends
+    assert list(holidays.strftime("%Y-%m-%d")) == ["2060-01-01"]
+    assert compiled == [("FX", finish_year + 1, 2061)]
+
+    compiled.clear()
+
+    holidays = calendar.get_holidays(start_date="01 Jan 1990",
+                                     end_date="31 Dec 1990", cal="FX")
+
+    assert list(holidays.strftime("%Y-%m-%d")) == ["1990-01-01",
+                                                   "1990-12-25"]
+    assert compiled == [("FX", 1990, start_year - 1)]
+
+    # Already compiled, so nothing more to do
+    compiled.clear()
+    calendar.get_holidays(start_date="01 Jan 1995", end_date="31 Dec 2050",
+                          cal="FX")
+
+    assert compiled == []
+
+    # The business day engine also extends the calendars it uses
+    assert calendar.get_bus_day_of_month(
+        pd.to_datetime(["2071-01-02", "2071-01-05"]), cal="FX").tolist() \
+        == [1, 2]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,266 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+import json
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from findatapy.market import MarketDataRequest
+from findatapy.market.datavendor import DataVendor
+from findatapy.util.configmanager import ConfigManager
+from findatapy.util.dataconstants import DataConstants
+
+tickers_csv = """category,data_source,freq,tickers,cut,fields,vendor_tickers,expiry
+fx,bloomberg,"daily,intraday",EURUSD,NYC,close,EURUSD Curncy,
+fx,bloomberg,daily,GBPUSD,NYC,close,GBPUSD Curncy,
+futures,bloomberg,daily,CLZ20,NYC,close,CLZ20 Comdty,20-Nov-2020
+"""
+
+fields_csv = """data_source,fields,vendor_fields
+bloomberg,close,PX_LAST
+bloomberg,open,PX_OPEN
+"""
+
+categories_csv = """category,data_source,freq,cut,fields,startdate,revision_periods
+fx,bloomberg,daily,NYC,"close,open",01-Jan-1970,1
+"""
+
+
+@pytest.fixture
+def config_files(monkeypatch, tmp_path):
+    files = {"tickers.csv": tickers_csv, "fields.csv": fields_csv,
+             "categories.csv": categories_csv}
+
+    for name, contents in files.items():
+        (tmp_path / name).write_text(contents)
+
+    data_constants = DataConstants()
+    data_constants.time_series_tickers_list = str(tmp_path / "tickers.csv")
+    data_constants.time_series_fields_list = str(tmp_path / "fields.csv")
+    data_constants.time_series_categories_fields = \
+        str(tmp_path / "categories.csv")
+    data_constants.config_snapshot_folder = str(tmp_path / "snapshot")
+
+    # Don't touch the tables loaded from the real CSVs
+    for name in dir(ConfigManager):
+        if name.startswith("_dict_time_series"):
+            monkeypatch.setattr(ConfigManager, name, {})
+
+    monkeypatch.setattr(ConfigManager, "_data_frame_time_series_tickers",
+                        None)
+
+    return tmp_path, data_constants
+
+
+def check_tables():
+    assert ConfigManager.convert_library_to_vendor_ticker(
+        "fx", "bloomberg", "intraday", "NYC", "EURUSD") == "EURUSD Curncy"
+    assert ConfigManager.convert_vendor_to_library_ticker(
+        "fx", "bloomberg", "daily", "NYC", "GBPUSD Curncy") == "GBPUSD"
+    assert ConfigManager.get_tickers_list_for_category(
+        "fx", "bloomberg", "daily", "NYC") == ["EURUSD", "GBPUSD"]
+    assert ConfigManager.get_expiry_for_ticker("bloomberg", "CLZ20") == \
+           datetime.datetime(2020, 11, 20)
+    assert ConfigManager.convert_library_to_vendor_field(
+        "bloomberg", "open") == "PX_OPEN"
+    assert ConfigManager.get_fields_list_for_category(
+        "fx", "bloomberg", "daily", "NYC") == ["close", "open"]
+    assert ConfigManager.get_startdate_for_category(
+        "fx", "bloomberg", "daily", "NYC") == datetime.date(1970, 1, 1)
+    assert len(ConfigManager.get_dataframe_tickers().index) == 3
+
+
+def test_config_snapshot(config_files, monkeypatch):
+    tmp_path, data_constants = config_files
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    check_tables()
+    assert len(os.listdir(tmp_path / "snapshot")) == 1
+
+    # The next time the tables come from the snapshot, without parsing
+    parse_time_series_config = \
+        ConfigManager.__dict__["_parse_time_series_config"]
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("CSVs shouldn't be parsed")
+
+    monkeypatch.setattr(ConfigManager, "_parse_time_series_config",
+                        staticmethod(fail_parse))
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    check_tables()
+
+    # But changing the CSVs means we parse them again
+    monkeypatch.setattr(ConfigManager, "_parse_time_series_config",
+                        parse_time_series_config)
+
+    (tmp_path / "fields.csv").write_text(
+        fields_csv + "bloomberg,high,PX_HIGH\n")
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    assert ConfigManager.convert_library_to_vendor_field(
+        "bloomberg", "high") == "PX_HIGH"
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"),
+                    reason="Needs POSIX file permissions")
+def test_config_snapshot_other_users(config_files, monkeypatch):
+    tmp_path, data_constants = config_files
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    # The snapshot is plain JSON, which only we can write to
+    snapshot_path = tmp_path / "snapshot" / os.listdir(
+        tmp_path / "snapshot")[0]
+
+    assert snapshot_path.suffix == ".json"
+    assert json.loads(snapshot_path.read_text())["tables"] != {}
+    assert os.stat(snapshot_path).st_mode & 0o077 == 0
+
+    # Snapshots which another user could have written are ignored
+    os.chmod(snapshot_path, 0o666)
+
+    parsed = []
+    parse_time_series_config = \
+        ConfigManager.__dict__["_parse_time_series_config"].__func__
+
+    def record_parse(*args, **kwargs):
+        parsed.append(True)
+
+        return parse_time_series_config(*args, **kwargs)
+
+    monkeypatch.setattr(ConfigManager, "_parse_time_series_config",
+                        staticmethod(record_parse))
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    assert parsed == [True]
+    check_tables()
+
+
+def test_free_form_tickers_query(config_files):
+    tmp_path, data_constants = config_files
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    config_manager = ConfigManager()
+
+    df = config_manager.free_form_tickers_query(
+        "bloomberg.fx.GBPUSD", smart_group=False)
+
+    assert df["vendor_tickers"].tolist() == ["GBPUSD Curncy"]
+
+    # Keywords which don't match anything are ignored
+    df = config_manager.free_form_tickers_query("fx.nothing",
+                                                smart_group=False)
+
+    assert sorted(df["tickers"].tolist()) == ["EURUSD", "GBPUSD"]
+
+    # Prefixes match several tickers
+    df = config_manager.free_form_tickers_query("bloomberg.CL*",
+                                                smart_group=False)
+
+    assert df["tickers"].tolist() == ["CLZ20"]
+
+    df = config_manager.free_form_tickers_regex_query(
+        data_source="bloom", tickers="(EUR|CL)")
+
+    assert sorted(df["category"].tolist()) == ["futures", "fx"]
+
+    df = config_manager.free_form_tickers_regex_query(
+        category="fx", tickers="GBPX?", ret_fields=["tickers"])
+
+    assert df["tickers"].tolist() == ["GBPUSD"]
+
+
+def test_data_vendor_translation(config_files):
+    tmp_path, data_constants = config_files
+
+    ConfigManager.populate_time_series_dictionaries(
+        data_constants=data_constants)
+
+    # Use the tables from our CSVs (rather than the singleton)
+    data_vendor = DataVendor.__new__(DataVendor)
+    data_vendor.config = ConfigManager()
+
+    md_request = MarketDataRequest(
+        category="fx", data_source="bloomberg", freq="intraday", cut="NYC",
+        tickers=["EURUSD"], fields=["close", "open"])
+
+    assert data_vendor.translate_to_vendor_ticker(md_request) == \
+           ["EURUSD Curncy"]
+    assert data_vendor.translate_to_vendor_field(md_request) == \
+           ["PX_LAST", "PX_OPEN"]
+    assert data_vendor.translate_from_vendor_ticker(
+        ["EURUSD Curncy", "EURUSD Curncy"], md_request) == \
+           ["EURUSD", "EURUSD"]
+
+    # Every missing ticker is found (rather than just the first)
+    md_request.tickers = ["EURUSD", "USDJPY", "AUDUSD"]
+
+    assert data_vendor.translate_to_vendor_ticker(md_request) is None
+    assert data_vendor.translate_list(
+        md_request.tickers, {"EURUSD": "EURUSD Curncy"}) == \
+           (["EURUSD Curncy", None, None], ["USDJPY", "AUDUSD"])
+
+    assert data_vendor.translate_from_vendor_field(
+        ["PX_OPEN", "PX_VOLUME"], md_request) == ["open", "close"]
+
+
+def test_smart_group_dataframe_tickers():
+    df = pd.DataFrame({
+        "category": ["fx", "equities", "fx", "fx", "fx"],
+        "data_source": ["bloomberg"] * 5,
+        "freq": ["daily"] * 5,
+        "cut": ["NYC", "NYC", "NYC", np.nan, "LDN"],
+        "tickers": ["EURUSD", "SPX", "GBPUSD", "USDJPY", "EURUSD"],
+        "vendor_tickers": ["EURUSD Curncy", "SPX Index", "GBPUSD Curncy",
+                           "USDJPY Curncy", "EURUSD Curncy"]})
+
+    df_grouped = ConfigManager.smart_group_dataframe_tickers(
+        df, ret_fields=df.columns.tolist())
+
+    # Sorted by group, with the tickers in their original order, and any
+    # rows with missing values skipped (like groupby)
+    assert df_grouped.columns.tolist() == [
+        "tickers", "vendor_tickers", "category", "data_source", "freq", "cut"]
+    assert df_grouped["category"].tolist() == ["equities", "fx", "fx"]
+    assert df_grouped["cut"].tolist() == ["NYC", "LDN", "NYC"]
+    assert df_grouped["tickers"].tolist() == [
+        ["SPX"], ["EURUSD"], ["EURUSD", "GBPUSD"]]
+    assert df_grouped["vendor_tickers"].iloc[2] == [
+        "EURUSD Curncy", "GBPUSD Curncy"]
+
+    # The original DataFrame isn't changed
+    assert df["tickers"].iloc[0] == "EURUSD"
+
+
+if __name__ == '__main__':
+    pytest.main()
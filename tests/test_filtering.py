@@ -16,6 +16,7 @@ __author__ = "saeedamen"  # Saeed Amen
 #
 
 import pytest
+import numpy as np
 import pandas as pd
 
 from findatapy.timeseries import Filter
@@ -39,5 +40,209 @@ def test_filtering_by_dates():
     assert df.index[-1]== pd.to_datetime(finish_date)
 
 
+def test_filtering_by_holidays():
+
+    filter = Filter()
+
+    # Daily data, Christmas & New Year's Day are FX holidays
+    df = pd.DataFrame({"Prices": 1.0},
+                      index=pd.bdate_range("20 Dec 2020", "10 Jan 2021"))
+
+    df_filtered = filter.filter_time_series_by_holidays(df, cal="FX")
+
+    assert len(df_filtered.index) == len(df.index) - 2
+    assert pd.Timestamp("25 Dec 2020") not in df_filtered.index
+    assert pd.Timestamp("01 Jan 2021") not in df_filtered.index
+
+    # Minute data in UTC, by default whole UTC days are removed
+    df = pd.DataFrame({"Prices": 1.0}, index=pd.date_range(
+        "24 Dec 2020", "27 Dec 2020", freq="1min", tz="UTC", inclusive="left"))
+
+    df_filtered = filter.filter_time_series_by_holidays(df, cal="FX")
+
+    assert not (df_filtered.index.day == 25).any()
+    assert len(df_filtered.index) == len(df.index) - 24 * 60
+
+    # Holidays which start at 5pm NY on the previous day
+    df_filtered = filter.filter_time_series_by_holidays(
+        df, cal="FX", holiday_tz="America/New_York", holiday_start_hour=-7)
+
+    removed = df.index.difference(df_filtered.index)
+
+    assert removed[0] == pd.Timestamp("24 Dec 2020 22:00", tz="UTC")
+    assert removed[-1] == pd.Timestamp("25 Dec 2020 21:59", tz="UTC")
+    assert len(removed) == 24 * 60
+    assert np.all(df_filtered.index.values[:-1] < df_filtered.index.values[1:])
+
+
+def test_filtering_by_dates_sorted_and_unsorted():
+
+    filter = Filter()
+
+    df = pd.DataFrame({"Prices": np.arange(10000.0)}, index=pd.date_range(
+        "01 Jan 2020", periods=10000, freq="1min"))
+
+    start_date = pd.Timestamp("02 Jan 2020 10:00")
+    finish_date = pd.Timestamp("03 Jan 2020 10:00")
+
+    df_filtered = filter.filter_time_series_by_date(start_date, finish_date,
+                                                    df)
+
+    # Start and finish dates are inclusive
+    assert df_filtered.index[0] == start_date
+    assert df_filtered.index[-1] == finish_date
+    assert len(df_filtered.index) == 24 * 60 + 1
+
+    # Sorted data is sliced (rather than copied)
+    assert np.shares_memory(df_filtered["Prices"].values, df["Prices"].values)
+
+    # Unsorted data gives the same points
+    df_unsorted = df.iloc[::-1]
+
+    df_unsorted_filtered = filter.filter_time_series_by_date(
+        start_date, finish_date, df_unsorted)
+
+    pd.testing.assert_frame_equal(df_unsorted_filtered.sort_index(),
+                                  df_filtered)
+
+
+def test_filtering_by_time_of_day():
+
+    filter = Filter()
+
+    # Minute data over the change to summer time in New York
+    df = pd.DataFrame({"Prices": 1.0}, index=pd.date_range(
+        "01 Mar 2021", "31 Mar 2021", freq="1min", tz="UTC", inclusive="left"))
+
+    df_filtered = filter.filter_time_series_by_time_of_day_timezone(
+        10, 0, df, timezone_of_snap="America/New_York")
+
+    ny_index = df_filtered.index.tz_convert("America/New_York")
+
+    assert len(df_filtered.index) == 30
+    assert (ny_index.hour == 10).all() and (ny_index.minute == 0).all()
+    assert df_filtered.index.tz == df.index.tz
+
+    # The minute of the day is only computed once for each index/time zone
+    minute_of_day = filter.get_minute_of_day(df.index, "America/New_York")
+
+    assert filter.get_minute_of_day(df.index, "America/New_York") \
+           is minute_of_day
+    assert filter.get_minute_of_day(df.index) is not minute_of_day
+
+    df_filtered = filter.filter_time_series_between_hours(8, 9, df)
+
+    assert len(df_filtered.index) == 30 * 2 * 60
+    assert set(df_filtered.index.hour) == {8, 9}
+
+    df_filtered = filter.filter_time_series_by_minute_of_hour(30, df)
+
+    assert len(df_filtered.index) == 30 * 24
+    assert (df_filtered.index.minute == 30).all()
+
+    # Keep 01:08 to 03:02 in London, everything else is zeroed
+    df_masked = filter.mask_time_series_by_time(
+        df, [("01:08", "03:02")], "Europe/London")
+
+    # (on 28 Mar, London skips from 01:00 to 02:00)
+    assert df_masked["Prices"].sum() == 30 * (52 + 60 + 3) - 52
+    assert df_masked.index.equals(df.index)
+
+
+def test_FX_1_min_trading_index():
+
+    filter = Filter()
+
+    # By default from the Sunday 17:00 open until the Friday 17:00 close in
+    # New York, excluding Christmas and New Year's Day
+    index = filter.create_FX_1_min_trading_index(
+        pd.Timestamp("2019-12-20", tz="UTC"),
+        pd.Timestamp("2020-01-06", tz="UTC"))
+
+    index_ny = index.tz_convert("America/New_York")
+
+    assert index.tz is not None
+    assert index.is_monotonic_increasing and index.is_unique
+    assert index_ny[0] == pd.Timestamp("2019-12-19 19:00",
+                                       tz="America/New_York")
+    assert pd.Timestamp("2019-12-20 16:59", tz="America/New_York") in index_ny
+    assert pd.Timestamp("2019-12-20 17:00", tz="America/New_York") \
+           not in index_ny
+    assert pd.Timestamp("2019-12-22 17:00", tz="America/New_York") in index_ny
+
+    dates = set(index_ny.date)
+
+    assert pd.Timestamp("2019-12-21").date() not in dates
+    assert pd.Timestamp("2019-12-25").date() not in dates
+    assert pd.Timestamp("2020-01-01").date() not in dates
+
+    # A whole week has 5 days of trading minutes
+    index = filter.create_FX_1_min_trading_index(
+        "2021-06-06 21:00", "2021-06-13 20:59", cal=None)
+
+    assert len(index) == 5 * 1440
+
+    # When clocks go back, the repeated hour is traded twice, and when they
+    # go forward, the skipped hour isn't traded
+    for start_date, finish_date, hours in [
+        ("2021-11-07 04:00", "2021-11-08 04:59", 25),
+        ("2021-03-14 05:00", "2021-03-15 03:59", 23)]:
+        index = filter.create_FX_1_min_trading_index(
+            pd.Timestamp(start_date, tz="UTC"),
+            pd.Timestamp(finish_date, tz="UTC"), cal=None,
+            session_open="Mon 00:00", session_close="Sun 23:59",
+            session_tz="America/New_York")
+
+        assert len(index) == hours * 60 - 1
+        assert index.is_monotonic_increasing and index.is_unique
+        assert (index[1:] - index[:-1] == pd.Timedelta(minutes=1)).all()
+
+    # Fill prices for every FX trading minute (using GMT trading hours)
+    df = pd.DataFrame(
+        {"EURUSD.close": [1.0, 2.0, 3.0, 4.0]},
+        index=pd.DatetimeIndex(["2020-01-03 22:58:10", "2020-01-03 22:58:50",
+                                "2020-01-04 10:00:00", "2020-01-05 19:01:00"]))
+
+    df_filled = filter.make_FX_1_min_working_days(df)
+
+    assert list(df_filled.index) == list(
+        pd.DatetimeIndex(["2020-01-03 22:58", "2020-01-03 22:59",
+                          "2020-01-05 19:00", "2020-01-05 19:01"]))
+    assert list(df_filled["EURUSD.close"]) == [1.5, 1.5, 3.0, 4.0]
+
+
+def test_pad_time_series_columns():
+
+    filter = Filter()
+
+    index = pd.date_range("2020-01-01", periods=5, freq="D")
+
+    df = pd.DataFrame({"EURUSD.close": np.arange(5),
+                       "GBPUSD.close": np.arange(5) * 1.5,
+                       "EURUSD.name": ["EURUSD"] * 5}, index=index)
+
+    columns = ["USDJPY.close", "EURUSD.name", "EURUSD.close",
+               "EURUSD.last-tradeable-day"]
+
+    df_padded = filter.pad_time_series_columns(columns, df)
+
+    # Columns in the requested order, with existing columns keeping their
+    # dtypes, and missing columns as float NaNs (or NaT for dates)
+    assert list(df_padded.columns) == columns
+    assert df_padded.index.equals(index)
+    assert df_padded["EURUSD.close"].dtype == np.int64
+    assert df_padded["EURUSD.name"].dtype == object
+    assert df_padded["USDJPY.close"].dtype == np.float64
+    assert df_padded["USDJPY.close"].isna().all()
+    assert pd.api.types.is_datetime64_any_dtype(
+        df_padded["EURUSD.last-tradeable-day"])
+    assert df_padded["EURUSD.last-tradeable-day"].isna().all()
+
+    # Nothing is padded if all the columns are there
+    df_padded = filter.pad_time_series_columns(["GBPUSD.close"], df)
+
+    pd.testing.assert_frame_equal(df_padded, df[["GBPUSD.close"]])
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,100 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from findatapy.market import MarketDataGenerator, MarketDataRequest
+from findatapy.market.datavendor import DataVendor
+from findatapy.market.datavendorregistry import DataVendorRegistry
+from findatapy.util.lazymodule import lazy_import
+
+# Optional libraries which shouldn't be imported by findatapy.market
+optional_modules = ["openpyxl", "arctic", "arcticdb", "pymongo", "redis",
+                    "pyarrow.parquet", "quandl", "alpha_vantage", "yfinance",
+                    "statsmodels", "numba", "twython",
+                    "findatapy.market.datavendorweb",
+                    "findatapy.market.datavendorbbg"]
+
+
+def run_cold_import(code):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    return json.loads(subprocess.check_output(
+        [sys.executable, "-c", code], cwd=root,
+        env=dict(os.environ, PYTHONPATH=root)).decode().splitlines()[-1])
+
+
+def test_market_import_is_lazy():
+    imported = run_cold_import(
+        "import sys, json; import findatapy.market; "
+        "print(json.dumps(sorted(sys.modules.keys() & set("
+        + json.dumps(optional_modules) + "))))")
+
+    assert imported == []
+
+
+def test_lazy_module():
+    json_lazy = lazy_import("no_such_module", "json")
+
+    assert json_lazy.dumps([1]) == "[1]"
+
+    missing = lazy_import("no_such_module")
+
+    assert not missing.is_available()
+
+    with pytest.raises(ImportError):
+        missing.anything
+
+
+class DataVendorTest(DataVendor):
+    def __init__(self):
+        pass
+
+
+def test_data_vendor_registry():
+    assert "bloomberg" in DataVendorRegistry.get_data_sources()
+
+    # Vendor classes are imported on first use
+    assert DataVendorRegistry.get_data_vendor_class(
+        "quandl").__name__ == "DataVendorQuandl"
+
+    DataVendorRegistry.register("testvendor", DataVendorTest)
+
+    market_data_generator = MarketDataGenerator()
+
+    data_vendor = market_data_generator.get_data_vendor(
+        MarketDataRequest(data_source="testvendor-daily"))
+
+    assert isinstance(data_vendor, DataVendorTest)
+
+    # Unknown data sources can still come from the custom vendors
+    data_vendor = market_data_generator.get_data_vendor(
+        MarketDataRequest(data_source="custom",
+                          data_vendor_custom={"custom": DataVendorTest()}))
+
+    assert isinstance(data_vendor, DataVendorTest)
+    assert market_data_generator.get_data_vendor(
+        MarketDataRequest(data_source="unknown")) is None
+
+
+if __name__ == '__main__':
+    pytest.main()
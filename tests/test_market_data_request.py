@@ -0,0 +1,243 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2022 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import datetime
+import pickle
+
+import pytest
+import pandas as pd
+
+from findatapy.market import Market, MarketDataRequest
+
+
+def create_md_request():
+    return MarketDataRequest(
+        start_date="01 Jan 2020", finish_date="01 Feb 2020",
+        data_source="bloomberg", tickers=["EURUSD", "GBPUSD"],
+        vendor_tickers=["EURUSD Curncy", "GBPUSD Curncy"],
+        fields=["close"], vendor_fields=["PX_LAST"],
+        overrides={"TIME_ZONE_OVERRIDE": 23})
+
+
+def test_md_request_copy_on_write():
+    md_request = create_md_request()
+
+    md_request_copy = MarketDataRequest(md_request=md_request)
+
+    # Lists are shared between the copies (and still behave like lists)
+    assert md_request_copy.tickers is md_request.tickers
+    assert md_request_copy.tickers == ["EURUSD", "GBPUSD"]
+    assert isinstance(md_request_copy.fields, list)
+    assert md_request_copy.start_date == pd.Timestamp("2020-01-01")
+
+    # ...but can't be changed in place, only replaced
+    with pytest.raises(TypeError):
+        md_request_copy.tickers.append("USDJPY")
+
+    md_request_copy.tickers = md_request_copy.tickers + ["USDJPY"]
+
+    assert md_request.tickers == ["EURUSD", "GBPUSD"]
+    assert md_request_copy.tickers == ["EURUSD", "GBPUSD", "USDJPY"]
+
+    # Dicts are still copied
+    md_request_copy.overrides["TIME_ZONE_OVERRIDE"] = 0
+
+    assert md_request.overrides == {"TIME_ZONE_OVERRIDE": 23}
+
+    # Copies made with the constructor don't include old_tickers
+    with pytest.raises(AttributeError):
+        md_request_copy.old_tickers
+
+
+def test_md_request_copy_and_pickle():
+    md_request = create_md_request()
+
+    # Other attributes can still be added
+    md_request.cross = "EURUSD"
+
+    for md_request_copy in [copy.copy(md_request), copy.deepcopy(md_request),
+                            pickle.loads(pickle.dumps(md_request))]:
+        assert md_request_copy.cross == "EURUSD"
+        assert md_request_copy.old_tickers == ["EURUSD", "GBPUSD"]
+        assert md_request_copy.vendor_fields == ["PX_LAST"]
+        assert md_request_copy.generate_key() == md_request.generate_key()
+
+        with pytest.raises(TypeError):
+            md_request_copy.vendor_tickers[0] = "USDJPY Curncy"
+
+
+@pytest.mark.parametrize("date_str,date", [
+    ("Jun 1 2005 01:33", datetime.datetime(2005, 6, 1, 1, 33)),
+    ("1 Jun 2005 01:33", datetime.datetime(2005, 6, 1, 1, 33)),
+    ("1 June 2005 01:33", datetime.datetime(2005, 6, 1, 1, 33)),
+    ("01:33 1 Jun 2005", datetime.datetime(2005, 6, 1, 1, 33)),
+    ("01:33 1 June 2005", datetime.datetime(2005, 6, 1, 1, 33)),
+    ("Jun 1 2005", datetime.datetime(2005, 6, 1)),
+    ("01 Jun 2005", datetime.datetime(2005, 6, 1)),
+    ("June 1 2005", datetime.datetime(2005, 6, 1)),
+    ("1 June 2005", datetime.datetime(2005, 6, 1))])
+def test_md_request_date_parser(date_str, date):
+    md_request = MarketDataRequest(start_date=date_str, finish_date=date_str)
+
+    assert md_request.start_date == date
+    assert md_request.finish_date == date
+
+
+def test_md_request_relative_dates():
+    now = datetime.datetime.utcnow()
+
+    start_date = MarketDataRequest(start_date="year").start_date
+    start_date_again = MarketDataRequest(start_date="year").start_date
+
+    # Unparseable dates are now
+    finish_date = MarketDataRequest(finish_date="not a date").finish_date
+
+    assert now - datetime.timedelta(days=366) < start_date \
+           < now - datetime.timedelta(days=364)
+    assert abs((finish_date - now).total_seconds()) < 60
+
+    # Relative dates are only calculated once a minute
+    if now.minute == datetime.datetime.utcnow().minute:
+        assert start_date == start_date_again
+
+
+class RecordingMarketDataGenerator(object):
+    """Records the MarketDataRequests sent to it (instead of downloading
+    anything), returning a close for each ticker."""
+
+    def __init__(self):
+        self.md_requests = []
+
+    def fetch_market_data(self, md_request):
+        self.md_requests.append(md_request)
+
+        return pd.DataFrame(
+            {t + ".close": [1.0] for t in md_request.tickers},
+            index=[pd.Timestamp("2020-01-02")])
+
+
+def test_md_request_from_str():
+    market = Market(market_data_generator=RecordingMarketDataGenerator())
+
+    md_request_str = "backtest.fx.bloomberg.daily.NYC.EURUSD,GBPUSD.close"
+
+    for i in range(2):
+        md_request = market.create_md_request_from_str(
+            md_request_str, start_date="01 Jan 2020")
+
+        assert md_request.environment == "backtest"
+        assert md_request.category == "fx"
+        assert md_request.data_source == "bloomberg"
+        assert md_request.tickers == ["EURUSD", "GBPUSD"]
+        assert md_request.fields == ["close"]
+        assert md_request.start_date == pd.Timestamp("2020-01-01")
+
+    md_request = market.create_md_request_from_str(
+        "raw.data_source.bloomberg.tickers.EURUSD,GBPUSD."
+        "vendor_tickers.EURUSD Curncy,GBPUSD Curncy")
+
+    assert md_request.vendor_tickers == ["EURUSD Curncy", "GBPUSD Curncy"]
+
+    md_request = market.create_md_request_from_str(
+        '{"data_source": "quandl", "tickers": ["USDJPY"]}')
+
+    assert md_request.data_source == "quandl"
+    assert md_request.tickers == ["USDJPY"]
+
+    # JSON strings are only parsed once, but each request gets its own
+    # values
+    md_request.overrides["EQY_FUND_CRNCY"] = "EUR"
+
+    md_request = market.create_md_request_from_str(
+        '{"data_source": "bloomberg", "tickers": ["SPX"], "overrides": {}}')
+    md_request.overrides["EQY_FUND_CRNCY"] = "USD"
+
+    md_request = market.create_md_request_from_str(
+        '{"data_source": "bloomberg", "tickers": ["SPX"], "overrides": {}}')
+
+    assert md_request.overrides == {}
+
+
+def test_md_request_from_dataframe():
+    market = Market(market_data_generator=RecordingMarketDataGenerator())
+
+    md_request_df = pd.DataFrame({
+        "category": ["fx", "fx", "equities"],
+        "data_source": ["bloomberg"] * 3,
+        "freq": ["daily"] * 3, "cut": ["NYC", "NYC", "NYC"],
+        "tickers": ["EURUSD", "GBPUSD", "SPX,NDX"],
+        "vendor_tickers": ["EURUSD Curncy", "GBPUSD Curncy",
+                           "SPX Index,NDX Index"],
+        "fields": ["close"] * 3, "not_a_property": [1, 2, 3]})
+
+    md_list = market.create_md_request_from_dataframe(
+        md_request_df, md_request=MarketDataRequest(fields=["open"]),
+        smart_group=False)
+
+    assert [md.category for md in md_list] == ["fx", "fx", "equities"]
+    assert md_list[2].tickers == ["SPX", "NDX"]
+    assert md_list[2].vendor_tickers == ["SPX Index", "NDX Index"]
+
+    # Fields were already set in the initial request
+    assert all(md.fields == ["open"] for md in md_list)
+
+
+def test_md_request_list_grouped():
+    market_data_generator = RecordingMarketDataGenerator()
+    market = Market(market_data_generator=market_data_generator)
+
+    md_list = market.create_md_request_list(
+        ["fx.bloomberg.daily.NYC.EURUSD.close",
+         "fx.bloomberg.daily.NYC.GBPUSD.close",
+         "fx.bloomberg.daily.NYC.EURUSD.close",
+         {"category": "fx", "data_source": "bloomberg", "freq": "daily",
+          "cut": "NYC", "tickers": ["AUDUSD"], "fields": ["close"]},
+         "fx.bloomberg.daily.LDN.EURUSD.close"],
+        start_date="01 Jan 2020", finish_date="01 Feb 2020")
+
+    # Only the cut differs for the last request
+    assert len(md_list) == 2
+    assert md_list[0].tickers == ["EURUSD", "GBPUSD", "AUDUSD"]
+    assert md_list[0].vendor_tickers is None
+    assert md_list[1].cut == "LDN" and md_list[1].tickers == ["EURUSD"]
+
+    # Requests with different credentials are never combined
+    md_list = [MarketDataRequest(
+        start_date="01 Jan 2020", finish_date="01 Feb 2020",
+        data_source="quandl", tickers=[ticker], fields=["close"],
+        quandl_api_key=api_key)
+        for ticker, api_key in [("EURUSD", "key"), ("GBPUSD", "other"),
+                                ("USDJPY", "key")]]
+
+    md_list = market.group_md_requests(md_list)
+
+    assert len(md_list) == 2
+    assert md_list[0].tickers == ["EURUSD", "USDJPY"]
+    assert md_list[1].quandl_api_key == "other"
+
+    df = market.fetch_market(
+        ["equities.bloomberg.daily.NYC.SPX.close",
+         "equities.bloomberg.daily.NYC.NDX.close"],
+        start_date="01 Jan 2020", finish_date="01 Feb 2020")
+
+    assert len(market_data_generator.md_requests) == 1
+    assert list(df.columns) == ["SPX.close", "NDX.close"]
+
+
+if __name__ == '__main__':
+    pytest.main()